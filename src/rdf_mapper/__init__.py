@@ -1,4 +1,5 @@
 from .rdf_mapper import RDFMapper
 from .rdf_repository import RDFRepository
+from .backends import MemoryBackend, SQLiteBackend
 
-__all__ = ["RDFMapper", "RDFRepository"]
\ No newline at end of file
+__all__ = ["RDFMapper", "RDFRepository", "MemoryBackend", "SQLiteBackend"]
@@ -0,0 +1,263 @@
+import heapq
+from itertools import product
+from rdflib import Literal, RDF, XSD
+
+_INTEGER_TYPES = {XSD.integer, XSD.int, XSD.long, XSD.short, XSD.nonNegativeInteger, XSD.positiveInteger}
+_FLOAT_TYPES = {XSD.double, XSD.float, XSD.decimal}
+
+
+def to_number(term):
+    """
+    Valor numérico de um termo, ou None. Literais tipados usam o datatype; strings
+    aceitam vírgula decimal ("6,29", "1.234,56"), como nos CSVs de dados abertos.
+    """
+    if not isinstance(term, Literal):
+        return None
+    dt = term.datatype
+    value = str(term).strip()
+    try:
+        if dt in _INTEGER_TYPES:
+            return int(value)
+        if dt in _FLOAT_TYPES:
+            return float(value)
+        if dt is not None and dt != XSD.string:
+            return None
+        if "," in value:
+            value = value.replace(".", "").replace(",", ".")
+        return float(value)
+    except ValueError:
+        return None
+
+
+class _Count:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def add(self, _):
+        self.value += 1
+
+    def result(self):
+        return self.value
+
+
+class _Sum:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def add(self, number):
+        self.value += number
+
+    def result(self):
+        return self.value
+
+
+class _Avg:
+    __slots__ = ("total", "n")
+
+    def __init__(self):
+        self.total = 0
+        self.n = 0
+
+    def add(self, number):
+        self.total += number
+        self.n += 1
+
+    def result(self):
+        return self.total / self.n if self.n else None
+
+
+class _Min:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = None
+
+    def add(self, number):
+        if self.value is None or number < self.value:
+            self.value = number
+
+    def result(self):
+        return self.value
+
+
+class _Max(_Min):
+    __slots__ = ()
+
+    def add(self, number):
+        if self.value is None or number > self.value:
+            self.value = number
+
+
+class _CountDistinct:
+    __slots__ = ("values",)
+
+    def __init__(self):
+        self.values = set()
+
+    def add(self, term):
+        self.values.add(term)
+
+    def result(self):
+        return len(self.values)
+
+
+# op -> (acumulador, se o valor é convertido para número antes de acumular)
+OPERATIONS = {
+    "count": (_Count, False),
+    "count_distinct": (_CountDistinct, False),
+    "sum": (_Sum, True),
+    "avg": (_Avg, True),
+    "min": (_Min, True),
+    "max": (_Max, True),
+}
+
+
+class Metric:
+    __slots__ = ("name", "op", "field", "predicate", "accumulator", "numeric")
+
+    def __init__(self, name, op, field, predicate):
+        if op not in OPERATIONS:
+            raise ValueError(f"Unsupported aggregation '{op}'; use one of {', '.join(OPERATIONS)}")
+        if op != "count" and field is None:
+            raise ValueError(f"Aggregation '{op}' needs a field")
+        self.name = name
+        self.op = op
+        self.field = field
+        self.predicate = predicate
+        self.accumulator, self.numeric = OPERATIONS[op]
+
+
+class Grouping:
+    """Um GROUP BY: campos de agrupamento, métricas e ordenação/top-K do resultado."""
+
+    def __init__(self, fields, key_predicates, metrics, order_by=None, order="DESC", limit=None):
+        order = order.strip().upper()
+        if order not in ("ASC", "DESC"):
+            raise ValueError("order must be 'ASC' or 'DESC'")
+        if limit is not None and limit < 0:
+            raise ValueError("limit must be a non-negative integer")
+        self.fields = list(fields)
+        self.key_predicates = list(key_predicates)
+        self.metrics = list(metrics)
+        self.order_by = order_by or self.metrics[0].name
+        if self.order_by not in [metric.name for metric in self.metrics]:
+            raise ValueError(f"order_by '{self.order_by}' is not one of the metrics")
+        self.order = order
+        self.limit = limit
+
+    def keys(self, columns) -> dict:
+        """
+        {sujeito: [chave, ...]} para os sujeitos que têm todos os campos de agrupamento.
+        Com um campo só a chave é o próprio valor; com vários, uma tupla. Campos
+        multivalorados geram uma chave por combinação, como o GROUP BY do SPARQL.
+        """
+        first, *rest = [columns[pred] for pred in self.key_predicates]
+        if not rest:
+            return first
+        keys = {}
+        for subject, values in first.items():
+            others = [column.get(subject) for column in rest]
+            if all(others):
+                keys[subject] = list(product(values, *others))
+        return keys
+
+    def rows(self, groups) -> list:
+        """Linhas ordenadas; com limit, só os top-K passam por um heap limitado."""
+        position = [metric.name for metric in self.metrics].index(self.order_by)
+        descending = self.order == "DESC"
+
+        def sort_key(item):
+            # Grupos sem valor (ex.: avg sem números) ficam sempre no final
+            value = item[1][position].result()
+            if value is None:
+                return (not descending, 0)
+            return (descending, value)
+
+        items = groups.items()
+        if self.limit is None:
+            selected = sorted(items, key=sort_key, reverse=descending)
+        elif descending:
+            selected = heapq.nlargest(self.limit, items, key=sort_key)
+        else:
+            selected = heapq.nsmallest(self.limit, items, key=sort_key)
+
+        single = len(self.fields) == 1
+        return [
+            {
+                **({self.fields[0]: key} if single else dict(zip(self.fields, key))),
+                **{metric.name: acc.result() for metric, acc in zip(self.metrics, accs)},
+            }
+            for key, accs in selected
+        ]
+
+
+def aggregate(graph, rdf_type, groupings) -> list:
+    """
+    Executa vários GROUP BY na mesma travessia: cada predicado envolvido (chave ou
+    métrica, de qualquer agrupamento) é lido uma única vez com subject_objects.
+    Retorna uma lista de linhas por agrupamento, na ordem recebida.
+    """
+    typed = set(graph.subjects(RDF.type, rdf_type))
+
+    # Colunas de agrupamento compartilhadas: {predicado: {sujeito: [valor, ...]}}
+    columns = {}
+    for grouping in groupings:
+        for pred in grouping.key_predicates:
+            if pred not in columns:
+                column = columns[pred] = {}
+                for subject, obj in graph.subject_objects(pred):
+                    if subject in typed:
+                        column.setdefault(subject, []).append(str(obj))
+
+    keys, groups = [], []
+    for grouping in groupings:
+        subject_keys = grouping.keys(columns)
+        accumulators = {}
+        for values in subject_keys.values():
+            for key in values:
+                if key not in accumulators:
+                    accumulators[key] = [metric.accumulator() for metric in grouping.metrics]
+        keys.append(subject_keys)
+        groups.append(accumulators)
+
+    # Métricas sobre o mesmo predicado compartilham a varredura, entre todos os agrupamentos
+    by_predicate = {}
+    for number, grouping in enumerate(groupings):
+        for position, metric in enumerate(grouping.metrics):
+            by_predicate.setdefault(metric.predicate, []).append((number, position, metric))
+
+    for pred, targets in by_predicate.items():
+        if pred is None:
+            # count(*): quantos sujeitos em cada grupo
+            for number, position, _ in targets:
+                accumulators = groups[number]
+                for values in keys[number].values():
+                    for key in values:
+                        accumulators[key][position].add(None)
+            continue
+        numbers = {}
+        for subject, obj in graph.subject_objects(pred):
+            # Conversão uma vez por termo distinto: os preços se repetem muito
+            try:
+                value = numbers[obj]
+            except KeyError:
+                value = numbers[obj] = to_number(obj)
+            for number, position, metric in targets:
+                values = keys[number].get(subject)
+                if values is None:
+                    continue
+                if metric.numeric:
+                    if value is None:
+                        continue
+                    accumulated = value
+                else:
+                    accumulated = obj
+                accumulators = groups[number]
+                for key in values:
+                    accumulators[key][position].add(accumulated)
+
+    return [grouping.rows(accumulators) for grouping, accumulators in zip(groupings, groups)]
@@ -0,0 +1,144 @@
+import gzip
+from contextlib import nullcontext
+from itertools import islice
+from rdflib import Graph
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+from .sqlite_store import open_sqlite_graph
+
+_NTRIPLES = ("nt", "ntriples", "nt11")
+_SUFFIX_FORMATS = {"ttl": "turtle", "rdf": "xml", "owl": "xml", "jsonld": "json-ld"}
+
+
+def _guess_format(source) -> str:
+    name = str(source)
+    if name.endswith(".gz"):
+        name = name[:-3]
+    suffix = name.rsplit(".", 1)[-1].lower()
+    return _SUFFIX_FORMATS.get(suffix, suffix)
+
+
+def _open(source):
+    return gzip.open(source, "rb") if str(source).endswith(".gz") else open(source, "rb")
+
+
+class _BatchSink:
+    """Sink do parser N-Triples que entrega as triplas em lotes, sem passar por Graph.add."""
+
+    def __init__(self, write, batch_size):
+        self.write = write
+        self.batch_size = batch_size
+        self.batch = []
+        self.count = 0
+
+    def triple(self, s, p, o):
+        self.batch.append((s, p, o))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.write(self.batch)
+            self.count += len(self.batch)
+            self.batch = []
+
+
+class Backend:
+    """
+    Armazenamento por trás do RDFRepository. Expõe o Graph do rdflib (finders,
+    counters e group-bys rodam sobre ele sem mudança) e a carga em massa.
+    Subclasses implementam _write(batch) e, se houver, um modo bulk().
+    """
+
+    graph: Graph
+
+    def _write(self, batch):
+        raise NotImplementedError
+
+    def bulk(self):
+        return nullcontext(self)
+
+    def bulk_load(self, triples, batch_size: int = 100_000) -> int:
+        """Grava triples em lotes, sem Graph.add por tripla. Retorna o nº de triplas lidas."""
+        total = 0
+        triples = iter(triples)
+        with self.bulk():
+            while True:
+                batch = list(islice(triples, batch_size))
+                if not batch:
+                    break
+                self._write(batch)
+                self.commit()
+                total += len(batch)
+        return total
+
+    def load(self, source, format: str = None, batch_size: int = 100_000) -> int:
+        """
+        Carrega um arquivo RDF (aceita .gz). N-Triples é lido em fluxo e gravado em
+        lotes; os demais formatos passam por um Graph temporário em memória.
+        Retorna o nº de triplas lidas.
+        """
+        format = format or _guess_format(source)
+        if format not in _NTRIPLES:
+            temp = Graph()
+            with _open(source) as stream:
+                temp.parse(stream, format=format)
+            return self.bulk_load(temp, batch_size)
+
+        def write(batch):
+            self._write(batch)
+            self.commit()
+
+        sink = _BatchSink(write, batch_size)
+        with self.bulk(), _open(source) as stream:
+            W3CNTriplesParser(sink).parse(stream)
+            sink.flush()
+        return sink.count
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __len__(self):
+        return len(self.graph)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MemoryBackend(Backend):
+    """Grafo rdflib em memória: o comportamento padrão do RDFRepository."""
+
+    def __init__(self, graph: Graph = None):
+        self.graph = graph if graph is not None else Graph()
+
+    def _write(self, batch):
+        graph = self.graph
+        graph.addN((s, p, o, graph) for s, p, o in batch)
+
+
+class SQLiteBackend(Backend):
+    """
+    Grafo persistido em um arquivo SQLite (SQLiteStore). Depois da primeira carga,
+    abrir o arquivo já deixa o repositório pronto, sem reprocessar CSV ou RDF.
+    """
+
+    def __init__(self, path, create: bool = True):
+        self.path = path
+        self.graph = open_sqlite_graph(path, create=create)
+
+    def _write(self, batch):
+        self.graph.store.add_many(batch)
+
+    def bulk(self):
+        return self.graph.store.bulk()
+
+    def commit(self):
+        self.graph.commit()
+
+    def close(self):
+        self.graph.close()
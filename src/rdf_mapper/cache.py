@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from typing import NamedTuple
+from rdflib import RDF
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def _fresh(value):
+    """Cópia das listas/dicts do resultado, para que quem chamou não altere o que está em cache."""
+    if isinstance(value, list):
+        return [_fresh(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _fresh(item) for key, item in value.items()}
+    return value
+
+
+def type_dependency(rdf_type):
+    return (RDF.type, rdf_type)
+
+
+class ResultCache:
+    """
+    LRU de resultados (contagens e agregações) com as dependências de cada entrada:
+    predicados lidos e (rdf:type, classe). Uma tripla incluída ou removida invalida só
+    as entradas que dependem do seu predicado, ou da sua classe se for rdf:type.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._by_dependency = {}
+
+    def get(self, key, dependencies, compute):
+        try:
+            value, _ = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _fresh(value)
+
+        self.misses += 1
+        value = compute()
+        dependencies = frozenset(dependencies)
+        self._entries[key] = (value, dependencies)
+        for dependency in dependencies:
+            self._by_dependency.setdefault(dependency, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._discard(next(iter(self._entries)))
+        return _fresh(value)
+
+    def _discard(self, key):
+        _, dependencies = self._entries.pop(key)
+        for dependency in dependencies:
+            keys = self._by_dependency.get(dependency)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_dependency[dependency]
+
+    def invalidate(self, dependency):
+        for key in list(self._by_dependency.get(dependency, ())):
+            self._discard(key)
+
+    def invalidate_triple(self, triple):
+        """Invalida o que a tripla (ou padrão de remoção, com None) pode ter alterado."""
+        if not self._entries:
+            return
+        _, pred, obj = triple
+        if pred is None:
+            self.clear()
+        elif pred != RDF.type:
+            self.invalidate(pred)
+        elif obj is not None:
+            self.invalidate(type_dependency(obj))
+        else:
+            for dependency in [d for d in self._by_dependency if isinstance(d, tuple)]:
+                self.invalidate(dependency)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_dependency.clear()
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,357 @@
+import datetime
+import numpy as np
+from rdflib import Literal
+from .aggregation import Metric, to_number
+
+
+def _kind(value):
+    if isinstance(value, bool):
+        return "other"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, datetime.datetime):
+        return "datetime"
+    if isinstance(value, datetime.date):
+        return "date"
+    return "other"
+
+
+def _as_naive_utc(value):
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+class Categorical:
+    """Coluna codificada em dicionário: códigos int32 (-1 = sem valor) e a lista de valores distintos."""
+
+    __slots__ = ("codes", "categories", "_positions")
+
+    def __init__(self, codes, categories):
+        self.codes = codes
+        self.categories = categories
+        self._positions = None
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, position):
+        if isinstance(position, (int, np.integer)):
+            code = self.codes[position]
+            return None if code < 0 else self.categories[code]
+        return Categorical(self.codes[position], self.categories)
+
+    def _code(self, value):
+        if self._positions is None:
+            self._positions = {category: code for code, category in enumerate(self.categories)}
+        return self._positions.get(value, -2)
+
+    def __eq__(self, value):
+        """Máscara booleana das linhas com esse valor; compara códigos, não strings."""
+        return self.codes == self._code(value)
+
+    def __ne__(self, value):
+        return ~(self == value)
+
+    def isin(self, values):
+        return np.isin(self.codes, [self._code(value) for value in values])
+
+    def to_numpy(self):
+        # -1 indexa o None do final
+        decoded = np.empty(len(self.categories) + 1, dtype=object)
+        decoded[:-1] = self.categories
+        return decoded[self.codes]
+
+    def __repr__(self):
+        return f"Categorical({len(self)} linhas, {len(self.categories)} categorias)"
+
+
+def _column(pairs, size, convert):
+    """
+    Monta uma coluna a partir de pares (linha, termo). Números viram array int64
+    (float64 com NaN se faltar valor), datas/data-horas datetime64 com NaT, e o
+    restante é codificado em dicionário. Cada termo distinto é convertido uma vez.
+    Retorna (coluna, linhas inteiras): máscara das linhas com int numa coluna float64
+    (para as métricas devolverem int como aggregate), None nos outros casos.
+    """
+    first = {}
+    for row, term in pairs:
+        if row is not None and term is not None and row not in first:
+            first[row] = term
+    converted = {}
+    for term in first.values():
+        if term not in converted:
+            converted[term] = convert(term)
+    rows = np.fromiter(first.keys(), dtype=np.int64, count=len(first))
+    values = [converted[term] for term in first.values()]
+    kinds = {_kind(value) for value in values if value is not None}
+
+    if kinds == {"number"}:
+        present = [value is not None for value in values]
+        if all(present) and len(first) == size and all(isinstance(value, int) for value in values):
+            column = np.zeros(size, dtype=np.int64)
+            column[rows] = values
+            return column, None
+        column = np.full(size, np.nan)
+        column[rows[present]] = [value for value in values if value is not None]
+        integers = np.zeros(size, dtype=bool)
+        integers[rows[present]] = [isinstance(value, int) for value in values if value is not None]
+        return column, integers
+    if kinds in ({"date"}, {"datetime"}):
+        unit = "datetime64[D]" if kinds == {"date"} else "datetime64[us]"
+        column = np.full(size, np.datetime64("NaT"), dtype=unit)
+        present = [value is not None for value in values]
+        column[rows[present]] = [
+            np.datetime64(_as_naive_utc(value) if kinds == {"datetime"} else value)
+            for value in values if value is not None
+        ]
+        return column, None
+
+    positions = {}
+    codes = np.full(size, -1, dtype=np.int32)
+    codes[rows] = [
+        -1 if value is None else positions.setdefault(value, len(positions))
+        for value in values
+    ]
+    return Categorical(codes, list(positions)), None
+
+
+def _factorize(column):
+    """(códigos, rótulos) de uma coluna; código -1 para sem valor."""
+    if isinstance(column, Categorical):
+        return column.codes, column.categories
+    present = ~np.isnat(column) if column.dtype.kind == "M" else ~np.isnan(column) if column.dtype.kind == "f" else None
+    if present is None:
+        labels, codes = np.unique(column, return_inverse=True)
+        return codes, labels.tolist()
+    codes = np.full(len(column), -1, dtype=np.int64)
+    labels, codes[present] = np.unique(column[present], return_inverse=True)
+    return codes, labels.tolist()
+
+
+def _numbers(column, field):
+    """Coluna como float64 (NaN = sem número); texto passa por to_number ("6,29" -> 6.29)."""
+    if isinstance(column, Categorical):
+        numbers = [to_number(Literal(value)) if isinstance(value, str) else value for value in column.categories]
+        lookup = np.array(
+            [np.nan if _kind(number) != "number" else number for number in numbers] + [np.nan], dtype=float
+        )
+        return lookup[column.codes]
+    if column.dtype.kind == "M":
+        raise ValueError(f"Field '{field}' is not numeric")
+    return column.astype(float)
+
+
+def _integer_rows(column, integers):
+    """Máscara das linhas cujo valor é int (to_number de um literal inteiro)."""
+    if isinstance(column, Categorical):
+        lookup = np.array([_kind(value) == "number" and isinstance(value, int) for value in column.categories] + [False])
+        return lookup[column.codes]
+    if column.dtype.kind == "i":
+        return np.ones(len(column), dtype=bool)
+    if integers is None:
+        return np.zeros(len(column), dtype=bool)
+    return integers
+
+
+def _python(value, integer=False):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return int(value) if integer else float(value)
+
+
+class EntityFrame:
+    """
+    Resultado colunar de um finder ou de uma varredura da classe: uma coluna por
+    campo (números e datas em arrays NumPy, texto codificado em dicionário), sem
+    um objeto Python por entidade.
+
+        frame = repo.frame(["Estado___Sigla", "Valor_de_Venda"], numeric=["Valor_de_Venda"])
+        frame.group_by("Estado___Sigla", {"avg": ("avg", "Valor_de_Venda")}, limit=10)
+        maranhao = frame[frame["Estado___Sigla"] == "MA"]
+
+    frame["campo"] devolve a coluna; um inteiro ou fatia hidrata as entidades só
+    nesse momento (do grafo, como os finders); uma máscara booleana ou um vetor de
+    posições devolve outro EntityFrame. Campos multivalorados guardam o primeiro valor.
+    """
+
+    def __init__(self, mapper, graph, entity_class, subjects, columns, integers=None):
+        self.mapper = mapper
+        self.graph = graph
+        self.entity_class = entity_class
+        self.subjects = subjects
+        self.columns = columns
+        # {campo: linhas com int} das colunas float64 que misturam int e NaN/float
+        self._integers = integers or {}
+
+    @classmethod
+    def load(cls, mapper, graph, entity_class, subjects, fields, numeric=(), scan=False):
+        """
+        Lê as colunas pedidas para os sujeitos. scan=True lê cada predicado com uma
+        varredura (subject_objects), melhor quando os sujeitos são a classe inteira;
+        senão faz uma consulta (sujeito, predicado) por linha.
+        """
+        subject_list = list(subjects)
+        positions = {subject: row for row, subject in enumerate(subject_list)}
+        properties = mapper._mapping_for(entity_class).properties
+        columns, integers = {}, {}
+        for field in fields:
+            fget = properties[field]
+            if fget._is_relationship and fget._relationship_type != 'one_to_one':
+                raise ValueError(f"'{field}' is one_to_many; EntityFrame columns hold one value per entity")
+            pred = fget._rdf_predicate
+            if fget._is_relationship:
+                convert = str
+            elif field in numeric:
+                convert = to_number
+            else:
+                convert = mapper._literal_to_python
+            if scan:
+                pairs = ((positions.get(subject), obj) for subject, obj in graph.subject_objects(pred))
+            else:
+                pairs = ((row, next(graph.objects(subject, pred), None)) for row, subject in enumerate(subject_list))
+            columns[field], rows = _column(pairs, len(subject_list), convert)
+            if rows is not None:
+                integers[field] = rows
+        subject_array = np.empty(len(subject_list), dtype=object)
+        subject_array[:] = subject_list
+        return cls(mapper, graph, entity_class, subject_array, columns, integers)
+
+    @property
+    def fields(self) -> list:
+        return list(self.columns)
+
+    def __len__(self):
+        return len(self.subjects)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return self.columns[key]
+            except KeyError:
+                raise KeyError(f"'{key}' is not a column of this EntityFrame") from None
+        if isinstance(key, (int, np.integer)):
+            return self._materialize([self.subjects[key]])[0]
+        if isinstance(key, slice):
+            return self._materialize(self.subjects[key])
+        return self.take(key)
+
+    def take(self, selector) -> "EntityFrame":
+        """Novo EntityFrame com as linhas de uma máscara booleana ou vetor de posições."""
+        selector = np.asarray(selector)
+        columns = {field: column[selector] for field, column in self.columns.items()}
+        integers = {field: rows[selector] for field, rows in self._integers.items()}
+        return EntityFrame(self.mapper, self.graph, self.entity_class, self.subjects[selector], columns, integers)
+
+    def _materialize(self, subjects):
+        return self.mapper.from_rdf_many(self.graph, self.entity_class, list(subjects), visited={})
+
+    def __iter__(self, chunk_size=100):
+        # Hidrata em blocos, como iter_by: só o bloco atual de entidades fica em memória
+        for start in range(0, len(self), chunk_size):
+            yield from self._materialize(self.subjects[start:start + chunk_size])
+
+    def group_by(self, fields, metrics: dict = None, order_by: str = None, order: str = "DESC", limit: int = None):
+        """
+        GROUP BY vetorizado sobre as colunas, com as mesmas métricas e o mesmo formato
+        de RDFRepository.aggregate: [{campo: valor, ..., nome: resultado}], ordenado por
+        order_by (a primeira métrica, por padrão), sem valor no final, cortado em limit.
+        """
+        order = order.strip().upper()
+        if order not in ("ASC", "DESC"):
+            raise ValueError("order must be 'ASC' or 'DESC'")
+        if limit is not None and limit < 0:
+            raise ValueError("limit must be a non-negative integer")
+        field_list = [fields] if isinstance(fields, str) else list(fields)
+        metrics = metrics or {"count": ("count", None)}
+        compiled = [Metric(name, op, field, None) for name, (op, field) in metrics.items()]
+        order_by = order_by or compiled[0].name
+        if order_by not in metrics:
+            raise ValueError(f"order_by '{order_by}' is not one of the metrics")
+
+        factorized = [_factorize(self[field]) for field in field_list]
+        valid = np.ones(len(self), dtype=bool)
+        for codes, _ in factorized:
+            valid &= codes >= 0
+        if len(factorized) == 1:
+            codes, labels = factorized[0]
+            present, group = np.unique(codes[valid], return_inverse=True)
+            keys = [labels[code] for code in present.tolist()]
+        else:
+            stacked = np.stack([codes[valid] for codes, _ in factorized], axis=1)
+            present, group = np.unique(stacked, axis=0, return_inverse=True)
+            keys = [tuple(labels[code] for (_, labels), code in zip(factorized, row)) for row in present.tolist()]
+        group = group.reshape(-1)
+        size = len(keys)
+
+        results = {}
+        for metric in compiled:
+            results[metric.name] = self._metric(metric, valid, group, size)
+
+        sort_values = np.array([np.nan if value is None else value for value in results[order_by]], dtype=float)
+        missing = np.isnan(sort_values)
+        sort_values[missing] = 0
+        # lexsort: a última chave é a principal; sem valor fica sempre no final
+        ranking = np.lexsort((-sort_values if order == "DESC" else sort_values, missing))
+        if limit is not None:
+            ranking = ranking[:limit]
+
+        single = len(field_list) == 1
+        return [
+            {
+                **({field_list[0]: keys[i]} if single else dict(zip(field_list, keys[i]))),
+                **{name: values[i] for name, values in results.items()},
+            }
+            for i in ranking.tolist()
+        ]
+
+    def _metric(self, metric, valid, group, size) -> list:
+        op, field = metric.op, metric.field
+        if op == "count":
+            mask = np.ones(len(group), dtype=bool)
+            if field is not None:
+                mask = _factorize(self[field])[0][valid] >= 0
+            return np.bincount(group[mask], minlength=size).tolist()
+        if op == "count_distinct":
+            codes = _factorize(self[field])[0][valid]
+            mask = codes >= 0
+            width = int(codes.max()) + 1 if mask.any() else 1
+            pairs = np.unique(group[mask].astype(np.int64) * width + codes[mask])
+            return np.bincount(pairs // width, minlength=size).tolist()
+
+        column = self[field]
+        values = _numbers(column, field)[valid]
+        integers = _integer_rows(column, self._integers.get(field))[valid]
+        mask = ~np.isnan(values)
+        groups, values, integers = group[mask], values[mask], integers[mask]
+        counts = np.bincount(groups, minlength=size)
+        if op == "sum":
+            totals = np.bincount(groups, weights=values, minlength=size)
+            # Como em aggregate: a soma só continua int se todas as parcelas do grupo forem int
+            integer = np.bincount(groups, weights=~integers, minlength=size) == 0
+            return [_python(total, whole) for total, whole in zip(totals.tolist(), integer.tolist())]
+        if op == "avg":
+            totals = np.bincount(groups, weights=values, minlength=size)
+            return [_python(total / n) if n else None for total, n in zip(totals.tolist(), counts.tolist())]
+        extreme = np.full(size, np.inf if op == "min" else -np.inf)
+        (np.minimum if op == "min" else np.maximum).at(extreme, groups, values)
+        # O extremo vem como int se algum int do grupo tem esse valor
+        integer = np.bincount(groups, weights=integers & (values == extreme[groups]), minlength=size) > 0
+        return [
+            _python(value, whole) if n else None
+            for value, n, whole in zip(extreme.tolist(), counts.tolist(), integer.tolist())
+        ]
+
+    def to_pandas(self):
+        """DataFrame com as mesmas colunas (texto como pandas.Categorical, sem decodificar), indexado pela URI."""
+        import pandas as pd
+
+        data = {
+            field: pd.Categorical.from_codes(column.codes, column.categories)
+            if isinstance(column, Categorical) else column
+            for field, column in self.columns.items()
+        }
+        return pd.DataFrame(data, index=pd.Index([str(subject) for subject in self.subjects], name="uri"))
+
+    def __repr__(self):
+        return f"<EntityFrame {self.entity_class.__name__}: {len(self)} linhas x {len(self.columns)} colunas>"
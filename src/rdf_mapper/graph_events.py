@@ -0,0 +1,104 @@
+import weakref
+from rdflib import Graph, ConjunctiveGraph
+from rdflib.plugins.stores.memory import Memory, SimpleMemory
+from rdflib.store import Store, TripleAddedEvent, TripleRemovedEvent, StoreCreatedEvent
+from .sqlite_store import SQLiteStore
+
+_hubs = weakref.WeakKeyDictionary()
+# Stores do rdflib que não disparam TripleRemovedEvent: o hub passa a disparar por eles
+_SILENT_REMOVALS = (Memory, SimpleMemory)
+# Stores que sobrescrevem remove mas ainda disparam o evento (chamando Store.remove)
+_REPORTED_REMOVALS = (SQLiteStore,)
+
+
+class _StoreHub:
+    """
+    Um único assinante por store no Dispatcher do rdflib, repassando os eventos
+    para os ouvintes registrados (por referência fraca, para não prender repositórios vivos).
+    De cada grafo observado guarda só o identificador: o ouvinte não prende o grafo.
+    """
+
+    def __init__(self, store):
+        self.listeners = weakref.WeakKeyDictionary()
+        dispatcher = store.dispatcher
+        dispatcher.subscribe(TripleAddedEvent, self._added)
+        dispatcher.subscribe(TripleRemovedEvent, self._removed)
+        # Depois que o mapa existe, o Dispatcher rejeita tipos de evento sem assinante
+        dispatcher.subscribe(StoreCreatedEvent, lambda event: None)
+        if isinstance(store, _SILENT_REMOVALS):
+            _report_removals(store)
+
+    def _targets(self, context):
+        for listener, (identifier, conjunctive) in list(self.listeners.items()):
+            if (
+                context is None
+                or conjunctive
+                or getattr(context, "identifier", None) == identifier
+            ):
+                yield listener
+
+    def _added(self, event):
+        for listener in self._targets(event.context):
+            listener._triple_added(event.triple)
+
+    def _removed(self, event):
+        for listener in self._targets(event.context):
+            listener._triple_removed(event.triple)
+
+
+def _report_removals(store):
+    """
+    Troca store.remove (só nesta instância) por uma versão que dispara TripleRemovedEvent
+    para cada tripla que o padrão de fato removeu: graph.remove, graph.set e -= passam
+    a ser vistos pelos ouvintes, sem depender de remove_triples.
+    """
+    remove = store.remove
+    dispatch = store.dispatcher.dispatch
+
+    def reporting_remove(triple_pattern, context=None):
+        removed = [triple for triple, _ in store.triples(triple_pattern, context)]
+        remove(triple_pattern, context)
+        for triple in removed:
+            dispatch(TripleRemovedEvent(triple=triple, context=context))
+    store.remove = reporting_remove
+
+
+def _hub(graph: Graph) -> _StoreHub:
+    store = graph.store
+    hub = _hubs.get(store)
+    if hub is None:
+        hub = _hubs[store] = _StoreHub(store)
+    return hub
+
+
+def watch(graph: Graph, listener):
+    """
+    Passa a avisar listener._triple_added/_triple_removed a cada tripla incluída ou
+    removida em graph, venha ela do mapper, de graph += ..., de parse, de add/remove/set
+    direto. Remoções por padrão chegam tripla a tripla no store em memória.
+    """
+    _hub(graph).listeners[listener] = (graph.identifier, isinstance(graph, ConjunctiveGraph))
+
+
+def unwatch(graph: Graph, listener):
+    _hub(graph).listeners.pop(listener, None)
+
+
+def reports_removals(graph: Graph) -> bool:
+    """
+    Se toda remoção em graph chega aos ouvintes: stores que herdam Store.remove, os
+    conhecidos por chamá-lo e os de _SILENT_REMOVALS (que o hub passa a avisar).
+    Para os demais, quem depende de remoções não pode confiar nos eventos.
+    """
+    store = graph.store
+    return (
+        type(store).remove is Store.remove
+        or isinstance(store, _REPORTED_REMOVALS)
+        or (isinstance(store, _SILENT_REMOVALS) and store in _hubs)
+    )
+
+
+def remove_triples(graph: Graph, triples):
+    """Remove as triplas; os ouvintes são avisados pelo próprio store (ver _report_removals)."""
+    for triple in triples:
+        graph.remove(triple)
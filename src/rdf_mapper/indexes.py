@@ -0,0 +1,263 @@
+import bisect
+import datetime
+import decimal
+import unicodedata
+from rdflib import Literal, XSD
+
+
+def equal_terms(term) -> tuple:
+    """
+    Termos que representam o mesmo valor numa igualdade: uma string simples também
+    casa com a mesma string tipada como xsd:string (e vice-versa), como no FILTER (=).
+    """
+    if isinstance(term, Literal) and term.language is None:
+        if term.datatype is None:
+            return term, Literal(str(term), datatype=XSD.string)
+        if term.datatype == XSD.string:
+            return term, Literal(str(term))
+    return (term,)
+
+
+class HashIndex:
+    """Índice secundário valor -> sujeitos para um predicado (igualdade exata de termo RDF)."""
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+        # dict como conjunto ordenado: preserva a ordem de inserção nos resultados
+        self._subjects = {}
+
+    def build(self, graph):
+        self._subjects.clear()
+        for subject, obj in graph.subject_objects(self.predicate):
+            self.add(subject, obj)
+        return self
+
+    def add(self, subject, obj):
+        self._subjects.setdefault(obj, {})[subject] = None
+
+    def remove(self, subject, obj):
+        subjects = self._subjects.get(obj)
+        if subjects is not None:
+            subjects.pop(subject, None)
+            if not subjects:
+                del self._subjects[obj]
+
+    def lookup(self, obj):
+        first, *others = [self._subjects.get(term, {}) for term in equal_terms(obj)]
+        for subjects in others:
+            if subjects:
+                first = {**first, **subjects}
+        return first
+
+    def __len__(self):
+        return len(self._subjects)
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas e sem acentos: "São Luís" -> "sao luis"."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex(HashIndex):
+    """
+    Índice de substring para os finders *_like: além de valor -> sujeitos, guarda
+    trigrama -> valores distintos, sobre o texto normalizado (sem acento e sem caixa).
+    Uma busca intersecta as listas dos trigramas do termo e só confere a substring
+    nos valores que sobraram; termos com menos de 3 letras conferem o vocabulário.
+    """
+
+    def __init__(self, predicate):
+        super().__init__(predicate)
+        self._normalized = {}
+        self._postings = {}
+
+    def build(self, graph):
+        self._normalized.clear()
+        self._postings.clear()
+        return super().build(graph)
+
+    def add(self, subject, obj):
+        if obj not in self._subjects:
+            text = self._normalized[obj] = normalize_text(str(obj))
+            for gram in trigrams(text):
+                self._postings.setdefault(gram, set()).add(obj)
+        super().add(subject, obj)
+
+    def remove(self, subject, obj):
+        super().remove(subject, obj)
+        if obj in self._subjects or obj not in self._normalized:
+            return
+        for gram in trigrams(self._normalized.pop(obj)):
+            values = self._postings.get(gram)
+            if values is not None:
+                values.discard(obj)
+                if not values:
+                    del self._postings[gram]
+
+    def search(self, text: str) -> dict:
+        """{sujeito: valores que contêm text}, ignorando acentos e caixa."""
+        wanted = normalize_text(text)
+        grams = trigrams(wanted)
+        if grams:
+            postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+            if not postings[0]:
+                return {}
+            values = set(postings[0]).intersection(*postings[1:])
+        else:
+            values = self._normalized
+        subjects = {}
+        for value in values:
+            if wanted in self._normalized[value]:
+                for subject in self._subjects[value]:
+                    subjects.setdefault(subject, []).append(value)
+        return subjects
+
+
+def range_key(value):
+    """
+    Chave ordenável de um valor Python: números, datas, data-horas e textos ficam em
+    faixas separadas (não se comparam entre si), como no FILTER do SPARQL. None para
+    o que não tem ordem de intervalo (booleanos, None).
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return (0, value)
+    if isinstance(value, datetime.datetime):
+        return (2, value)
+    if isinstance(value, datetime.date):
+        return (1, value)
+    if isinstance(value, str):
+        return (3, value)
+    return None
+
+
+def range_rank(low, high) -> int:
+    """
+    Faixa de range_key dos limites de um intervalo (None = sem limite daquele lado, mas
+    ao menos um é obrigatório). ValueError se não tiverem ordem ou forem de tipos diferentes.
+    """
+    bounds = [range_key(value) for value in (low, high) if value is not None]
+    if not bounds or None in bounds:
+        raise ValueError("Range bounds must be numbers, dates, datetimes or strings")
+    ranks = {rank for rank, _ in bounds}
+    if len(ranks) > 1:
+        raise ValueError("Range bounds must have the same type")
+    return ranks.pop()
+
+
+def literal_range_key(obj, convert):
+    """range_key de um termo do grafo, convertido por convert; None se não entra em intervalos."""
+    if not isinstance(obj, Literal) or obj.language is not None:
+        return None
+    try:
+        value = convert(obj)
+    except (ValueError, TypeError):
+        return None
+    if isinstance(value, str) and obj.datatype not in (None, XSD.string):
+        # Tipo sem conversão (ex.: xsd:gYear): não é texto para o FILTER do SPARQL
+        return None
+    return range_key(value)
+
+
+class SortedIndex:
+    """
+    Índice ordenado para os finders _between/_gt/_lt: chaves range_key dos literais
+    convertidos (convert, ex.: RDFMapper._literal_to_python) em uma lista ordenada,
+    com sujeitos e literais em listas paralelas. Um intervalo custa duas buscas binárias
+    mais os k sujeitos devolvidos. Literais sem ordem (booleanos, com idioma) ficam de fora.
+
+    Inclusões vão para um buffer e entram na lista ordenada de uma vez, na próxima
+    consulta ou remoção: carga em lote num grafo observado não paga um insert por tripla.
+    """
+
+    def __init__(self, predicate, convert):
+        self.predicate = predicate
+        self.convert = convert
+        self._keys = []
+        self._subjects = []
+        self._objects = []
+        self._pending = []
+
+    def key(self, obj):
+        return literal_range_key(obj, self.convert)
+
+    def build(self, graph):
+        self._keys, self._subjects, self._objects = [], [], []
+        self._pending = []
+        # Conversão uma vez por termo distinto: os valores se repetem muito
+        keys = {}
+        for subject, obj in graph.subject_objects(self.predicate):
+            try:
+                key = keys[obj]
+            except KeyError:
+                key = keys[obj] = self.key(obj)
+            if key is not None:
+                self._pending.append((key, subject, obj))
+        self._flush()
+        return self
+
+    def _flush(self):
+        if not self._pending:
+            return
+        self._pending.sort(key=lambda entry: entry[0])
+        # A lista e o buffer já estão ordenados: o timsort só intercala as duas sequências
+        entries = [*zip(self._keys, self._subjects, self._objects), *self._pending]
+        entries.sort(key=lambda entry: entry[0])
+        self._pending = []
+        self._keys = [key for key, _, _ in entries]
+        self._subjects = [subject for _, subject, _ in entries]
+        self._objects = [obj for _, _, obj in entries]
+
+    def add(self, subject, obj):
+        key = self.key(obj)
+        if key is not None:
+            self._pending.append((key, subject, obj))
+
+    def remove(self, subject, obj):
+        key = self.key(obj)
+        if key is None:
+            return
+        self._flush()
+        start = bisect.bisect_left(self._keys, key)
+        stop = bisect.bisect_right(self._keys, key)
+        for position in range(start, stop):
+            if self._subjects[position] == subject and self._objects[position] == obj:
+                del self._keys[position]
+                del self._subjects[position]
+                del self._objects[position]
+                return
+
+    def range(self, low=None, high=None, include_low=True, include_high=True) -> dict:
+        """
+        {sujeito: literais no intervalo} dos valores entre low e high (valores Python;
+        None = sem limite daquele lado, mas ao menos um é obrigatório). Os dois limites
+        precisam ser do mesmo tipo (range_rank).
+        """
+        rank = range_rank(low, high)
+        self._flush()
+        keys = self._keys
+        if low is None:
+            start = bisect.bisect_left(keys, (rank,))
+        elif include_low:
+            start = bisect.bisect_left(keys, (rank, low))
+        else:
+            start = bisect.bisect_right(keys, (rank, low))
+        if high is None:
+            stop = bisect.bisect_left(keys, (rank + 1,))
+        elif include_high:
+            stop = bisect.bisect_right(keys, (rank, high))
+        else:
+            stop = bisect.bisect_left(keys, (rank, high))
+        subjects = {}
+        for subject, obj in zip(self._subjects[start:stop], self._objects[start:stop]):
+            subjects.setdefault(subject, []).append(obj)
+        return subjects
+
+    def __len__(self):
+        return len(self._keys) + len(self._pending)
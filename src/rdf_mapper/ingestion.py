@@ -0,0 +1,220 @@
+import inspect
+import math
+import os
+import time
+from collections import deque
+from itertools import count, repeat
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+from rdflib import Graph, URIRef, RDF
+from .rdf_mapper import RDFMapper
+from .streaming import nt_term, open_destination
+
+# Mapper próprio de cada processo: o mapeamento vive na classe, o plano é compilado no 1º uso
+_worker_mapper = None
+
+
+def _mapper():
+    global _worker_mapper
+    if _worker_mapper is None:
+        _worker_mapper = RDFMapper()
+    return _worker_mapper
+
+
+class IngestionStats(NamedTuple):
+    rows: int
+    triples: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else float("inf")
+
+    def __str__(self):
+        return f"{self.rows} linhas, {self.triples} triplas em {self.seconds:.2f}s ({self.rows_per_second:,.0f} linhas/s)"
+
+
+def sanitize_identifier(name: str) -> str:
+    """Mesma regra do gerador de classes: 'Regiao - Sigla' -> 'Regiao___Sigla'."""
+    return name.strip().replace(" ", "_").replace("-", "_")
+
+
+def column_mapping(entity_class, csv_columns, columns=None) -> dict:
+    """
+    Retorna {parâmetro do construtor: coluna do CSV}.
+    Sem columns explícito, casa cada coluna (sanitizada) com os parâmetros de __init__.
+    """
+    if columns is not None:
+        return dict(columns)
+    params = [name for name in inspect.signature(entity_class.__init__).parameters if name not in ("self", "uri")]
+    by_identifier = {sanitize_identifier(col): col for col in csv_columns}
+    return {param: by_identifier[param] for param in params if param in by_identifier}
+
+
+def property_columns(entity_class, mapping, csv_columns, columns=None) -> dict:
+    """Retorna {atributo mapeado: coluna}, casando colunas sanitizadas com as propriedades RDF."""
+    if columns is not None:
+        return dict(columns)
+    by_identifier = {sanitize_identifier(str(col)): col for col in csv_columns}
+    return {attr: by_identifier[attr] for attr in mapping.properties if attr in by_identifier}
+
+
+def subject_uris(index, uri_template: str) -> list:
+    """URIs dos sujeitos de um índice inteiro, montadas por concatenação vetorizada."""
+    prefix, sep, suffix = uri_template.partition("{index}")
+    if not sep:
+        raise ValueError("uri_template must contain '{index}'")
+    uris = (prefix + index.astype(str) + suffix).tolist()
+    return [URIRef(uri) for uri in uris]
+
+
+def dataframe_triples(mapper, df, entity_class, uri_template: str, columns: dict = None):
+    """
+    Gera as triplas de um DataFrame coluna a coluna, sem objeto por linha.
+    Cada coluna é fatorada (pd.factorize): só os valores distintos viram Literal,
+    e células vazias não geram tripla.
+    """
+    import numpy as np
+    import pandas as pd
+
+    mapping = mapper._mapping_for(entity_class)
+    subjects = np.array(subject_uris(df.index, uri_template), dtype=object)
+    yield from zip(subjects.tolist(), repeat(RDF.type), repeat(mapping.rdf_type))
+
+    for attr, column in property_columns(entity_class, mapping, df.columns, columns).items():
+        fget = mapping.properties[attr]
+        if fget._is_relationship:
+            convert = URIRef
+        else:
+            convert = mapper._python_to_literal
+        codes, uniques = pd.factorize(df[column])
+        terms = np.empty(len(uniques), dtype=object)
+        terms[:] = [convert(value) for value in uniques.tolist()]
+        # Gather vetorizado: sujeitos e termos das células preenchidas, sem laço por linha
+        rows = np.flatnonzero(codes >= 0)
+        yield from zip(subjects[rows].tolist(), repeat(fget._rdf_predicate), terms[codes[rows]].tolist())
+
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _map_chunk(entity_class, rows, uri_template, mapping, to_graph=True, to_ntriples=False):
+    """
+    Executado nos processos: linhas -> objetos -> triplas. Devolve as triplas como
+    tuplas de termos (to_graph), para o processo pai só fazer graph.addN, e/ou em
+    N-Triples (to_ntriples, bytes). Termos repetidos compartilham o mesmo objeto,
+    e o pickle da volta manda cada termo distinto uma vez só.
+    """
+    objs = []
+    for index, record in rows:
+        kwargs = {param: (None if _missing(record[col]) else record[col]) for param, col in mapping.items()}
+        objs.append(entity_class(uri=uri_template.format(index=index), **kwargs))
+
+    terms = {}
+    triples = [
+        (terms.setdefault(s, s), terms.setdefault(p, p), terms.setdefault(o, o))
+        for s, p, o in _mapper().iter_triples(objs)
+    ]
+    data = None
+    if to_ntriples:
+        data = "".join(f"{nt_term(s)} {nt_term(p)} {nt_term(o)} .\n" for s, p, o in triples).encode("utf-8")
+    return (triples if to_graph else None), data, len(objs), len(triples)
+
+
+def ingest_csv(entity_class, path, uri_template: str, columns: dict = None, chunksize: int = 10000,
+               workers: int = None, graph: Graph = None, destination=None, compress: bool = False,
+               **read_csv_kwargs):
+    """
+    Ingestão paralela de CSV: divide o arquivo em blocos de chunksize linhas, e cada
+    processo do pool monta os objetos da entity_class e gera as triplas. Os blocos são
+    juntados, na ordem, em graph (graph.addN das tuplas de termos, sem reparse) e/ou em
+    destination (N-Triples, caminho ou arquivo binário).
+
+    uri_template recebe o índice da linha, ex.: f"{NAMESPACE}:{{index}}".
+    workers=1 processa tudo no processo atual. Demais kwargs vão para pandas.read_csv.
+    Retorna (graph, IngestionStats).
+    """
+    import pandas as pd
+
+    if graph is None and destination is None:
+        graph = Graph()
+    workers = workers or os.cpu_count() or 1
+
+    stream, close = open_destination(destination, compress) if destination is not None else (None, None)
+    rows = triples = 0
+    start = time.perf_counter()
+
+    def merge(result):
+        nonlocal rows, triples
+        chunk, data, chunk_rows, chunk_triples = result
+        if graph is not None:
+            graph.addN((s, p, o, graph) for s, p, o in chunk)
+        if stream is not None:
+            stream.write(data)
+        rows += chunk_rows
+        triples += chunk_triples
+
+    try:
+        reader = pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs)
+        mapping = None
+        targets = {"to_graph": graph is not None, "to_ntriples": stream is not None}
+        if workers == 1:
+            for chunk in reader:
+                mapping = mapping or column_mapping(entity_class, chunk.columns, columns)
+                merge(_map_chunk(entity_class, _records(chunk), uri_template, mapping, **targets))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # No máximo 2 blocos por processo em voo, para não ler o CSV inteiro adiantado
+                pending = deque()
+                for chunk in reader:
+                    mapping = mapping or column_mapping(entity_class, chunk.columns, columns)
+                    pending.append(executor.submit(
+                        _map_chunk, entity_class, _records(chunk), uri_template, mapping, **targets))
+                    if len(pending) >= workers * 2:
+                        merge(pending.popleft().result())
+                while pending:
+                    merge(pending.popleft().result())
+    finally:
+        if close is not None:
+            close()
+
+    return graph, IngestionStats(rows, triples, time.perf_counter() - start)
+
+
+def ingest_csv_chunked(entity_class, path, graph: Graph, uri_template: str, columns: dict = None,
+                       chunksize: int = 50000, commit_every: int = 1, **read_csv_kwargs):
+    """
+    Ingestão com memória limitada para um store persistente (ex.: open_sqlite_graph).
+    Lê o CSV em blocos fixos, mapeia cada bloco pelos rdf_property da entity_class
+    (dataframe_triples, sem objeto por linha) e grava em lote, com commit a cada
+    commit_every blocos. Só um bloco fica em memória por vez.
+    Retorna IngestionStats; o grafo já pode ser consultado com RDFRepository.
+    """
+    import pandas as pd
+
+    store = graph.store
+    add_many = getattr(store, "add_many", None)
+    rows = triples = 0
+    start = time.perf_counter()
+
+    for number, chunk in enumerate(pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs), start=1):
+        # zip com um contador conta as triplas sem materializar o bloco
+        counter = count()
+        chunk_triples = (triple for triple, _ in zip(
+            dataframe_triples(_mapper(), chunk, entity_class, uri_template, columns), counter))
+        if add_many is not None:
+            add_many(chunk_triples)
+        else:
+            graph.addN((s, p, o, graph) for s, p, o in chunk_triples)
+        rows += len(chunk)
+        triples += next(counter)
+        if number % commit_every == 0:
+            graph.commit()
+    graph.commit()
+
+    return IngestionStats(rows, triples, time.perf_counter() - start)
+
+
+def _records(chunk):
+    return list(zip(chunk.index.tolist(), chunk.to_dict("records")))
@@ -0,0 +1,205 @@
+import base64
+import bisect
+import json
+from typing import NamedTuple
+from rdflib import Literal, RDF, XSD
+
+_NUMERIC_TYPES = {
+    XSD.integer, XSD.int, XSD.long, XSD.short, XSD.decimal, XSD.double, XSD.float,
+    XSD.nonNegativeInteger, XSD.positiveInteger,
+}
+# Faixa de sort_key dos sujeitos sem valor em order_by: ficam no fim nas duas direções
+MISSING = 2
+
+
+class Page(NamedTuple):
+    items: list
+    # Opaco; None quando não há próxima página
+    cursor: str
+
+
+def sort_key(term) -> tuple:
+    """
+    Chave de ordenação serializável: números pelo valor, depois os demais termos pelo
+    texto; sem valor (None) é a faixa MISSING.
+    """
+    if term is None:
+        return (MISSING, "")
+    if isinstance(term, Literal) and term.datatype in _NUMERIC_TYPES:
+        try:
+            return (0, float(term))
+        except ValueError:
+            pass
+    return (1, str(term))
+
+
+def encode_cursor(ordering, key) -> str:
+    data = json.dumps({"o": ordering, "k": key}, separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, ordering) -> tuple:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        key, cursor_order = tuple(data["k"]), data["o"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor") from None
+    if cursor_order != list(ordering):
+        raise ValueError("Cursor was created with a different order_by/order")
+    return key
+
+
+class OrderIndex:
+    """
+    Ordem de página mantida para page_by_* sobre os sujeitos de rdf_type: lista ordenada
+    de chaves, com sujeitos em lista paralela. Para rdf:type a chave é (0, sujeito)
+    (ordem sem order_by); para outro predicado, (*sort_key(valor), sujeito) de cada
+    tripla, mais uma entrada MISSING para cada sujeito sem valor.
+    Como no SortedIndex, inclusões esperam num buffer até a próxima leitura; sujeitos
+    que perderam o valor (ou ganharam o tipo) são conferidos no grafo nessa hora.
+    """
+
+    def __init__(self, predicate, rdf_type):
+        self.predicate = predicate
+        self.rdf_type = rdf_type
+        self.graph = None
+        self._keys = []
+        self._subjects = []
+        self._pending = []
+        # Sujeitos que podem ter ficado sem valor: viram entrada MISSING no _flush
+        self._check = set()
+
+    @property
+    def by_subject(self) -> bool:
+        return self.predicate == RDF.type
+
+    def key(self, subject, obj):
+        if self.by_subject:
+            return (0, str(subject))
+        return (*sort_key(obj), str(subject))
+
+    def subject_key(self, subject, descending=False):
+        """
+        Chave atual do sujeito, lida no grafo. Com vários valores vale o menor em ASC
+        e o maior em DESC; sem valor, a faixa MISSING.
+        """
+        if self.by_subject:
+            return (0, str(subject))
+        current = [sort_key(value) for value in self.graph.objects(subject, self.predicate)]
+        return (*((max if descending else min)(current) if current else sort_key(None)), str(subject))
+
+    def build(self, graph):
+        self.graph = graph
+        self._keys, self._subjects, self._pending = [], [], []
+        self._check = set(graph.subjects(RDF.type, self.rdf_type))
+        if self.by_subject:
+            self._pending = [(self.key(subject, None), subject) for subject in self._check]
+            self._check = set()
+        else:
+            for subject, obj in graph.subject_objects(self.predicate):
+                self._pending.append((self.key(subject, obj), subject))
+                self._check.discard(subject)
+        self._flush()
+        return self
+
+    def _flush(self):
+        graph, predicate = self.graph, self.predicate
+        for subject in self._check:
+            if (subject, RDF.type, self.rdf_type) in graph and next(graph.objects(subject, predicate), None) is None:
+                self._pending.append((self.key(subject, None), subject))
+        self._check = set()
+        if not self._pending:
+            return
+        self._pending.sort(key=lambda entry: entry[0])
+        # A lista e o buffer já estão ordenados: o timsort só intercala as duas sequências
+        entries = [*zip(self._keys, self._subjects), *self._pending]
+        entries.sort(key=lambda entry: entry[0])
+        self._pending = []
+        self._keys = [key for key, _ in entries]
+        self._subjects = [subject for _, subject in entries]
+
+    def add(self, subject, obj):
+        if not self.by_subject:
+            self._pending.append((self.key(subject, obj), subject))
+        elif obj == self.rdf_type:
+            self._pending.append((self.key(subject, obj), subject))
+
+    def touch(self, subject, rdf_type):
+        """Sujeito que ganhou o rdf:type: se não tiver valor, entra como MISSING."""
+        if not self.by_subject and rdf_type == self.rdf_type:
+            self._check.add(subject)
+
+    def remove(self, subject, obj):
+        if self.by_subject and obj != self.rdf_type:
+            return
+        self._flush()
+        key = self.key(subject, obj)
+        position = bisect.bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+            del self._subjects[position]
+        if not self.by_subject:
+            self._check.add(subject)
+
+    def walk(self, after=None, descending=False, band=None):
+        """
+        (chave, sujeito) em ordem, a partir da primeira chave depois de after (busca
+        binária); com band, só as chaves dessa faixa de sort_key.
+        """
+        self._flush()
+        keys, subjects = self._keys, self._subjects
+        low, high = 0, len(keys)
+        if band is not None:
+            low, high = bisect.bisect_left(keys, (band,)), bisect.bisect_left(keys, (band + 1,))
+        if descending:
+            stop = high if after is None else min(high, bisect.bisect_left(keys, after))
+            positions = range(stop - 1, low - 1, -1)
+        else:
+            start = low if after is None else max(low, bisect.bisect_right(keys, after))
+            positions = range(start, high)
+        for position in positions:
+            yield keys[position], subjects[position]
+
+    def __len__(self):
+        self._flush()
+        return len(self._keys)
+
+
+def _follows(key, after, descending) -> bool:
+    if key[0] != after[0]:
+        return key[0] > after[0]
+    return key < after if descending else key > after
+
+
+def seek(order, after=None, descending=False):
+    """
+    (chave, sujeito) na ordem de página, retomando depois da chave after (busca
+    binária no OrderIndex). As faixas de sort_key vêm sempre na mesma ordem (números,
+    textos, sem valor), cada uma na direção pedida. Entradas que o grafo não confirma
+    mais (valor trocado ou removido) são puladas.
+    """
+    if order.by_subject:
+        yield from order.walk(after, descending)
+        return
+    previous = None
+    for band in (0, 1, MISSING):
+        if after is not None and band < after[0]:
+            continue
+        start = after if after is not None and band == after[0] else None
+        for key, subject in order.walk(start, descending, band):
+            # Chaves iguais são vizinhas: o mesmo valor em duas formas só entra uma vez
+            if key != previous and order.subject_key(subject, descending) == key:
+                previous = key
+                yield key, subject
+
+
+def sort_page(order, subjects, after=None, descending=False) -> list:
+    """(chave, sujeito) de poucos sujeitos já conhecidos, na mesma ordem de seek."""
+    keyed = [(order.subject_key(subject, descending), subject) for subject in subjects]
+    if after is not None:
+        keyed = [item for item in keyed if _follows(item[0], after, descending)]
+    keyed.sort(key=lambda item: item[0], reverse=descending)
+    if descending:
+        # Estável: só recoloca as faixas em ordem crescente
+        keyed.sort(key=lambda item: item[0][0])
+    return keyed
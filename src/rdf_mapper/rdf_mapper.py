@@ -1,22 +1,200 @@
 from rdflib import Graph, URIRef, Literal, Namespace, RDF, XSD, BNode
 from typing import Any, Type
 import datetime
+import inspect
+import operator
+import weakref
 from rdflib.namespace import RDF
 from pyshacl import validate
+from .graph_events import watch
+from .streaming import WRITERS, TurtleWriter, open_destination
+from .validation import IncrementalValidation
+
+
+def _mapped_properties(cls):
+    """Varre a classe uma única vez e devolve {atributo: getter} das propriedades RDF."""
+    properties = {}
+    for attr in dir(cls):
+        prop = getattr(cls, attr, None)
+        if isinstance(prop, property) and getattr(prop.fget, '_is_rdf_property', False):
+            properties[attr] = prop.fget
+    return properties
+
+
+def _class_cells(value):
+    """Funções do namespace que podem ter a célula __class__ (super() sem argumentos)."""
+    if isinstance(value, (classmethod, staticmethod)):
+        value = value.__func__
+    if isinstance(value, property):
+        return [func for func in (value.fget, value.fset, value.fdel) if func is not None]
+    return [value] if inspect.isfunction(value) else []
+
+
+def _slotted(cls):
+    """
+    Recria a classe com __slots__ derivados dos decoradores: uri, o armazenamento
+    _<campo> de cada propriedade/relacionamento e _rdf_dirty (usado pela Session).
+    As instâncias não têm __dict__; atribuir qualquer outro atributo dá AttributeError.
+    As células __class__ dos métodos passam a apontar para a classe nova, como em
+    dataclass(slots=True), para que super() sem argumentos continue funcionando.
+    """
+    if "__slots__" in cls.__dict__:
+        return cls
+    inherited = {slot for base in cls.__mro__[1:] for slot in base.__dict__.get("__slots__", ())}
+    slots = ["uri", *(f"_{fget._attr_name}" for fget in _mapped_properties(cls).values()), "_rdf_dirty"]
+    namespace = dict(cls.__dict__)
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+    namespace["__slots__"] = tuple(slot for slot in slots if slot not in inherited)
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    for value in namespace.values():
+        for func in _class_cells(value):
+            for name, cell in zip(func.__code__.co_freevars, func.__closure__ or ()):
+                if name == "__class__" and cell.cell_contents is cls:
+                    cell.cell_contents = slotted
+    return slotted
+
+
+def _shape_signature(cls):
+    """Tudo o que to_shacl lê da classe: se mudar, o shape em cache é refeito."""
+    try:
+        parameters = inspect.signature(cls.__init__).parameters
+    except (TypeError, ValueError):
+        parameters = {}
+    return (
+        cls.__name__,
+        cls._rdf_type_uri,
+        tuple(
+            (attr, fget._rdf_predicate, fget._min_count, fget._max_count,
+             parameters[attr].annotation if attr in parameters else None)
+            for attr, fget in _mapped_properties(cls).items()
+        ),
+    )
+
+
+FETCH_MODES = ("eager", "lazy")
+
+
+def _check_fetch(fetch):
+    if fetch not in FETCH_MODES:
+        raise ValueError(f"fetch must be one of {FETCH_MODES}, got '{fetch}'")
+
+
+def _mark_dirty(obj, attr_name):
+    """Registra a alteração só em instâncias ligadas a uma Session (que têm _rdf_dirty)."""
+    dirty = getattr(obj, "_rdf_dirty", None)
+    if dirty is not None:
+        dirty.add(attr_name)
+
+
+class _LazyRelationship:
+    """
+    Guardado no atributo de um relacionamento fetch="lazy" durante a hidratação.
+    O getter da propriedade o resolve contra o grafo de origem no primeiro acesso.
+    """
+    __slots__ = ("_load",)
+
+    def __init__(self, load):
+        self._load = load
+
+    def load(self):
+        return self._load()
+
+
+class _EntityMapping:
+    """
+    Plano de (de)serialização compilado uma vez por classe.
+    Guarda apenas as propriedades mapeadas, de modo que o trabalho por
+    instância não precise mais de dir()/getattr() sobre todos os atributos.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.rdf_type = cls._rdf_type_uri
+        self.properties = _mapped_properties(cls)
+        self.literals = []
+        self.one_to_one = []
+        self.one_to_many = []
+        for attr, fget in self.properties.items():
+            field = (attr, f"_{fget._attr_name}", fget._rdf_predicate, fget)
+            if not fget._is_relationship:
+                self.literals.append(field)
+            elif fget._relationship_type == 'one_to_one':
+                self.one_to_one.append(field)
+            else:
+                self.one_to_many.append(field)
+
+        self._literal_getter = self._compile_getter([f[0] for f in self.literals])
+        self._one_to_one_getter = self._compile_getter([f[0] for f in self.one_to_one])
+        self._one_to_many_getter = self._compile_getter([f[0] for f in self.one_to_many])
+        self._targets = {}
+
+    @staticmethod
+    def _compile_getter(attrs):
+        if not attrs:
+            return lambda obj: ()
+        getter = operator.attrgetter(*attrs)
+        if len(attrs) == 1:
+            return lambda obj: (getter(obj),)
+        return getter
+
+    def target_class(self, attr):
+        """Resolve (e memoriza) o target_class declarado como lambda no relacionamento."""
+        try:
+            return self._targets[attr]
+        except KeyError:
+            target = self.properties[attr]._target_class()
+            self._targets[attr] = target
+            return target
+
+    def literal_values(self, obj):
+        return zip(self.literals, self._literal_getter(obj))
+
+    def one_to_one_values(self, obj):
+        return zip(self.one_to_one, self._one_to_one_getter(obj))
+
+    def one_to_many_values(self, obj):
+        return zip(self.one_to_many, self._one_to_many_getter(obj))
+
 
 class RDFMapper:
-    def __init__(self):
+    def __init__(self, compiled: bool = True):
         self._entities = {}
-
-    def rdf_entity(self, rdf_type_uri: str):
+        self._mappings = {}
+        # {classe: (assinatura, shape)} de to_shacl, refeito quando o mapeamento muda
+        self._shapes = {}
+        # {grafo: {shape: IncrementalValidation}}; some junto com o grafo (watch não o prende)
+        self._incremental = weakref.WeakKeyDictionary()
+        # compiled=False mantém o caminho reflexivo original (dir/getattr por instância),
+        # útil apenas como linha de base nos benchmarks.
+        self.compiled = compiled
+
+    def rdf_entity(self, rdf_type_uri: str, slots: bool = False):
+        """
+        slots=True: modo compacto, a classe é recriada com __slots__ (ver _slotted),
+        sem __dict__ por instância. Vale para from_rdf e para os finders.
+        """
         def wrapper(cls):
+            if slots:
+                cls = _slotted(cls)
             cls._rdf_type_uri = URIRef(rdf_type_uri)
-            cls._rdf_properties = {}
+            cls._rdf_properties = _mapped_properties(cls)
             self._entities[cls.__name__] = cls
+            self._mappings[cls] = _EntityMapping(cls)
             return cls
         return wrapper
 
-    def rdf_property(self, predicate_uri: str, minCount: int = 0, maxCount: int = 1):
+    def _mapping_for(self, cls) -> _EntityMapping:
+        """Retorna o plano compilado da classe, compilando no primeiro uso se necessário."""
+        try:
+            return self._mappings[cls]
+        except KeyError:
+            mapping = self._mappings[cls] = _EntityMapping(cls)
+            return mapping
+
+    def rdf_property(self, predicate_uri: str, minCount: int = 0, maxCount: int = 1, index: bool = False,
+                     text_index: bool = False, range_index: bool = False):
         def decorator(func):
             attr_name = func.__name__
 
@@ -25,53 +203,74 @@ class RDFMapper:
 
             def setter(self, value):
                 setattr(self, f"_{attr_name}", value)
+                _mark_dirty(self, attr_name)
 
             getter._rdf_predicate = URIRef(predicate_uri)
+            getter._attr_name = attr_name
             getter._is_rdf_property = True
             getter._is_relationship = False
             getter._min_count = minCount
             getter._max_count = maxCount
+            getter._index = index
+            getter._text_index = text_index
+            getter._range_index = range_index
 
             return property(getter, setter)
 
         return decorator
 
-    def rdf_one_to_one(self, predicate_uri: str, target_class: Type):
+    def rdf_one_to_one(self, predicate_uri: str, target_class: Type, fetch: str = "eager"):
+        _check_fetch(fetch)
+
         def decorator(func):
             attr_name = func.__name__
 
-           
             def getter(self):
-                return getattr(self, f"_{attr_name}")
+                value = getattr(self, f"_{attr_name}")
+                if isinstance(value, _LazyRelationship):
+                    value = value.load()
+                    setattr(self, f"_{attr_name}", value)
+                return value
 
             def setter(self, value):
                 setattr(self, f"_{attr_name}", value)
-                
+                _mark_dirty(self, attr_name)
 
             getter._rdf_predicate = URIRef(predicate_uri)
+            getter._attr_name = attr_name
             getter._is_rdf_property = True
             getter._is_relationship = True
             getter._relationship_type = 'one_to_one'
             getter._target_class = target_class
+            getter._fetch = fetch
             return property(getter, setter)
 
         return decorator
 
-    def rdf_one_to_many(self, predicate_uri: str, target_class: Type):
+    def rdf_one_to_many(self, predicate_uri: str, target_class: Type, fetch: str = "eager"):
+        _check_fetch(fetch)
+
         def decorator(func):
             attr_name = func.__name__
-           
+
             def getter(self):
-                return getattr(self, f"_{attr_name}")
+                value = getattr(self, f"_{attr_name}")
+                if isinstance(value, _LazyRelationship):
+                    value = value.load()
+                    setattr(self, f"_{attr_name}", value)
+                return value
 
             def setter(self, value):
                 setattr(self, f"_{attr_name}", value)
+                _mark_dirty(self, attr_name)
 
             getter._rdf_predicate = URIRef(predicate_uri)
+            getter._attr_name = attr_name
             getter._is_rdf_property = True
             getter._is_relationship = True
             getter._relationship_type = 'one_to_many'
             getter._target_class = target_class
+            getter._fetch = fetch
             return property(getter, setter)
 
         return decorator
@@ -85,10 +284,10 @@ class RDFMapper:
             return Literal(value, datatype=XSD.integer)
         elif isinstance(value, float):
             return Literal(value, datatype=XSD.double)
-        elif isinstance(value, datetime.date):
-            return Literal(value.isoformat(), datatype=XSD.date)
         elif isinstance(value, datetime.datetime):
             return Literal(value.isoformat(), datatype=XSD.dateTime)
+        elif isinstance(value, datetime.date):
+            return Literal(value.isoformat(), datatype=XSD.date)
         else:
             return Literal(value)
 
@@ -111,15 +310,198 @@ class RDFMapper:
         else:
             return val
 
-    def to_rdf(self, obj: Any, base_uri: str = None, visited=None) -> Graph:
+    def to_rdf(self, obj: Any, base_uri: str = None, visited=None, graph: Graph = None) -> Graph:
         if visited is None:
             visited = set()
+        if not self.compiled:
+            return self._to_rdf_reflective(obj, base_uri, visited)
+        if graph is None:
+            graph = Graph()
+
+        subject = URIRef(obj.uri if hasattr(obj, 'uri') else base_uri)
+        if subject in visited:
+            # Já serializado antes, só cria o link para evitar loop
+            graph.add((subject, RDF.type, self._mapping_for(type(obj)).rdf_type))
+            return graph
 
+        self._write(graph, self.iter_triples([obj], visited=visited, base_uri=base_uri))
+        return graph
+
+    def iter_triples(self, objs, visited=None, base_uri: str = None):
+        """
+        Gera as triplas dos objetos e de todos os relacionados.
+        Usa uma fila explícita no lugar da recursão; cada sujeito é emitido uma única vez.
+        """
+        if visited is None:
+            visited = set()
+        to_literal = self._python_to_literal
+        mapping_for = self._mapping_for
+        pending = []
+
+        for root in objs:
+            pending.append((root, URIRef(root.uri if hasattr(root, 'uri') else base_uri)))
+            while pending:
+                obj, subject = pending.pop()
+                if subject in visited:
+                    continue
+                visited.add(subject)
+
+                mapping = mapping_for(type(obj))
+                yield (subject, RDF.type, mapping.rdf_type)
+                for (_, _, pred, _), val in mapping.literal_values(obj):
+                    if val is not None:
+                        yield (subject, pred, to_literal(val))
+                for (_, _, pred, _), val in mapping.one_to_one_values(obj):
+                    if val:
+                        target = URIRef(val.uri)
+                        yield (subject, pred, target)
+                        pending.append((val, target))
+                for (_, _, pred, _), val in mapping.one_to_many_values(obj):
+                    if isinstance(val, list):
+                        for item in val:
+                            target = URIRef(item.uri)
+                            yield (subject, pred, target)
+                            pending.append((item, target))
+
+    def dataframe_to_rdf(self, df, cls: Type, uri_template: str, columns: dict = None,
+                         graph: Graph = None) -> Graph:
+        """
+        Mapeia um DataFrame do pandas direto para triplas, usando os rdf_property de cls,
+        sem criar um objeto por linha. uri_template recebe o índice da linha (ex.: "...:{index}").
+        columns ({atributo: coluna}) é opcional; por padrão casa colunas sanitizadas
+        ('Estado - Sigla' -> Estado___Sigla) com os atributos mapeados.
+        """
+        from .ingestion import dataframe_triples
+
+        if graph is None:
+            graph = Graph()
+        self._write(graph, dataframe_triples(self, df, cls, uri_template, columns))
+        return graph
+
+    def serialize_stream(self, objs, destination, format: str = "nt", prefixes: dict = None,
+                         compress: bool = False, dedupe: bool = False) -> int:
+        """
+        Serializa um iterável de objetos mapeados direto para arquivo/socket, sem montar um Graph.
+        format: "nt" (N-Triples) ou "turtle" (com a tabela fixa de prefixos em prefixes).
+        compress=True grava gzip. Por padrão só os relacionamentos de cada objeto são
+        deduplicados, mantendo a memória limitada; dedupe=True deduplica o fluxo inteiro
+        ao custo de guardar todos os sujeitos já emitidos.
+        Retorna o número de triplas escritas.
+        """
+        writer_cls = WRITERS.get(format.lower())
+        if writer_cls is None:
+            raise ValueError(f"Unsupported stream format '{format}'")
+
+        stream, close = open_destination(destination, compress)
+        try:
+            if writer_cls is TurtleWriter:
+                writer = TurtleWriter(stream, prefixes)
+            else:
+                writer = writer_cls(stream)
+            writer.header()
+            shared = set() if dedupe else None
+            for obj in objs:
+                for triple in self.iter_triples([obj], visited=shared if dedupe else set()):
+                    writer.write(triple)
+            writer.flush()
+        finally:
+            close()
+        return writer.count
+
+    @staticmethod
+    def _write(graph, triples):
+        """Grava as triplas no grafo (ou em qualquer destino com add) sem grafos intermediários."""
+        if isinstance(graph, Graph):
+            graph.addN((s, p, o, graph) for s, p, o in triples)
+        else:
+            for triple in triples:
+                graph.add(triple)
+
+    def from_rdf(self, graph: Graph, cls: Type, subject_uri: str, visited=None) -> Any:
+        if visited is None:
+            visited = {}
+        if not self.compiled:
+            return self._from_rdf_reflective(graph, cls, subject_uri, visited)
+        return self.from_rdf_many(graph, cls, [subject_uri], visited)[0]
+
+    def from_rdf_many(self, graph: Graph, cls: Type, subject_uris, visited=None) -> list:
+        """
+        Hidrata vários sujeitos (e seus relacionados) em lote.
+        Cada sujeito é lido com uma única consulta ao índice (predicate_objects),
+        em vez de um graph.value/graph.objects por propriedade; relacionados entram
+        numa fila explícita e são lidos uma única vez, mesmo se compartilhados.
+        Cada literal distinto é convertido uma vez no lote, e as instâncias
+        compartilham o valor Python (imutável) em vez de uma cópia cada.
+        """
+        if visited is None:
+            visited = {}
+        mapping_for = self._mapping_for
+        pending = []
+        converted = {}
+
+        def instance_for(subject, target_cls):
+            instance = visited.get(subject)
+            if instance is None:
+                instance = target_cls.__new__(target_cls)
+                instance.uri = subject
+                visited[subject] = instance
+                pending.append((instance, mapping_for(target_cls)))
+            return instance
+
+        results = [instance_for(URIRef(uri), cls) for uri in subject_uris]
+        while pending:
+            instance, mapping = pending.pop()
+            self._hydrate(graph, instance, mapping, instance_for, visited, converted)
+        return results
+
+    def _hydrate(self, graph: Graph, instance, mapping: _EntityMapping, instance_for, visited, converted):
+        subject = instance.uri
+        values = {}
+        for pred, obj in graph.predicate_objects(subject):
+            values.setdefault(pred, []).append(obj)
+
+        to_python = self._literal_to_python
+        for _, storage, pred, _ in mapping.literals:
+            objs = values.get(pred)
+            if not objs:
+                setattr(instance, storage, None)
+                continue
+            try:
+                value = converted[objs[0]]
+            except KeyError:
+                value = converted[objs[0]] = to_python(objs[0])
+            setattr(instance, storage, value)
+        for attr, storage, pred, fget in mapping.one_to_one:
+            objs = values.get(pred)
+            if not objs:
+                target = None
+            elif fget._fetch == "lazy":
+                target = self._lazy(graph, mapping.target_class(attr), objs[:1], visited, single=True)
+            else:
+                target = instance_for(objs[0], mapping.target_class(attr))
+            setattr(instance, storage, target)
+        for attr, storage, pred, fget in mapping.one_to_many:
+            target_cls = mapping.target_class(attr)
+            objs = values.get(pred, ())
+            if objs and fget._fetch == "lazy":
+                targets = self._lazy(graph, target_cls, objs, visited)
+            else:
+                targets = [instance_for(obj, target_cls) for obj in objs]
+            setattr(instance, storage, targets)
+
+    def _lazy(self, graph: Graph, target_cls: Type, refs, visited, single=False) -> _LazyRelationship:
+        """Adia a hidratação dos alvos; reaproveita o visited para manter a identidade dos objetos."""
+        def load():
+            targets = self.from_rdf_many(graph, target_cls, refs, visited)
+            return targets[0] if single else targets
+        return _LazyRelationship(load)
+
+    def _to_rdf_reflective(self, obj: Any, base_uri: str, visited) -> Graph:
+        """Serialização por reflexão (dir/getattr em cada instância); linha de base dos benchmarks."""
         graph = Graph()
         subject = URIRef(obj.uri if hasattr(obj, 'uri') else base_uri)
 
         if subject in visited:
-            # Já serializado antes, só cria o link para evitar loop
             graph.add((subject, RDF.type, obj._rdf_type_uri))
             return graph
 
@@ -134,21 +516,19 @@ class RDFMapper:
                 if getattr(prop.fget, '_is_relationship', False):
                     if prop.fget._relationship_type == 'one_to_one' and val:
                         graph.add((subject, pred, URIRef(val.uri)))
-                        graph += self.to_rdf(val, visited=visited)
+                        graph += self._to_rdf_reflective(val, None, visited)
                     elif prop.fget._relationship_type == 'one_to_many' and isinstance(val, list):
                         for item in val:
                             graph.add((subject, pred, URIRef(item.uri)))
-                            graph += self.to_rdf(item, visited=visited)
+                            graph += self._to_rdf_reflective(item, None, visited)
                 else:
                     if val is not None:
                         graph.add((subject, pred, self._python_to_literal(val)))
 
         return graph
 
-    def from_rdf(self, graph: Graph, cls: Type, subject_uri: str, visited=None) -> Any:
-        if visited is None:
-            visited = {}
-
+    def _from_rdf_reflective(self, graph: Graph, cls: Type, subject_uri: str, visited) -> Any:
+        """Desserialização por reflexão; linha de base dos benchmarks."""
         subject = URIRef(subject_uri)
 
         if subject in visited:
@@ -167,28 +547,35 @@ class RDFMapper:
                     if prop.fget._relationship_type == 'one_to_one':
                         obj_ref = graph.value(subject, pred)
                         if obj_ref:
-                            setattr(instance, attr, self.from_rdf(graph, target_cls, str(obj_ref), visited))
+                            setattr(instance, attr, self._from_rdf_reflective(graph, target_cls, str(obj_ref), visited))
                     elif prop.fget._relationship_type == 'one_to_many':
                         objs = []
                         for obj_ref in graph.objects(subject, pred):
-                            objs.append(self.from_rdf(graph, target_cls, str(obj_ref), visited))
+                            objs.append(self._from_rdf_reflective(graph, target_cls, str(obj_ref), visited))
                         setattr(instance, attr, objs)
                 else:
                     val = graph.value(subject, pred)
                     setattr(instance, attr, self._literal_to_python(val))
 
         return instance
-    
-    def to_rdf_many(self, objs: list) -> Graph:
-        graph = Graph()
+
+    def to_rdf_many(self, objs: list, graph: Graph = None) -> Graph:
+        """
+        Serializa todos os objetos em um único grafo.
+        Se graph for informado (Graph ou outro destino com add), as triplas são gravadas nele.
+        """
+        if graph is None:
+            graph = Graph()
         visited = set()
-        for obj in objs:
-            graph += self.to_rdf(obj, visited=visited)
+        if not self.compiled:
+            for obj in objs:
+                graph += self.to_rdf(obj, visited=visited)
+            return graph
+        self._write(graph, self.iter_triples(objs, visited=visited))
         return graph
 
 
     def to_shacl(self, cls):
-        import inspect
         shape_graph = Graph()
         SH = Namespace("http://www.w3.org/ns/shacl#")
         ns_ex = Namespace("http://example.org/shape/")
@@ -234,23 +621,51 @@ class RDFMapper:
                 shape_graph.add((prop_bnode, SH.maxCount, Literal(max_count)))
         return shape_graph
     
-    def validate(self, data_graph: Graph, shacl_graph: Graph = None, entity_class=None, **kwargs):
+    def shape_for(self, cls) -> Graph:
+        """Shape de to_shacl(cls) em cache; refeito se as propriedades mapeadas ou os tipos do __init__ mudarem."""
+        signature = _shape_signature(cls)
+        cached = self._shapes.get(cls)
+        if cached is None or cached[0] != signature:
+            cached = self._shapes[cls] = (signature, self.to_shacl(cls))
+        return cached[1]
+
+    def validate(self, data_graph: Graph, shacl_graph: Graph = None, entity_class=None, incremental: bool = False,
+                 **kwargs):
         """
         Valida o grafo RDF usando SHACL.
-        Se shacl_graph não for informado, gera o SHACL da entity_class.
+        Se shacl_graph não for informado, usa o SHACL da entity_class (gerado uma vez, ver shape_for).
+        incremental=True: a primeira chamada valida o grafo inteiro e passa a acompanhar
+        suas alterações; as seguintes só revalidam os sujeitos incluídos/alterados desde
+        então e os que ainda violavam o shape (ver IncrementalValidation). O resultado
+        cobre o grafo todo, como na validação completa. Só se aplica ao SHACL gerado:
+        com shacl_graph informado (restrições que podem olhar além do nó foco), a
+        validação é sempre completa.
         """
         if shacl_graph is None:
             if entity_class is None:
                 raise ValueError("Você deve informar entity_class para gerar o SHACL automaticamente.")
-            shacl_graph = self.to_shacl(entity_class)
-
-        conforms, results_graph, results_text = validate(
-            data_graph=data_graph,
-            shacl_graph=shacl_graph,
-            inference=kwargs.get('inference', 'rdfs'),
-            abort_on_error=kwargs.get('abort_on_error', False),
-            meta_shacl=kwargs.get('meta_shacl', False),
-            advanced=kwargs.get('advanced', True),
-            debug=kwargs.get('debug', False)
-        )
-        return conforms, results_graph, results_text
\ No newline at end of file
+            shacl_graph = self.shape_for(entity_class)
+        else:
+            incremental = False
+
+        options = {
+            'inference': kwargs.get('inference', 'rdfs'),
+            'abort_on_error': kwargs.get('abort_on_error', False),
+            'meta_shacl': kwargs.get('meta_shacl', False),
+            'advanced': kwargs.get('advanced', True),
+            'debug': kwargs.get('debug', False),
+        }
+
+        def run(data):
+            return validate(data_graph=data, shacl_graph=shacl_graph, **options)
+
+        if not incremental:
+            return run(data_graph)
+
+        states = self._incremental.setdefault(data_graph, {})
+        state = states.get(entity_class)
+        options_key = tuple(sorted(options.items()))
+        if state is None or state.shape is not shacl_graph or state.options != options_key:
+            state = states[entity_class] = IncrementalValidation(shacl_graph, options_key)
+            watch(data_graph, state)
+        return state.run(data_graph, run)
\ No newline at end of file
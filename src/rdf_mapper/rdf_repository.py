@@ -1,123 +1,706 @@
+import math
 import re
+from collections import namedtuple
+from functools import lru_cache
+from itertools import chain, islice
+from typing import NamedTuple
+from rdflib import URIRef, Literal, Variable, RDF
+from rdflib.plugins.sparql import prepareQuery
+from . import aggregation
+from .backends import Backend, MemoryBackend
+from .cache import CacheInfo, ResultCache, type_dependency
+from .graph_events import watch
+from .indexes import (
+    HashIndex, SortedIndex, TrigramIndex, equal_terms, literal_range_key, normalize_text, range_rank,
+)
+from .pagination import OrderIndex, Page, decode_cursor, encode_cursor, seek, sort_page
+from .session import Session
+
+_DYNAMIC_METHOD = re.compile(r'^(find_by|count_by|page_by|iter_by)_(.+)$')
+# Padrões _like com estes caracteres são regex de verdade: vão para o SPARQL
+_REGEX_SPECIAL = re.compile(r'[.^$*+?{}\[\]\\|()]')
+# Sufixos de campo nos nomes dos finders: find_by_name_like, find_by_price_between...
+_SUFFIXES = ("like", "between", "gt", "lt")
+# Comparação SPARQL de cada sufixo de intervalo (lo/hi são os limites ligados). O rdflib
+# ordena texto contra número em vez de dar erro: o valor precisa ser do tipo do limite
+_RANGE_FILTERS = {
+    "between": "?{v} >= ?lo_{f} && ?{v} <= ?hi_{f}",
+    "gt": "?{v} > ?lo_{f}",
+    "lt": "?{v} < ?hi_{f}",
+}
+_RANGE_TYPE_GUARD = "(isNumeric(?{v}) && isNumeric(?{b}) || datatype(?{v}) = datatype(?{b}))"
+
+
+def _split_field(cls, field):
+    """(campo, sufixo) de um termo de finder; um rdf_property com o nome inteiro tem precedência."""
+    if not hasattr(getattr(cls, field, None), 'fget'):
+        for suffix in _SUFFIXES:
+            if field.endswith(f"_{suffix}"):
+                return field[:-len(suffix) - 1], suffix
+    return field, None
+
+
+class _Condition(NamedTuple):
+    field: str
+    predicate: URIRef
+    is_relationship: bool
+    like: bool
+    var: Variable
+    # between, gt ou lt; None para igualdade e _like
+    compare: str = None
+
+
+class _QueryPlan:
+    """
+    Assinatura de um finder/counter (classe + campos) compilada uma única vez.
+    Os valores entram como initBindings, nunca concatenados ao texto da consulta.
+    """
+
+    def __init__(self, cls, fields):
+        self.cls = cls
+        self.conditions = []
+        patterns = [f"?s a <{cls._rdf_type_uri}> ."]
+        for field in fields:
+            field_name, suffix = _split_field(cls, field)
+            like = suffix == "like"
+            compare = suffix if suffix in _RANGE_FILTERS else None
+            prop = getattr(cls, field_name, None)
+            if not hasattr(prop, 'fget') or not hasattr(prop.fget, '_rdf_predicate'):
+                raise AttributeError(f"'{cls.__name__}' has no rdf_property '{field_name}'")
+            pred = prop.fget._rdf_predicate
+            is_relationship = getattr(prop.fget, '_is_relationship', False)
+            if compare and is_relationship:
+                raise AttributeError(f"'{field_name}' is a relationship; '_{compare}' needs an rdf_property")
+            value_var = f"v_{field_name}"
+            if like or compare or is_relationship:
+                patterns.append(f"?s <{pred}> ?{value_var} .")
+            else:
+                # "Ana" e "Ana"^^xsd:string são o mesmo valor: ?s_<campo> recebe a outra forma
+                patterns.append(f"{{ ?s <{pred}> ?{value_var} }} UNION {{ ?s <{pred}> ?s_{field_name} }}")
+            if like and not is_relationship:
+                var = Variable(f"p_{field_name}")
+                patterns.append(f'FILTER regex(?{value_var}, ?{var}, "i")')
+            else:
+                var = Variable(value_var)
+            if compare:
+                bound = f"{'hi' if compare == 'lt' else 'lo'}_{field_name}"
+                guard = _RANGE_TYPE_GUARD.format(v=value_var, b=bound)
+                patterns.append(f"FILTER ({guard} && {_RANGE_FILTERS[compare].format(v=value_var, f=field_name)})")
+            self.conditions.append(_Condition(field_name, pred, is_relationship, like, var, compare))
+        self.where = "\n".join(patterns)
+        # Só igualdades e relacionamentos: resolvido direto nos índices do grafo, sem SPARQL
+        self.native = not any(
+            (cond.like or cond.compare) and not cond.is_relationship for cond in self.conditions
+        )
+        self._select = None
+        self._count = None
+
+    @property
+    def select(self):
+        if self._select is None:
+            self._select = prepareQuery(f"SELECT DISTINCT ?s WHERE {{ {self.where} }}")
+        return self._select
+
+    @property
+    def count(self):
+        if self._count is None:
+            self._count = prepareQuery(f"SELECT (COUNT(DISTINCT ?s) AS ?count) WHERE {{ {self.where} }}")
+        return self._count
+
+    def bindings(self, mapper, values):
+        bindings = {}
+        for cond in self.conditions:
+            if cond.field not in values:
+                raise ValueError(f"Missing value for field '{cond.field}'")
+            value = values[cond.field]
+            if cond.compare:
+                low, high = self.bounds(cond, value)
+                if low is not None:
+                    bindings[Variable(f"lo_{cond.field}")] = mapper._python_to_literal(low)
+                if high is not None:
+                    bindings[Variable(f"hi_{cond.field}")] = mapper._python_to_literal(high)
+            elif cond.is_relationship:
+                bindings[cond.var] = URIRef(value)
+            elif cond.like:
+                bindings[cond.var] = Literal(str(value))
+            else:
+                term = bindings[cond.var] = mapper._python_to_literal(value)
+                bindings[Variable(f"s_{cond.field}")] = equal_terms(term)[-1]
+        return bindings
+
+    @staticmethod
+    def bounds(cond, value):
+        """(low, high) de uma condição de intervalo: _between recebe um par, _gt/_lt um valor."""
+        if cond.compare == "between":
+            try:
+                low, high = value
+            except (TypeError, ValueError):
+                raise ValueError(f"'{cond.field}' needs a (low, high) pair for _between") from None
+        else:
+            low, high = (value, None) if cond.compare == "gt" else (None, value)
+        # Mesma validação com ou sem índice ordenado
+        range_rank(low, high)
+        return low, high
+
+
+@lru_cache(maxsize=256)
+def _query_plan(cls, fields: tuple) -> _QueryPlan:
+    return _QueryPlan(cls, fields)
+
+
+def _hashable(value):
+    """Listas e dicts de argumentos viram tuplas, para compor a chave do cache."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple((key, _hashable(item)) for key, item in value.items())
+    return value
+
+
+@lru_cache(maxsize=256)
+def _row_type(cls, fields: tuple):
+    return namedtuple(f"{cls.__name__}Row", fields)
+
+
+PROJECTION_ROWS = ("tuple", "namedtuple", "dict")
+
 
 class RDFRepository:
-    def __init__(self, rdf_mapper, graph, entity_class):
+    def __init__(self, rdf_mapper, graph, entity_class, indexed_fields=None, cache_size: int = 0,
+                 text_indexed_fields=None, range_indexed_fields=None):
+        """
+        graph: um rdflib.Graph (em memória) ou um Backend, ex.: SQLiteBackend("dados.sqlite").
+        indexed_fields: campos com índice secundário valor -> sujeitos (além dos
+        declarados com rdf_property(..., index=True)). Os índices são montados aqui e
+        mantidos a cada tripla incluída/removida no grafo (graph_events.watch); cada
+        sujeito vindo de um índice ainda é conferido no grafo, para stores que não avisam remoções.
+        text_indexed_fields: campos com índice de trigramas para find_by_*_like (além
+        dos declarados com rdf_property(..., text_index=True)). Com ele, o _like vira
+        busca de substring sem acento e sem caixa ("sao" encontra "São Luís"), sem
+        regex no SPARQL; padrões com metacaracteres de regex continuam no SPARQL.
+        range_indexed_fields: campos com índice ordenado para find_by_*_between/_gt/_lt
+        (além dos declarados com rdf_property(..., range_index=True)); sem ele, esses
+        finders usam FILTER no SPARQL.
+        cache_size: nº de resultados de count_by_*/group_by_*/aggregate guardados (LRU);
+        0 desliga. Invalidado por tripla incluída ou removida, inclusive por graph.remove
+        e graph.set direto no store em memória (graph_events).
+        """
         self.mapper = rdf_mapper
-        self.graph = graph
+        self.backend = graph if isinstance(graph, Backend) else MemoryBackend(graph)
+        self.graph = graph = self.backend.graph
         self.entity_class = entity_class
+        self._indexes = {}
+        self._text_indexes = {}
+        self._range_indexes = {}
+        # Ordens de página de page_by_*, montadas na primeira chamada: {predicado: OrderIndex}
+        self._order_indexes = {}
+        self._cache = ResultCache(cache_size) if cache_size else None
 
-    def __getattr__(self, name):
-        if name.startswith("count_by_"):
-            fields = name[len("count_by_"):].split("_and_")
-            def counter(**kwargs):
-                return self._count_by(fields, kwargs)
-            return counter
-
-        match = re.match(r'^find_by_(.+)$', name)
-        if match:
-            fields = match.group(1).split('_and_')
-            def finder(**kwargs):
+        properties = rdf_mapper._mapping_for(entity_class).properties
+        def sorted_index(pred):
+            return SortedIndex(pred, rdf_mapper._literal_to_python)
+
+        for indexes, index_type, flag, requested in (
+            (self._indexes, HashIndex, '_index', indexed_fields),
+            (self._text_indexes, TrigramIndex, '_text_index', text_indexed_fields),
+            (self._range_indexes, sorted_index, '_range_index', range_indexed_fields),
+        ):
+            fields = list(requested or ())
+            fields += [attr for attr, fget in properties.items() if getattr(fget, flag, False) and attr not in fields]
+            for field in fields:
+                if field not in properties:
+                    raise ValueError(f"'{field}' is not a valid rdf_property")
+                pred = properties[field]._rdf_predicate
+                indexes[pred] = index_type(pred).build(graph)
+        if self._indexes or self._text_indexes or self._range_indexes or self._cache is not None:
+            watch(graph, self)
+
+    def _triple_added(self, triple):
+        if self._cache is not None:
+            self._cache.invalidate_triple(triple)
+        for indexes in self._all_indexes():
+            index = indexes.get(triple[1])
+            if index is not None:
+                index.add(triple[0], triple[2])
+        if triple[1] == RDF.type:
+            for index in self._order_indexes.values():
+                index.touch(triple[0], triple[2])
+
+    def _triple_removed(self, triple):
+        if self._cache is not None:
+            self._cache.invalidate_triple(triple)
+        subject, pred, obj = triple
+        if subject is None or pred is None or obj is None:
+            # Remoção por padrão: reconstrói os índices afetados
+            for indexes in self._all_indexes():
+                for index in indexes.values():
+                    if pred is None or index.predicate == pred:
+                        index.build(self.graph)
+            return
+        for indexes in self._all_indexes():
+            index = indexes.get(pred)
+            if index is not None:
+                index.remove(subject, obj)
+
+    def _all_indexes(self):
+        return self._indexes, self._text_indexes, self._range_indexes, self._order_indexes
+
+    def _order_index(self, predicate) -> OrderIndex:
+        index = self._order_indexes.get(predicate)
+        if index is None:
+            index = OrderIndex(predicate, self.entity_class._rdf_type_uri).build(self.graph)
+            self._order_indexes[predicate] = index
+            watch(self.graph, self)
+        return index
+
+    def _dynamic_plan(self, name):
+        """(tipo, plano) de um nome find_by_*/count_by_*/page_by_*/iter_by_*, ou AttributeError."""
+        match = _DYNAMIC_METHOD.match(name)
+        if not match:
+            raise AttributeError(f"'{self.__class__.__name__}' has no attribute '{name}'")
+        kind, spec = match.groups()
+        return kind, _query_plan(self.entity_class, tuple(spec.split('_and_')))
+
+    def _dynamic_method(self, kind, plan, visited=None):
+        """Monta o método dinâmico; visited é o identity map de uma Session, se houver."""
+        if kind == "count_by":
+            def method(**kwargs):
+                return self._count_by(plan, kwargs)
+        elif kind == "iter_by":
+            def method(batch_size=None, **kwargs):
+                if batch_size is not None and batch_size < 1:
+                    raise ValueError("batch_size must be a positive integer")
+                return self._iter_by(plan, kwargs, batch_size, visited=visited)
+        elif kind == "page_by":
+            def method(size=50, cursor=None, order_by=None, order="ASC", **kwargs):
+                return self._page_by(plan, kwargs, size, cursor, order_by, order, visited=visited)
+        else:
+            def method(**kwargs):
                 limit = kwargs.pop("limit", None)
                 offset = kwargs.pop("offset", None)
-                return self._find_by(fields, kwargs, like="_like" in name, limit=limit, offset=offset)
-            return finder
+                return self._find_by(plan, kwargs, limit=limit, offset=offset, visited=visited)
+        return method
 
-        raise AttributeError(f"'{self.__class__.__name__}' has no attribute '{name}'")
+    def session(self):
+        """Nova Session (identity map) ligada a este repositório."""
+        return Session(self)
 
-    def _find_by(self, fields, values, like=False, limit=None, offset=None):
-        cls = self.entity_class
-        subject_var = "?s"
-        conditions = []
+    def __getattr__(self, name):
+        kind, plan = self._dynamic_plan(name)
+        method = self._dynamic_method(kind, plan)
+        # Próximas chamadas encontram o método direto na instância, sem passar por __getattr__
+        self.__dict__[name] = method
+        return method
+
+    def _find_by(self, plan, values, limit=None, offset=None, visited=None):
+        start = offset or 0
+        stop = start + limit if limit is not None else None
+        subjects = list(islice(self._match_subjects(plan, values), start, stop))
+        return self.mapper.from_rdf_many(self.graph, plan.cls, subjects, visited=visited)
 
+    def project(self, fields, row: str = "tuple", limit: int = None, offset: int = None, **conditions):
+        """
+        Projeção: só os campos pedidos, sem hidratar entidades nem relacionamentos.
+        conditions seguem os nomes dos finders (ex.: Estado___Sigla="MA", Municipio_like="são");
+        sem conditions, projeta todas as entidades da classe.
+        row: "tuple", "namedtuple" ou "dict". Literais passam por _literal_to_python;
+        relacionamentos voltam como URI (str), e one_to_many como lista de URIs.
+
+            repo.project(["Municipio", "Valor_de_Venda"], Estado___Sigla="MA")
+        """
+        if row not in PROJECTION_ROWS:
+            raise ValueError(f"row must be one of {PROJECTION_ROWS}")
+        cls = self.entity_class
+        fields = tuple([fields] if isinstance(fields, str) else fields)
+        properties = self.mapper._mapping_for(cls).properties
         for field in fields:
-            field_name = field.replace('_like', '')
-            if field_name not in values:
-                raise ValueError(f"Missing value for field '{field_name}'")
-            value = values[field_name]
-            prop = getattr(cls, field_name)
-            pred = prop.fget._rdf_predicate
+            if field not in properties:
+                raise ValueError(f"'{field}' is not a valid rdf_property")
 
-            if getattr(prop.fget, '_is_relationship', False):
-                conditions.append(f"{subject_var} <{pred}> <{value}> .")
+        subjects = self._select_subjects(conditions, limit, offset)
+        graph = self.graph
+        to_python = self.mapper._literal_to_python
+        getters = []
+        for field in fields:
+            fget = properties[field]
+            pred = fget._rdf_predicate
+            if not fget._is_relationship:
+                def get(subject, pred=pred):
+                    return to_python(next(graph.objects(subject, pred), None))
+            elif fget._relationship_type == 'one_to_one':
+                def get(subject, pred=pred):
+                    target = next(graph.objects(subject, pred), None)
+                    return None if target is None else str(target)
             else:
-                value_var = f"?v_{field_name}"
-                conditions.append(f"{subject_var} <{pred}> {value_var} .")
-                if '_like' in field:
-                    conditions.append(f'FILTER regex({value_var}, "{value}", "i")')
-                else:
-                    conditions.append(f'FILTER ({value_var} = "{value}")')
-
-        rdf_type = cls._rdf_type_uri
-        where_clause = "\n".join(conditions)
-        query = f"""
-        SELECT ?s WHERE {{
-            {subject_var} a <{rdf_type}> .
-            {where_clause}
-        }}
-        """
-        if limit is not None:
-            query += f"\nLIMIT {limit}"
-        if offset is not None:
-            query += f"\nOFFSET {offset}"
-
-        return [
-            self.mapper.from_rdf(self.graph, cls, str(row.s))
-            for row in self.graph.query(query)
-        ]
+                def get(subject, pred=pred):
+                    return [str(target) for target in graph.objects(subject, pred)]
+            getters.append(get)
+
+        # Um padrão (sujeito, predicado, ?) por campo pedido: nada além disso é lido
+        rows = [tuple(get(subject) for get in getters) for subject in subjects]
+        if row == "namedtuple":
+            row_type = _row_type(cls, fields)
+            return [row_type._make(values) for values in rows]
+        if row == "dict":
+            return [dict(zip(fields, values)) for values in rows]
+        return rows
+
+    def frame(self, fields=None, numeric=(), limit: int = None, offset: int = None, **conditions):
+        """
+        EntityFrame (colunar) com os campos pedidos dos sujeitos que satisfazem conditions
+        (mesmos nomes de project; sem conditions, a classe inteira). Por padrão traz
+        todos os rdf_property e one_to_one. numeric: campos de texto lidos como número
+        (ex.: Valor_de_Venda "6,29"); literais numéricos já viram número sozinhos.
+
+            frame = repo.frame(["Estado___Sigla", "Valor_de_Venda"], numeric=["Valor_de_Venda"])
+            frame.group_by("Estado___Sigla", {"avg": ("avg", "Valor_de_Venda")}, limit=10)
+        """
+        from .frame import EntityFrame
 
-    def _count_by(self, fields, values):
         cls = self.entity_class
-        subject_var = "?s"
-        conditions = []
+        properties = self.mapper._mapping_for(cls).properties
+        if fields is None:
+            fields = [
+                attr for attr, fget in properties.items()
+                if not fget._is_relationship or fget._relationship_type == 'one_to_one'
+            ]
+        fields = [fields] if isinstance(fields, str) else list(fields)
+        for field in [*fields, *numeric]:
+            if field not in properties:
+                raise ValueError(f"'{field}' is not a valid rdf_property")
+        subjects = self._select_subjects(conditions, limit, offset)
+        # Classe inteira: uma varredura por predicado sai mais barata que uma consulta por sujeito
+        scan = not conditions and limit is None
+        return EntityFrame.load(self.mapper, self.graph, cls, subjects, fields, numeric, scan=scan)
 
-        for field in fields:
-            if field not in values:
-                raise ValueError(f"Missing value for field '{field}'")
-            value = values[field]
-            prop = getattr(cls, field)
-            pred = prop.fget._rdf_predicate
-            if getattr(prop.fget, '_is_relationship', False):
-                conditions.append(f"{subject_var} <{pred}> <{value}> .")
+    def _select_subjects(self, conditions, limit=None, offset=None) -> list:
+        """Sujeitos de project/frame: os que satisfazem conditions, ou todos os da classe."""
+        cls = self.entity_class
+        start = offset or 0
+        stop = start + limit if limit is not None else None
+        if conditions:
+            plan = _query_plan(cls, tuple(conditions))
+            values = {_split_field(cls, name)[0]: value for name, value in conditions.items()}
+            subjects = self._stream_subjects(plan, values)
+        else:
+            subjects = self.graph.subjects(RDF.type, cls._rdf_type_uri)
+        return list(islice(subjects, start, stop))
+
+    def _iter_by(self, plan, values, batch_size=None, visited=None, chunk_size=100):
+        """
+        Gerador: hidrata os sujeitos em blocos à medida que são encontrados e entrega
+        uma entidade por vez (ou listas de batch_size). Fora de uma Session cada bloco
+        tem seu próprio visited, então só o bloco atual fica em memória.
+        """
+        subjects = self._stream_subjects(plan, values)
+        chunk = batch_size or chunk_size
+        while True:
+            batch = list(islice(subjects, chunk))
+            if not batch:
+                return
+            items = self.mapper.from_rdf_many(self.graph, plan.cls, batch, visited={} if visited is None else visited)
+            if batch_size:
+                yield items
             else:
-                conditions.append(f'{subject_var} <{pred}> "{value}" .')
+                yield from items
+
+    def _stream_subjects(self, plan, values):
+        """Como _match_subjects, mas verificando cada candidato só quando é consumido."""
+        if not self._native(plan, values):
+            return self._match_subjects(plan, values)
+        candidates, verify = self._candidates(plan, values)
+        # Cópia: o conjunto de um índice secundário muda se o grafo mudar durante a iteração
+        return (subject for subject in list(candidates) if verify(subject))
+
+    def _page_by(self, plan, values, size, cursor=None, order_by=None, order="ASC", visited=None):
+        """
+        Paginação por chave (keyset): retoma depois do último sujeito, ou do último
+        valor de order_by (com o sujeito desempatando), em vez de pular offset linhas.
+        A ordem é mantida em OrderIndex (montado na 1ª chamada): cada página faz uma
+        busca binária até o cursor e confere os sujeitos seguintes até completar size,
+        então custa o tamanho da página (dividido pela seletividade), não o total.
+        Se um índice ou padrão já dá poucos candidatos (k² < size·n), só eles são ordenados.
+        Retorna Page(items, cursor); cursor é None na última página.
+        """
+        order = order.strip().upper()
+        if order not in ("ASC", "DESC"):
+            raise ValueError("order must be 'ASC' or 'DESC'")
+        if size < 1:
+            raise ValueError("size must be a positive integer")
+        descending = order == "DESC"
+        ordering = (order_by, order)
+        after = decode_cursor(cursor, ordering) if cursor is not None else None
+
+        predicate = RDF.type if order_by is None else self._field_predicate(plan.cls, order_by)
+        index = self._order_index(predicate)
+        candidates = None
+        if self._native(plan, values):
+            candidates, verify = self._candidates(plan, values, limit=math.isqrt(size * len(index)))
+        if candidates is not None:
+            ordered = sort_page(index, candidates, after, descending)
+        else:
+            ordered, verify = seek(index, after, descending), self._subject_filter(plan, values)
+        # Um item a mais só para saber se existe próxima página
+        selected = list(islice(((key, subject) for key, subject in ordered if verify(subject)), size + 1))
+        has_next = len(selected) > size
+        selected = selected[:size]
+        items = self.mapper.from_rdf_many(self.graph, plan.cls, [subject for _, subject in selected], visited=visited)
+        next_cursor = encode_cursor(ordering, selected[-1][0]) if has_next else None
+        return Page(items, next_cursor)
 
-        rdf_type = cls._rdf_type_uri
-        where_clause = "\n".join(conditions)
-        query = f"""
-        SELECT (COUNT(?s) as ?count) WHERE {{
-            {subject_var} a <{rdf_type}> .
-            {where_clause}
-        }}
+    def _subject_filter(self, plan, values):
         """
-        result = self.graph.query(query)
+        matches(sujeito): confere todas as condições do plano direto no grafo, um sujeito
+        por vez, com a mesma semântica dos finders (índices de trigramas e SPARQL).
+        """
+        graph = self.graph
+        bindings = plan.bindings(self.mapper, values)
+        to_python = self.mapper._literal_to_python
+        tests = [lambda subject, rdf_type=plan.cls._rdf_type_uri: (subject, RDF.type, rdf_type) in graph]
+        for cond in plan.conditions:
+            pred = cond.predicate
+            if cond.compare:
+                low, high = plan.bounds(cond, values[cond.field])
+                rank = range_rank(low, high)
+                inclusive = cond.compare == "between"
+
+                def in_range(key, low=low, high=high, rank=rank, inclusive=inclusive):
+                    if key is None or key[0] != rank:
+                        return False
+                    value = key[1]
+                    if low is not None and (value < low if inclusive else value <= low):
+                        return False
+                    return high is None or (value <= high if inclusive else value < high)
+                tests.append(lambda subject, pred=pred, in_range=in_range: any(
+                    in_range(literal_range_key(obj, to_python)) for obj in graph.objects(subject, pred)
+                ))
+            elif cond.like and not cond.is_relationship:
+                pattern = str(bindings[cond.var])
+                if pred in self._text_indexes and not _REGEX_SPECIAL.search(pattern):
+                    wanted = normalize_text(pattern)
+
+                    def like(obj, wanted=wanted):
+                        return wanted in normalize_text(str(obj))
+                else:
+                    regex = re.compile(pattern, re.IGNORECASE)
+
+                    def like(obj, regex=regex):
+                        return isinstance(obj, Literal) and regex.search(str(obj)) is not None
+                tests.append(lambda subject, pred=pred, like=like: any(
+                    like(obj) for obj in graph.objects(subject, pred)
+                ))
+            else:
+                terms = equal_terms(bindings[cond.var])
+                tests.append(lambda subject, pred=pred, terms=terms: any(
+                    (subject, pred, obj) in graph for obj in terms
+                ))
+        return lambda subject: all(test(subject) for test in tests)
+
+    def _cached(self, key, dependencies, compute):
+        if self._cache is None:
+            return compute()
+        try:
+            hash(key)
+        except TypeError:
+            # Valores não hashable (ex.: listas) não entram no cache
+            return compute()
+        return self._cache.get(key, dependencies, compute)
+
+    def cache_info(self) -> CacheInfo:
+        """Acertos, faltas, tamanho máximo e atual do cache de resultados."""
+        if self._cache is None:
+            return CacheInfo(0, 0, 0, 0)
+        return self._cache.info()
+
+    def cache_clear(self):
+        if self._cache is not None:
+            self._cache.clear()
+
+    def _count_by(self, plan, values):
+        dependencies = [type_dependency(plan.cls._rdf_type_uri)] + [cond.predicate for cond in plan.conditions]
+        return self._cached(
+            ("count_by", plan, tuple((field, type(value), value) for field, value in sorted(values.items()))),
+            dependencies,
+            lambda: self._count(plan, values),
+        )
+
+    def _count(self, plan, values):
+        if self._native(plan, values):
+            return len(self._match_subjects(plan, values))
+        result = self.graph.query(plan.count, initBindings=plan.bindings(self.mapper, values))
         for row in result:
             return int(row[0].toPython())
         return 0
 
-    
-    def group_by_count(self, cls, field: str, order: str = "DESC"):
-            graph = self.graph
-            class_uri = cls._rdf_type_uri
+    def _match_subjects(self, plan, values):
+        """Sujeitos que satisfazem o plano: interseção nativa quando possível, SPARQL caso contrário."""
+        if self._native(plan, values):
+            return self._intersect(plan, values)
+        bindings = plan.bindings(self.mapper, values)
+        return (row.s for row in self.graph.query(plan.select, initBindings=bindings))
 
-            prop = getattr(cls, field, None)
-            if not hasattr(prop, 'fget') or not hasattr(prop.fget, '_rdf_predicate'):
-                raise ValueError(f"'{field}' is not a valid rdf_property")
+    def _native(self, plan, values) -> bool:
+        """
+        Se o plano resolve sem SPARQL: só igualdades, ou também _like sobre campos com
+        índice de trigramas e _between/_gt/_lt sobre campos com índice ordenado.
+        """
+        if plan.native:
+            return True
+        for cond in plan.conditions:
+            if cond.compare:
+                if cond.predicate not in self._range_indexes:
+                    return False
+            elif cond.like and not cond.is_relationship:
+                if cond.predicate not in self._text_indexes or _REGEX_SPECIAL.search(str(values.get(cond.field, ""))):
+                    return False
+        return True
+
+    def _intersect(self, plan, values):
+        """Interseção de padrões (?s pred valor) pelos índices do grafo."""
+        candidates, verify = self._candidates(plan, values)
+        return [subject for subject in candidates if verify(subject)]
+
+    def _candidates(self, plan, values, limit=None):
+        """
+        (candidatos, verify) da interseção nativa. Parte do padrão mais seletivo: cada
+        padrão só é percorrido até ultrapassar o menor conjunto já encontrado; os demais
+        viram testes de pertinência, feitos por verify(sujeito). Com limit, devolve
+        (None, None) se nenhum padrão tiver até limit sujeitos, sem varrer além disso. O que vem de índice também
+        é conferido no grafo por verify, para stores que não avisam remoções.
+        """
+        graph = self.graph
+        bindings = plan.bindings(self.mapper, values)
+        best = None
+        # Condição cujos candidatos saíram direto do grafo: dispensa a conferência
+        scanned = None
+        # _like e intervalos, resolvidos nos índices de trigramas/ordenados: {condição: sujeitos}
+        searched = {}
+        for cond in plan.conditions:
+            if cond.compare or (cond.like and not cond.is_relationship):
+                if cond.compare:
+                    low, high = plan.bounds(cond, values[cond.field])
+                    matched = self._range_indexes[cond.predicate].range(
+                        low, high, include_low=cond.compare == "between", include_high=cond.compare == "between"
+                    )
+                else:
+                    matched = self._text_indexes[cond.predicate].search(str(bindings[cond.var]))
+                searched[cond] = matched
+                if best is None or len(matched) < len(best):
+                    best, scanned = matched, None
+                if not best:
+                    break
+                continue
+            index = self._indexes.get(cond.predicate)
+            if index is not None:
+                # Índice secundário: tamanho conhecido sem varrer o grafo
+                matched = index.lookup(bindings[cond.var])
+                if best is None or len(matched) < len(best):
+                    best, scanned = matched, None
+                if not best:
+                    break
+                continue
+            # dict como conjunto ordenado: um sujeito pode ter as duas formas da string
+            matched = {}
+            cap = (None if limit is None else limit + 1) if best is None else len(best)
+            for subject in chain.from_iterable(
+                graph.subjects(cond.predicate, term) for term in equal_terms(bindings[cond.var])
+            ):
+                matched[subject] = None
+                if cap is not None and len(matched) >= cap:
+                    break
+            else:
+                best, scanned = matched, cond
+                if not best:
+                    break
+
+        if limit is not None and (best is None or len(best) > limit):
+            return None, None
+        checks = [
+            (cond.predicate, equal_terms(bindings[cond.var]))
+            for cond in plan.conditions
+            if cond is not scanned and not (cond.compare or (cond.like and not cond.is_relationship))
+        ]
+        checks.append((RDF.type, (plan.cls._rdf_type_uri,)))
+        # Com break não há candidatos: as condições que ficaram sem busca nunca são verificadas
+        # _like e intervalos: {sujeito: valores que casaram}; algum deles ainda precisa estar no grafo
+        found = [(cond.predicate, matched) for cond, matched in searched.items()]
+
+        def verify(subject):
+            return all(
+                any((subject, pred, obj) in graph for obj in matched.get(subject, ())) for pred, matched in found
+            ) and all(
+                any((subject, pred, obj) in graph for obj in terms) for pred, terms in checks
+            )
+        return best or (), verify
+
+    def _field_predicate(self, cls, field: str):
+        prop = getattr(cls, field, None)
+        if not hasattr(prop, 'fget') or not hasattr(prop.fget, '_rdf_predicate'):
+            raise ValueError(f"'{field}' is not a valid rdf_property")
+        return prop.fget._rdf_predicate
+
+    def _grouping(self, cls, group_by, metrics, order_by=None, order="DESC", limit=None):
+        fields = [group_by] if isinstance(group_by, str) else list(group_by)
+        compiled = [
+            aggregation.Metric(name, op, field, None if field is None else self._field_predicate(cls, field))
+            for name, (op, field) in metrics.items()
+        ]
+        key_predicates = [self._field_predicate(cls, field) for field in fields]
+        return aggregation.Grouping(fields, key_predicates, compiled, order_by, order, limit)
+
+    def aggregate(self, cls, group_by, metrics: dict, order_by: str = None, order: str = "DESC", limit: int = None):
+        """
+        GROUP BY em uma única varredura do grafo.
+        group_by: um campo ou uma lista de campos.
+        metrics: {nome: (op, campo)}, op em count, count_distinct, sum, avg, min, max;
+        ("count", None) conta os sujeitos do grupo. Strings como "6,29" viram número.
+        Retorna [{campo: valor, ..., nome: resultado}] ordenado por order_by
+        (a primeira métrica, por padrão); grupos sem valor numérico ficam no final.
+        limit devolve só os top-K, escolhidos por um heap limitado.
+        """
+        grouping = self._grouping(cls, group_by, metrics, order_by, order, limit)
+        key = ("aggregate", cls, _hashable(group_by), _hashable(metrics), order_by, order, limit)
+        return self._aggregate(cls, [grouping], key)[0]
+
+    def group_by_many(self, cls, group_bys, metrics: dict = None, order_by: str = None,
+                      order: str = "DESC", limit: int = None) -> dict:
+        """
+        Vários GROUP BY na mesma travessia: cada predicado é lido uma vez só, mesmo
+        que apareça em mais de um agrupamento. group_bys é uma lista de campos (ou de
+        listas de campos), cada item agrupado separadamente com as mesmas metrics
+        (padrão: {"count": ("count", None)}).
+        Retorna {campo: linhas}, com o mesmo formato de aggregate.
+        """
+        metrics = metrics or {"count": ("count", None)}
+        groupings = [self._grouping(cls, group_by, metrics, order_by, order, limit) for group_by in group_bys]
+        key = ("group_by_many", cls, _hashable(group_bys), _hashable(metrics), order_by, order, limit)
+        results = self._aggregate(cls, groupings, key)
+        return {
+            group_by if isinstance(group_by, str) else tuple(group_by): rows
+            for group_by, rows in zip(group_bys, results)
+        }
+
+    def _aggregate(self, cls, groupings, key):
+        dependencies = {type_dependency(cls._rdf_type_uri)}
+        for grouping in groupings:
+            dependencies.update(grouping.key_predicates)
+            dependencies.update(metric.predicate for metric in grouping.metrics if metric.predicate is not None)
+        return self._cached(key, dependencies, lambda: aggregation.aggregate(self.graph, cls._rdf_type_uri, groupings))
+
+    def group_by_count(self, cls, field, order: str = "DESC", limit: int = None):
+        return self.aggregate(cls, field, {"count": ("count", None)}, order=order, limit=limit)
+
+    def group_by_avg(self, cls, field, value_field: str, order: str = "DESC", limit: int = None):
+        return self.aggregate(cls, field, {"avg": ("avg", value_field)}, order=order, limit=limit)
+
+    def group_by_sum(self, cls, field, value_field: str, order: str = "DESC", limit: int = None):
+        return self.aggregate(cls, field, {"sum": ("sum", value_field)}, order=order, limit=limit)
+
+    def group_by_min(self, cls, field, value_field: str, order: str = "DESC", limit: int = None):
+        return self.aggregate(cls, field, {"min": ("min", value_field)}, order=order, limit=limit)
+
+    def group_by_max(self, cls, field, value_field: str, order: str = "DESC", limit: int = None):
+        return self.aggregate(cls, field, {"max": ("max", value_field)}, order=order, limit=limit)
 
-            predicate = prop.fget._rdf_predicate
-            order = order.strip().upper()
-            if order not in ("ASC", "DESC"):
-                raise ValueError("order must be 'ASC' or 'DESC'")
-
-            query = f"""
-                SELECT ?{field} (COUNT(?s) AS ?count)
-                WHERE {{
-                ?s a <{class_uri}> ;
-                    <{predicate}> ?{field} .
-                }}
-                GROUP BY ?{field}
-                ORDER BY {order}(?count)
-            """
-
-            qres = graph.query(query)
-            return [{field: str(row[0]), "count": int(row[1])} for row in qres]
-    
\ No newline at end of file
+    def group_by_count_distinct(self, cls, field, value_field: str, order: str = "DESC", limit: int = None):
+        return self.aggregate(cls, field, {"count_distinct": ("count_distinct", value_field)}, order=order, limit=limit)
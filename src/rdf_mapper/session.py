@@ -0,0 +1,169 @@
+from rdflib import URIRef, RDF
+from .graph_events import remove_triples
+
+
+class _IdentityMap(dict):
+    """{URIRef: instância}; toda instância que entra passa a registrar as próprias alterações."""
+
+    def __setitem__(self, subject, instance):
+        instance._rdf_dirty = set()
+        super().__setitem__(subject, instance)
+
+
+class Session:
+    """
+    Identity map e unit of work ligados a um RDFRepository.
+
+    Dentro da sessão, cada URI de sujeito corresponde a uma única instância. Finders
+    que devolvem um sujeito já carregado (ou um relacionado compartilhado, como o
+    mesmo Address) reaproveitam o objeto, sem reler as triplas. clear()/evict()
+    limitam a memória da sessão.
+
+    Os setters de rdf_property/rdf_one_to_* marcam o campo alterado; flush() grava
+    só a diferença (triplas removidas e incluídas) dos campos marcados, em um lote.
+    Alterar uma lista no lugar (phones.append) não passa pelo setter: reatribua a
+    lista ou use mark_dirty.
+
+        with repo.session() as session:
+            pessoa = session.find_by_name(name="João")[0]
+            pessoa.name = "João Silva"
+            session.flush()
+    """
+
+    def __init__(self, repository):
+        self.repository = repository
+        # Mesmo formato do visited de from_rdf_many
+        self._identity = _IdentityMap()
+        self._new = {}
+        self._deleted = {}
+
+    def __getattr__(self, name):
+        kind, plan = self.repository._dynamic_plan(name)
+        method = self.repository._dynamic_method(kind, plan, visited=self._identity)
+        self.__dict__[name] = method
+        return method
+
+    def get(self, uri, cls=None):
+        """Instância do sujeito (da sessão, se já carregado), ou None se não houver triplas dele."""
+        subject = URIRef(uri)
+        instance = self._identity.get(subject)
+        if instance is not None:
+            return instance
+        repository = self.repository
+        if (subject, None, None) not in repository.graph:
+            return None
+        cls = cls or repository.entity_class
+        return repository.mapper.from_rdf_many(repository.graph, cls, [subject], visited=self._identity)[0]
+
+    # Unit of work
+
+    def add(self, obj):
+        """Inclui uma entidade nova; no flush vão todas as suas triplas (e as de relacionados novos)."""
+        subject = URIRef(obj.uri)
+        self._deleted.pop(subject, None)
+        self._identity[subject] = obj
+        self._new[subject] = obj
+        return obj
+
+    def delete(self, obj):
+        """No flush, remove as triplas do sujeito e as que apontam para ele."""
+        subject = URIRef(getattr(obj, "uri", obj))
+        self._new.pop(subject, None)
+        self._identity.pop(subject, None)
+        self._deleted[subject] = obj
+
+    def mark_dirty(self, obj, *attrs):
+        obj._rdf_dirty.update(attrs)
+
+    @property
+    def dirty(self) -> list:
+        return [obj for obj in self._identity.values() if obj._rdf_dirty]
+
+    def flush(self):
+        """
+        Calcula a diferença mínima dos campos alterados contra o grafo e aplica
+        todas as remoções e inclusões de uma vez. Retorna (removidas, incluídas).
+        """
+        graph = self.repository.graph
+        mapper = self.repository.mapper
+        removals, additions = [], []
+        pending = list(self._new.values()) + [
+            obj for subject, obj in self._identity.items() if obj._rdf_dirty and subject not in self._new
+        ]
+
+        while pending:
+            obj = pending.pop()
+            subject = URIRef(obj.uri)
+            mapping = mapper._mapping_for(type(obj))
+            new = subject in self._new
+            if new:
+                attrs = list(mapping.properties)
+                if (subject, RDF.type, mapping.rdf_type) not in graph:
+                    additions.append((subject, RDF.type, mapping.rdf_type))
+            else:
+                attrs = list(obj._rdf_dirty)
+            for attr in attrs:
+                fget = mapping.properties[attr]
+                pred = fget._rdf_predicate
+                desired = self._terms(mapper, fget, getattr(obj, attr), pending)
+                current = set(graph.objects(subject, pred))
+                removals.extend((subject, pred, term) for term in current - desired)
+                additions.extend((subject, pred, term) for term in desired - current)
+            obj._rdf_dirty.clear()
+
+        for subject in self._deleted:
+            removals.extend(graph.triples((subject, None, None)))
+            removals.extend(graph.triples((None, None, subject)))
+
+        if removals:
+            remove_triples(graph, removals)
+        if additions:
+            graph.addN((s, p, o, graph) for s, p, o in additions)
+        self._new.clear()
+        self._deleted.clear()
+        return len(removals), len(additions)
+
+    def _terms(self, mapper, fget, value, pending) -> set:
+        """Termos RDF que o campo deve ter no grafo; relacionados ainda inexistentes entram como novos."""
+        if not fget._is_relationship:
+            return set() if value is None else {mapper._python_to_literal(value)}
+        if fget._relationship_type == 'one_to_one':
+            targets = [value] if value else []
+        else:
+            targets = value or []
+        terms = set()
+        graph = self.repository.graph
+        for target in targets:
+            subject = URIRef(target.uri)
+            terms.add(subject)
+            if subject not in self._identity and (subject, RDF.type, None) not in graph:
+                self.add(target)
+                pending.append(target)
+        return terms
+
+    def commit(self):
+        """flush() e commit no backend do repositório (ex.: transação do SQLite)."""
+        result = self.flush()
+        self.repository.backend.commit()
+        return result
+
+    def evict(self, obj):
+        """Remove da sessão uma instância (ou URI); a próxima leitura hidrata de novo."""
+        self._identity.pop(URIRef(getattr(obj, "uri", obj)), None)
+
+    def clear(self):
+        self._identity.clear()
+        self._new.clear()
+        self._deleted.clear()
+
+    def __contains__(self, obj):
+        return URIRef(getattr(obj, "uri", obj)) in self._identity
+
+    def __len__(self):
+        return len(self._identity)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.clear()
@@ -0,0 +1,263 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from rdflib import Graph, URIRef, BNode, Literal
+from rdflib.store import Store, VALID_STORE, NO_STORE, TripleAddedEvent
+
+_URI, _BNODE, _LITERAL = 0, 1, 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    kind INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    datatype TEXT NOT NULL DEFAULT '',
+    lang TEXT NOT NULL DEFAULT '',
+    UNIQUE (kind, value, datatype, lang)
+);
+CREATE TABLE IF NOT EXISTS triples (
+    s INTEGER NOT NULL,
+    p INTEGER NOT NULL,
+    o INTEGER NOT NULL,
+    PRIMARY KEY (s, p, o)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS namespaces (
+    prefix TEXT PRIMARY KEY,
+    uri TEXT NOT NULL
+);
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS triples_pos ON triples (p, o, s);
+CREATE INDEX IF NOT EXISTS triples_osp ON triples (o, s, p);
+"""
+
+
+def _term_key(term):
+    if isinstance(term, Literal):
+        return (_LITERAL, str(term), str(term.datatype or ""), term.language or "")
+    if isinstance(term, BNode):
+        return (_BNODE, str(term), "", "")
+    return (_URI, str(term), "", "")
+
+
+def _make_term(kind, value, datatype, lang):
+    if kind == _LITERAL:
+        return Literal(value, datatype=datatype or None, lang=lang or None)
+    if kind == _BNODE:
+        return BNode(value)
+    return URIRef(value)
+
+
+class SQLiteStore(Store):
+    """
+    Store do rdflib persistido em um arquivo SQLite (somente biblioteca padrão).
+    Os termos são codificados em uma tabela de dicionário e as triplas guardadas como
+    três inteiros, com índices SPO, POS e OSP. As escritas ficam na transação corrente
+    até commit() (ou close()).
+
+        graph = Graph(store=SQLiteStore())
+        graph.open("dados.sqlite", create=True)
+    """
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = True
+    graph_aware = False
+
+    def __init__(self, configuration=None, identifier=None, cache_size: int = 100_000):
+        self._conn = None
+        # Caches limitados de termo <-> id: mantêm a memória estável em cargas grandes
+        self._cache_size = cache_size
+        self._ids = {}
+        self._terms = {}
+        super().__init__(configuration, identifier)
+
+    # Ciclo de vida
+
+    def open(self, configuration, create=False):
+        path = str(configuration)
+        if not create and path != ":memory:" and not os.path.exists(path):
+            return NO_STORE
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA + _INDEXES)
+        self._conn.commit()
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction=False):
+        # Graph.close() passa False por padrão; a transação pendente é gravada mesmo assim,
+        # para que fechar o grafo nunca descarte dados. Use rollback() antes para descartar.
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    def destroy(self, configuration):
+        if self._conn is not None:
+            self._conn.rollback()
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(f"{configuration}{suffix}"):
+                os.remove(f"{configuration}{suffix}")
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+        self._ids.clear()
+        self._terms.clear()
+
+    # Dicionário de termos
+
+    def _remember(self, cache, key, value):
+        if len(cache) >= self._cache_size:
+            cache.clear()
+        cache[key] = value
+
+    def _lookup_id(self, term):
+        """Id de um termo já gravado, ou None."""
+        try:
+            return self._ids[term]
+        except KeyError:
+            pass
+        row = self._conn.execute(
+            "SELECT id FROM terms WHERE kind = ? AND value = ? AND datatype = ? AND lang = ?",
+            _term_key(term),
+        ).fetchone()
+        if row is None:
+            return None
+        self._remember(self._ids, term, row[0])
+        return row[0]
+
+    def _id(self, term):
+        """Id de um termo, gravando-o se ainda não existir."""
+        term_id = self._lookup_id(term)
+        if term_id is None:
+            term_id = self._conn.execute(
+                "INSERT INTO terms (kind, value, datatype, lang) VALUES (?, ?, ?, ?)",
+                _term_key(term),
+            ).lastrowid
+            self._remember(self._ids, term, term_id)
+        return term_id
+
+    def _term(self, term_id):
+        try:
+            return self._terms[term_id]
+        except KeyError:
+            row = self._conn.execute(
+                "SELECT kind, value, datatype, lang FROM terms WHERE id = ?", (term_id,)
+            ).fetchone()
+            term = _make_term(*row)
+            self._remember(self._terms, term_id, term)
+            return term
+
+    # API de triplas
+
+    def add(self, triple, context, quoted=False):
+        Store.add(self, triple, context, quoted)
+        s, p, o = triple
+        self._conn.execute(
+            "INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)",
+            (self._id(s), self._id(p), self._id(o)),
+        )
+
+    def addN(self, quads):  # noqa: N802
+        self.add_many((s, p, o) for s, p, o, _ in quads)
+
+    def add_many(self, triples):
+        """Carga em lote com executemany, sem o custo de um add por tripla."""
+        notify = self.dispatcher.get_map() is not None
+        dispatch = self.dispatcher.dispatch
+        term_id = self._id
+
+        def rows():
+            for triple in triples:
+                if notify:
+                    dispatch(TripleAddedEvent(triple=triple, context=None))
+                s, p, o = triple
+                yield (term_id(s), term_id(p), term_id(o))
+
+        self._conn.executemany("INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)", rows())
+
+    @contextmanager
+    def bulk(self):
+        """
+        Modo de carga em massa: os índices POS/OSP são removidos durante a inserção e
+        recriados na saída (uma ordenação só, em vez de manter três árvores a cada tripla).
+        """
+        conn = self._conn
+        conn.commit()
+        conn.execute("DROP INDEX IF EXISTS triples_pos")
+        conn.execute("DROP INDEX IF EXISTS triples_osp")
+        try:
+            yield self
+        finally:
+            conn.commit()
+            conn.executescript(_INDEXES)
+            conn.execute("ANALYZE")
+            conn.commit()
+
+    def _where(self, pattern):
+        clauses, params = [], []
+        for column, term in zip(("s", "p", "o"), pattern):
+            if term is None:
+                continue
+            term_id = self._lookup_id(term)
+            if term_id is None:
+                return None, None
+            clauses.append(f"{column} = ?")
+            params.append(term_id)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def remove(self, triple_pattern, context=None):
+        Store.remove(self, triple_pattern, context)
+        where, params = self._where(triple_pattern)
+        if where is not None:
+            self._conn.execute(f"DELETE FROM triples{where}", params)
+
+    def triples(self, triple_pattern, context=None):
+        where, params = self._where(triple_pattern)
+        if where is None:
+            return
+        term = self._term
+        for s, p, o in self._conn.execute(f"SELECT s, p, o FROM triples{where}", params):
+            yield (term(s), term(p), term(o)), iter(())
+
+    def __len__(self, context=None):
+        return self._conn.execute("SELECT COUNT(*) FROM triples").fetchone()[0]
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    # Namespaces
+
+    def bind(self, prefix, namespace, override=True):
+        if not override and self.namespace(prefix) is not None:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO namespaces (prefix, uri) VALUES (?, ?)", (prefix, str(namespace))
+        )
+
+    def namespace(self, prefix):
+        row = self._conn.execute("SELECT uri FROM namespaces WHERE prefix = ?", (prefix,)).fetchone()
+        return URIRef(row[0]) if row else None
+
+    def prefix(self, namespace):
+        row = self._conn.execute("SELECT prefix FROM namespaces WHERE uri = ?", (str(namespace),)).fetchone()
+        return row[0] if row else None
+
+    def namespaces(self):
+        for prefix, uri in self._conn.execute("SELECT prefix, uri FROM namespaces").fetchall():
+            yield prefix, URIRef(uri)
+
+
+def open_sqlite_graph(path, create: bool = True) -> Graph:
+    """Abre (ou cria) um Graph persistido em SQLite, pronto para RDFRepository."""
+    graph = Graph(store=SQLiteStore())
+    if graph.open(str(path), create=create) == NO_STORE:
+        raise FileNotFoundError(path)
+    return graph
@@ -0,0 +1,148 @@
+import gzip
+import os
+import re
+from rdflib import Literal, BNode, RDF, XSD
+
+# Subconjunto conservador de PN_LOCAL do Turtle; o que não casar sai como <IRI>
+_LOCAL_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_\-]*$')
+
+DEFAULT_PREFIXES = {"rdf": str(RDF), "xsd": str(XSD)}
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def nt_term(term) -> str:
+    """Formata um termo RDF no formato N-Triples."""
+    if isinstance(term, Literal):
+        lexical = f'"{_escape(str(term))}"'
+        if term.language:
+            return f"{lexical}@{term.language}"
+        if term.datatype:
+            return f"{lexical}^^<{term.datatype}>"
+        return lexical
+    if isinstance(term, BNode):
+        return f"_:{term}"
+    return f"<{term}>"
+
+
+class NTriplesWriter:
+    """Escreve triplas linha a linha; nada além do buffer atual fica em memória."""
+
+    def __init__(self, stream, buffer_size: int = 1000):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self.count = 0
+
+    def header(self):
+        pass
+
+    def format(self, s, p, o) -> str:
+        return f"{nt_term(s)} {nt_term(p)} {nt_term(o)} .\n"
+
+    def write(self, triple):
+        self._buffer.append(self.format(*triple))
+        self.count += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.stream.write("".join(self._buffer).encode("utf-8"))
+            self._buffer.clear()
+
+
+class TurtleWriter(NTriplesWriter):
+    """
+    Turtle com uma tabela de prefixos fixa, definida antes da primeira tripla.
+    Cada tripla sai completa em uma linha, sem agrupar por sujeito.
+    """
+
+    def __init__(self, stream, prefixes=None, buffer_size: int = 1000):
+        super().__init__(stream, buffer_size)
+        self.prefixes = dict(DEFAULT_PREFIXES if prefixes is None else prefixes)
+        # Namespace mais longo primeiro, para casar o prefixo mais específico
+        self._namespaces = sorted(
+            ((str(ns), prefix) for prefix, ns in self.prefixes.items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._qnames = {}
+
+    def header(self):
+        lines = [f"@prefix {prefix}: <{ns}> .\n" for prefix, ns in self.prefixes.items()]
+        if lines:
+            lines.append("\n")
+            self.stream.write("".join(lines).encode("utf-8"))
+
+    def _qname(self, uri) -> str:
+        value = str(uri)
+        for ns, prefix in self._namespaces:
+            if value.startswith(ns) and _LOCAL_NAME.match(value[len(ns):]):
+                return f"{prefix}:{value[len(ns):]}"
+        return f"<{value}>"
+
+    def _cached_qname(self, uri) -> str:
+        # Predicados, tipos e datatypes se repetem; sujeitos não passam por aqui
+        try:
+            return self._qnames[uri]
+        except KeyError:
+            qname = self._qnames[uri] = self._qname(uri)
+            return qname
+
+    def term(self, term, cached=False) -> str:
+        if isinstance(term, Literal):
+            lexical = f'"{_escape(str(term))}"'
+            if term.language:
+                return f"{lexical}@{term.language}"
+            if term.datatype:
+                return f"{lexical}^^{self._cached_qname(term.datatype)}"
+            return lexical
+        if isinstance(term, BNode):
+            return f"_:{term}"
+        return self._cached_qname(term) if cached else self._qname(term)
+
+    def format(self, s, p, o) -> str:
+        if p == RDF.type:
+            return f"{self.term(s)} a {self.term(o, cached=True)} .\n"
+        return f"{self.term(s)} {self.term(p, cached=True)} {self.term(o)} .\n"
+
+
+WRITERS = {
+    "nt": NTriplesWriter,
+    "ntriples": NTriplesWriter,
+    "turtle": TurtleWriter,
+    "ttl": TurtleWriter,
+}
+
+
+def open_destination(destination, compress: bool = False):
+    """
+    Abre o destino em modo binário. Aceita caminho de arquivo ou objeto binário com write
+    (arquivo já aberto, socket.makefile("wb"), BytesIO...).
+    Retorna (stream, close); close fecha apenas o que foi aberto aqui.
+    """
+    owned = []
+    if isinstance(destination, (str, os.PathLike)):
+        stream = open(destination, "wb")
+        owned.append(stream)
+    else:
+        stream = destination
+    if compress:
+        stream = gzip.GzipFile(fileobj=stream, mode="wb")
+        owned.insert(0, stream)
+
+    def close():
+        for handle in owned:
+            handle.close()
+        if not owned and hasattr(stream, "flush"):
+            stream.flush()
+
+    return stream, close
@@ -0,0 +1,77 @@
+from rdflib import Graph, Literal, URIRef, RDF, RDFS
+from rdflib.namespace import SH
+from .graph_events import reports_removals
+
+# Triplas de esquema usadas pela inferência RDFS: acompanham o subgrafo validado
+_SCHEMA_PREDICATES = (RDFS.subClassOf, RDFS.subPropertyOf, RDFS.domain, RDFS.range)
+# Inferências que só alcançam o sujeito e o objeto da tripla alterada
+_LOCAL_INFERENCE = (None, "none", "rdfs")
+
+
+def subject_graph(graph: Graph, subjects) -> Graph:
+    """
+    Subgrafo com as triplas dos sujeitos, o rdf:type dos recursos que eles
+    referenciam (para sh:class) e as triplas de esquema do grafo.
+    """
+    data = Graph()
+    for pred in _SCHEMA_PREDICATES:
+        data.addN((s, p, o, data) for s, p, o in graph.triples((None, pred, None)))
+    for subject in subjects:
+        for triple in graph.triples((subject, None, None)):
+            data.add(triple)
+            obj = triple[2]
+            if isinstance(obj, URIRef):
+                data.addN((obj, RDF.type, rdf_type, data) for rdf_type in graph.objects(obj, RDF.type))
+    return data
+
+
+class IncrementalValidation:
+    """
+    Estado da validação incremental de um grafo contra um shape. Ouve o grafo
+    (graph_events.watch) e guarda os sujeitos alterados desde a última validação e os
+    que violavam o shape nela. A próxima validação só passa esses sujeitos ao pyshacl:
+    os demais estavam conformes e não mudaram. Só vale para shapes cujas restrições
+    olham o próprio nó foco, como os gerados por to_shacl.
+
+    A próxima validação é completa quando a alteração não cabe nesses sujeitos: tripla de
+    esquema (subClassOf etc. mudam quem é alvo do shape), remoção por padrão sem sujeito
+    ou predicado (de stores que avisam assim), store que não avisa remoções
+    (graph_events.reports_removals) ou inferência além de RDFS. O objeto da tripla
+    também é revalidado: com RDFS, rdfs:range pode lhe dar o tipo alvo.
+    """
+
+    def __init__(self, shape, options):
+        self.shape = shape
+        self.options = options
+        self.local = dict(options).get("inference") in _LOCAL_INFERENCE
+        self.changed = set()
+        self.violating = set()
+        self.full = True
+        self.result = None
+
+    def _changed(self, triple):
+        subject, predicate, obj = triple
+        if subject is None or predicate is None or predicate in _SCHEMA_PREDICATES:
+            self.full = True
+            return
+        self.changed.add(subject)
+        if obj is not None and not isinstance(obj, Literal):
+            self.changed.add(obj)
+
+    _triple_added = _triple_removed = _changed
+
+    def run(self, graph: Graph, validate):
+        """validate(data_graph) -> (conforms, results_graph, results_text), só sobre o necessário."""
+        if not self.local or not reports_removals(graph):
+            self.full = True
+        if self.result is not None and not self.full and not self.changed:
+            return self.result
+        if self.full:
+            data = graph
+        else:
+            data = subject_graph(graph, self.changed | self.violating)
+        self.changed = set()
+        self.full = False
+        self.result = validate(data)
+        self.violating = set(self.result[1].objects(None, SH.focusNode))
+        return self.result
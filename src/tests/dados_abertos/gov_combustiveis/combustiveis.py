@@ -1,6 +1,7 @@
 from rdflib import Namespace
 from src.rdf_mapper.rdf_mapper import RDFMapper
 from src.rdf_mapper.rdf_repository import RDFRepository
+from src.rdf_mapper.ingestion import ingest_csv
 from rdflib import Graph
 import matplotlib.pyplot as plt
 
@@ -95,55 +96,35 @@ class Combustiveis:
 
 
 if __name__ == "__main__":
-    import pandas as pd
     import csv
 
-    df = pd.read_csv(
+    # Ingestão paralela: cada processo monta os objetos de um bloco do CSV e gera as triplas.
+    # O mesmo fluxo é exportado em N-Triples + gzip, sem serializar o grafo inteiro.
+    graph, stats = ingest_csv(
+        Combustiveis,
         'src/tests/dados_abertos/gov_combustiveis/Preços semestrais - AUTOMOTIVOS_2024.02.csv',
+        uri_template=f"{NAMESPACE}:{{index}}",
+        graph=Graph(),
+        destination="precos-combustiveis.nt.gz",
+        compress=True,
         sep=';',
         usecols=lambda c: not c.startswith('Unnamed'),
         quoting=csv.QUOTE_NONE,
         on_bad_lines='warn'
     )
-
-    combustiveis_list = []
-
-    for i, row in df.iterrows():
-        uri = f"{NAMESPACE}:{i}"
-        obj = Combustiveis(
-            uri=uri,
-            Regiao___Sigla = row["Regiao - Sigla"],
-            Estado___Sigla = row["Estado - Sigla"],
-            Municipio = row["Municipio"],
-            Revenda = row["Revenda"],
-            CNPJ_da_Revenda = row["CNPJ da Revenda"],
-            Nome_da_Rua = row["Nome da Rua"],
-            Numero_Rua = row["Numero Rua"],
-            Complemento = row["Complemento"],
-            Bairro = row["Bairro"],
-            Cep = row["Cep"],
-            Produto = row["Produto"],
-            Data_da_Coleta = row["Data da Coleta"],
-            Valor_de_Venda = row["Valor de Venda"],
-            Valor_de_Compra = row["Valor de Compra"],
-            Unidade_de_Medida = row["Unidade de Medida"],
-            Bandeira = row["Bandeira"]
-        )
-        combustiveis_list.append(obj)
-
-
-    graph = rdf_mapper.to_rdf_many(combustiveis_list)
     graph.bind("ex", EX)
-    graph.serialize(
-        destination="precos-combustiveis.rdf",
-        format="application/rdf+xml"
-    )
+    print(stats)
 
     repo = RDFRepository(rdf_mapper, graph, Combustiveis)
 
-    result = repo.group_by_count(Combustiveis, "Estado___Sigla", order="DESC")
-    estados = [row["Estado___Sigla"] for row in result][:10]
-    counts = [row["count"] for row in result][:10]
+    # Uma leitura colunar dos campos usados nos gráficos; os agrupamentos rodam vetorizados sobre ela
+    campos = ["Estado___Sigla", "Bandeira", "Municipio", "Produto"]
+    frame = repo.frame(campos + ["Valor_de_Venda"], numeric=["Valor_de_Venda"])
+    rankings = {campo: frame.group_by(campo, order="DESC", limit=10) for campo in campos}
+
+    result = rankings["Estado___Sigla"]
+    estados = [row["Estado___Sigla"] for row in result]
+    counts = [row["count"] for row in result]
 
     plt.figure(figsize=(10, 6))
     plt.barh(estados[::-1], counts[::-1])
@@ -152,18 +133,18 @@ if __name__ == "__main__":
     plt.tight_layout()
     plt.savefig("imagens_combustivel/top_estados_combustiveis.png")
 
-    result = repo.group_by_count(Combustiveis, "Bandeira", order="DESC")
-    bandeiras = [row["Bandeira"] for row in result][:5]
-    counts = [row["count"] for row in result][:5]
+    result = rankings["Bandeira"][:5]
+    bandeiras = [row["Bandeira"] for row in result]
+    counts = [row["count"] for row in result]
     plt.figure()
     plt.pie(counts, labels=bandeiras, autopct="%1.1f%%", startangle=140)
     plt.title("Distribuição das principais bandeiras")
     plt.tight_layout()
     plt.savefig("imagens_combustivel/bandeiras_pizza.png")
 
-    result = repo.group_by_count(Combustiveis, "Municipio", order="DESC")
-    municipios = [row["Municipio"] for row in result][:10]
-    counts = [row["count"] for row in result][:10]
+    result = rankings["Municipio"]
+    municipios = [row["Municipio"] for row in result]
+    counts = [row["count"] for row in result]
     plt.figure(figsize=(10, 6))
     plt.barh(municipios[::-1], counts[::-1])
     plt.xlabel("Quantidade de registros")
@@ -172,9 +153,9 @@ if __name__ == "__main__":
     plt.savefig("imagens_combustivel/top_municipios.png")
 
 
-    result = repo.group_by_count(Combustiveis, "Produto", order="DESC")
-    produtos = [row["Produto"] for row in result][:5]
-    counts = [row["count"] for row in result][:5]
+    result = rankings["Produto"][:5]
+    produtos = [row["Produto"] for row in result]
+    counts = [row["count"] for row in result]
     plt.figure(figsize=(10, 6))
     plt.bar(produtos, counts)
     plt.xlabel("Produto")
@@ -185,10 +166,7 @@ if __name__ == "__main__":
 
     
     # Consulta: média do Valor_de_Venda por Estado
-    resultados = repo.group_by_avg(Combustiveis, "Estado___Sigla", "Valor_de_Venda", order="DESC")
-
-    
-    top_estados = resultados[:10]
+    top_estados = frame.group_by("Estado___Sigla", {"avg": ("avg", "Valor_de_Venda")}, order="DESC", limit=10)
     estados = [row["Estado___Sigla"] for row in top_estados]
     medias = [row["avg"] for row in top_estados]
 
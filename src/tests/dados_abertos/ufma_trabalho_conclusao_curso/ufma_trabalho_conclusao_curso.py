@@ -1,6 +1,7 @@
 from rdflib import Namespace
 from src.rdf_mapper.rdf_mapper import RDFMapper
 from src.rdf_mapper.rdf_repository import RDFRepository
+from src.rdf_mapper.ingestion import ingest_csv
 from rdflib import Graph
 import matplotlib.pyplot as plt
 
@@ -68,41 +69,19 @@ class TCC:
 
 
 if __name__ == "__main__":
-    import pandas as pd
     import csv
 
-    df = pd.read_csv(
+    graph, stats = ingest_csv(
+        TCC,
         'src/tests/dados_abertos/ufma_trabalho_conclusao_curso/defesas_de_dissertacao_e_tese-2024.2.csv',
+        uri_template="https://dadosabertos.ufma.br/dataset/trabalhos-de-conclusao-de-curso-defendidos:{index}",
         sep=';',
         usecols=lambda c: not c.startswith('Unnamed'),
         quoting=csv.QUOTE_NONE,
         on_bad_lines='warn'
     )
-
-    tcc_list = []
-
-    for i, row in df.iterrows():
-        uri = f"https://dadosabertos.ufma.br/dataset/trabalhos-de-conclusao-de-curso-defendidos:{i}"
-        tcc = TCC(
-            uri=uri,
-            municipio=row['municipio'],
-            curso=row['curso'],
-            turno=row['turno'],
-            modalidade=row['modalidade'],
-            nivel=row['nivel'],
-            mes=row['mes'],
-            ano=row['ano'],
-            titulo=row['titulo'],
-            autor=row['autor'],
-            orientador=row['orientador'],
-            tipo=row['tipo'],
-            data_defesa=row['data_defesa']
-        )
-        tcc_list.append(tcc)
-
-
-    graph = rdf_mapper.to_rdf_many(tcc_list)
     graph.bind("ex", EX)
+    print(stats)
     # graph.serialize(
     #     destination="trabalhos-de-conclusao-de-curso-defendidos.rdf",
     #     format="application/rdf+xml"
@@ -0,0 +1,112 @@
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+from rdflib import Namespace, Graph, Literal, URIRef
+from rdf_mapper.rdf_mapper import RDFMapper
+from rdf_mapper.ingestion import ingest_csv, ingest_csv_chunked, column_mapping
+from rdf_mapper.rdf_repository import RDFRepository
+from rdf_mapper.sqlite_store import open_sqlite_graph
+
+HAS_PANDAS = importlib.util.find_spec("pandas") is not None
+
+EX = Namespace("http://example.org/posto#")
+rdf_mapper = RDFMapper()
+
+@rdf_mapper.rdf_entity(EX.Posto)
+class Posto:
+    def __init__(self, uri, Estado___Sigla, Municipio, Valor_de_Venda):
+        self.uri = uri
+        self._Estado___Sigla = Estado___Sigla
+        self._Municipio = Municipio
+        self._Valor_de_Venda = Valor_de_Venda
+
+    @rdf_mapper.rdf_property(EX.Estado___Sigla)
+    def Estado___Sigla(self): pass
+
+    @rdf_mapper.rdf_property(EX.Municipio)
+    def Municipio(self): pass
+
+    @rdf_mapper.rdf_property(EX.Valor_de_Venda)
+    def Valor_de_Venda(self): pass
+
+
+ROWS = [
+    ("MA", "SAO LUIS", "5,89"),
+    ("MA", "IMPERATRIZ", "6,09"),
+    ("PI", "TERESINA", ""),
+    ("CE", "FORTALEZA", "5,79"),
+] * 5
+
+
+@unittest.skipUnless(HAS_PANDAS, "pandas não instalado")
+class TestIngestion(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("Estado - Sigla;Municipio;Valor de Venda\n")
+            for row in ROWS:
+                f.write(";".join(row) + "\n")
+        self.read_opts = {"sep": ";", "dtype": str}
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def expected_graph(self):
+        objs = [
+            Posto(f"{EX}{i}", estado, municipio, valor or None)
+            for i, (estado, municipio, valor) in enumerate(ROWS)
+        ]
+        return rdf_mapper.to_rdf_many(objs)
+
+    def test_column_mapping_uses_sanitized_names(self):
+        mapping = column_mapping(Posto, ["Estado - Sigla", "Municipio", "Valor de Venda"])
+        self.assertEqual(mapping["Estado___Sigla"], "Estado - Sigla")
+        self.assertEqual(mapping["Valor_de_Venda"], "Valor de Venda")
+
+    def test_dataframe_to_rdf_matches_object_path(self):
+        import pandas as pd
+        df = pd.read_csv(self.path, **self.read_opts)
+        graph = rdf_mapper.dataframe_to_rdf(df, Posto, uri_template=f"{EX}{{index}}")
+        self.assertEqual(set(graph), set(self.expected_graph()))
+
+    def test_ingest_in_process(self):
+        graph, stats = ingest_csv(Posto, self.path, uri_template=f"{EX}{{index}}",
+                                  chunksize=3, workers=1, **self.read_opts)
+        self.assertEqual(stats.rows, len(ROWS))
+        self.assertEqual(set(graph), set(self.expected_graph()))
+        self.assertNotIn((URIRef(f"{EX}2"), EX.Valor_de_Venda, Literal("nan")), graph)
+
+    def test_ingest_with_process_pool_to_ntriples(self):
+        output = io.BytesIO()
+        graph, stats = ingest_csv(Posto, self.path, uri_template=f"{EX}{{index}}", chunksize=4,
+                                  workers=2, graph=Graph(), destination=output, **self.read_opts)
+        self.assertEqual(stats.triples, len(graph))
+        self.assertGreater(stats.rows_per_second, 0)
+        parsed = Graph().parse(data=output.getvalue().decode("utf-8"), format="nt")
+        self.assertEqual(set(parsed), set(self.expected_graph()))
+
+    def test_chunked_ingestion_into_sqlite_store(self):
+        db_path = self.path + ".sqlite"
+        try:
+            graph = open_sqlite_graph(db_path)
+            stats = ingest_csv_chunked(Posto, self.path, graph, uri_template=f"{EX}{{index}}",
+                                       chunksize=3, **self.read_opts)
+            graph.close()
+            self.assertEqual(stats.rows, len(ROWS))
+
+            reopened = open_sqlite_graph(db_path, create=False)
+            self.assertEqual(set(reopened), set(self.expected_graph()))
+            repo = RDFRepository(rdf_mapper, reopened, Posto)
+            self.assertEqual(repo.count_by_Estado___Sigla(Estado___Sigla="MA"), 10)
+            self.assertEqual(repo.find_by_Municipio(Municipio="TERESINA")[0].Valor_de_Venda, None)
+            reopened.close()
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+
+
+if __name__ == "__main__":
+    unittest.main()
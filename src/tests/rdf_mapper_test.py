@@ -0,0 +1,345 @@
+import gc
+import gzip
+import io
+import unittest
+import weakref
+from unittest import mock
+from rdflib import Namespace, Graph, URIRef, Literal, RDF, RDFS
+from rdflib.namespace import SH
+from rdf_mapper import rdf_mapper as rdf_mapper_module
+from rdf_mapper.graph_events import remove_triples
+from rdf_mapper.rdf_mapper import RDFMapper
+
+EX = Namespace("http://example.org/")
+rdf_mapper = RDFMapper()
+
+@rdf_mapper.rdf_entity(EX.Person)
+class Person:
+    def __init__(self, uri, name=None, age=None, address=None, phones=None):
+        self.uri = uri
+        self._name = name
+        self._age = age
+        self._address = address
+        self._phones = phones or []
+
+    @rdf_mapper.rdf_property(EX.name)
+    def name(self): pass
+
+    @rdf_mapper.rdf_property(EX.age)
+    def age(self): pass
+
+    @rdf_mapper.rdf_one_to_one(EX.address, target_class=lambda: Address)
+    def address(self): pass
+
+    @rdf_mapper.rdf_one_to_many(EX.phone, target_class=lambda: Phone)
+    def phones(self): pass
+
+
+@rdf_mapper.rdf_entity(EX.Address)
+class Address:
+    def __init__(self, uri, street=None):
+        self.uri = uri
+        self._street = street
+
+    @rdf_mapper.rdf_property(EX.street)
+    def street(self): pass
+
+
+@rdf_mapper.rdf_entity(EX.Phone)
+class Phone:
+    def __init__(self, uri, number=None):
+        self.uri = uri
+        self._number = number
+
+    @rdf_mapper.rdf_property(EX.number)
+    def number(self): pass
+
+
+@rdf_mapper.rdf_entity(EX.Person)
+class LazyPerson:
+    def __init__(self, uri, name=None, address=None, phones=None):
+        self.uri = uri
+        self._name = name
+        self._address = address
+        self._phones = phones or []
+
+    @rdf_mapper.rdf_property(EX.name)
+    def name(self): pass
+
+    @rdf_mapper.rdf_one_to_one(EX.address, target_class=lambda: Address, fetch="lazy")
+    def address(self): pass
+
+    @rdf_mapper.rdf_one_to_many(EX.phone, target_class=lambda: Phone, fetch="lazy")
+    def phones(self): pass
+
+
+@rdf_mapper.rdf_entity(EX.Person, slots=True)
+class CompactPerson:
+    def __init__(self, uri, name=None, address=None):
+        self.uri = uri
+        self._name = name
+        self._address = address
+
+    @rdf_mapper.rdf_property(EX.name)
+    def name(self): pass
+
+    @rdf_mapper.rdf_one_to_one(EX.address, target_class=lambda: Address)
+    def address(self): pass
+
+
+class Resource:
+    __slots__ = ("uri",)
+
+    def __init__(self, uri):
+        self.uri = uri
+
+
+@rdf_mapper.rdf_entity(EX.Person, slots=True)
+class CompactNamed(Resource):
+    def __init__(self, uri, name=None):
+        super().__init__(uri)
+        self._name = name
+
+    @rdf_mapper.rdf_property(EX.name)
+    def name(self): pass
+
+    def __repr__(self):
+        return f"CompactNamed({super().__repr__()})"
+
+
+def make_person(i=1):
+    address = Address(f"http://example.org/address/{i}", "123 Main St")
+    phones = [
+        Phone(f"http://example.org/phone/{i}a", "1234-5678"),
+        Phone(f"http://example.org/phone/{i}b", "8765-4321"),
+    ]
+    return Person(f"http://example.org/person/{i}", "João", 30, address, phones)
+
+
+class TestRDFMapper(unittest.TestCase):
+    def test_compiled_matches_reflective(self):
+        person = make_person()
+        compiled = rdf_mapper.to_rdf(person)
+        reflective = RDFMapper(compiled=False).to_rdf(person)
+        self.assertEqual(set(compiled), set(reflective))
+
+    def test_compiled_round_trip(self):
+        graph = rdf_mapper.to_rdf(make_person())
+        person = rdf_mapper.from_rdf(graph, Person, "http://example.org/person/1")
+        self.assertEqual(person.name, "João")
+        self.assertEqual(person.age, 30)
+        self.assertEqual(person.address.street, "123 Main St")
+        self.assertEqual(sorted(p.number for p in person.phones), ["1234-5678", "8765-4321"])
+
+    def test_mapping_is_compiled_once_per_class(self):
+        mapping = rdf_mapper._mapping_for(Person)
+        rdf_mapper.to_rdf(make_person())
+        self.assertIs(rdf_mapper._mapping_for(Person), mapping)
+        self.assertEqual(set(Person._rdf_properties), {"name", "age", "address", "phones"})
+
+    def test_from_rdf_many_reads_each_subject_once(self):
+        people = [make_person(i) for i in range(4)]
+        graph = rdf_mapper.to_rdf_many(people)
+        hydrated = rdf_mapper.from_rdf_many(graph, Person, [p.uri for p in people])
+        self.assertEqual([str(p.uri) for p in hydrated], [p.uri for p in people])
+        self.assertEqual(hydrated[2].address.street, "123 Main St")
+        self.assertEqual(len(hydrated[3].phones), 2)
+
+        calls = []
+        original = graph.predicate_objects
+        graph.predicate_objects = lambda subject, *a, **kw: calls.append(subject) or original(subject, *a, **kw)
+        rdf_mapper.from_rdf_many(graph, Person, [p.uri for p in people])
+        # 4 pessoas + 4 endereços + 8 telefones, cada um lido uma única vez
+        self.assertEqual(len(calls), 16)
+        self.assertEqual(len(set(calls)), 16)
+
+    def test_lazy_relationships_resolve_on_first_access(self):
+        graph = rdf_mapper.to_rdf(make_person())
+        visited = {}
+        person = rdf_mapper.from_rdf(graph, LazyPerson, "http://example.org/person/1", visited)
+        self.assertEqual(set(visited), {URIRef("http://example.org/person/1")})
+
+        self.assertEqual(person.address.street, "123 Main St")
+        self.assertIs(person.address, visited[URIRef("http://example.org/address/1")])
+        self.assertEqual(sorted(p.number for p in person.phones), ["1234-5678", "8765-4321"])
+        self.assertEqual(len(visited), 4)
+
+    def test_compact_entities_use_slots(self):
+        graph = rdf_mapper.to_rdf(make_person())
+        person = rdf_mapper.from_rdf(graph, CompactPerson, "http://example.org/person/1")
+        self.assertEqual((person.name, person.address.street), ("João", "123 Main St"))
+        self.assertFalse(hasattr(person, "__dict__"))
+        self.assertEqual(set(CompactPerson.__slots__), {"uri", "_name", "_address", "_rdf_dirty"})
+        with self.assertRaises(AttributeError):
+            person.nickname = "Jo"
+
+        compact = CompactPerson("http://example.org/person/2", "Maria")
+        self.assertEqual(set(rdf_mapper.to_rdf(compact)), set(rdf_mapper.to_rdf(Person(compact.uri, "Maria"))))
+
+    def test_compact_entities_keep_zero_argument_super(self):
+        named = CompactNamed("http://example.org/person/3", "Ana")
+        self.assertEqual((named.uri, named.name), ("http://example.org/person/3", "Ana"))
+        self.assertTrue(repr(named).startswith("CompactNamed("))
+        self.assertEqual(CompactNamed.__slots__, ("_name", "_rdf_dirty"))
+
+    def test_shapes_are_cached_until_mapping_changes(self):
+        mapper = RDFMapper()
+
+        @mapper.rdf_entity(EX.Item)
+        class Item:
+            @mapper.rdf_property(EX.label, minCount=1)
+            def label(self): pass
+
+        shape = mapper.shape_for(Item)
+        self.assertIs(mapper.shape_for(Item), shape)
+
+        def code(self): pass
+        Item.code = mapper.rdf_property(EX.code)(code)
+        self.assertIsNot(mapper.shape_for(Item), shape)
+        self.assertIn((None, SH.path, EX.code), mapper.shape_for(Item))
+
+    def test_incremental_validation_checks_only_changed_subjects(self):
+        mapper = RDFMapper()
+
+        @mapper.rdf_entity(EX.Item)
+        class Item:
+            @mapper.rdf_property(EX.label, minCount=1)
+            def label(self): pass
+
+        graph = Graph()
+        for i in range(50):
+            graph.add((EX[f"item/{i}"], RDF.type, EX.Item))
+            graph.add((EX[f"item/{i}"], EX.label, Literal(f"Item {i}")))
+
+        with mock.patch.object(rdf_mapper_module, "validate", wraps=rdf_mapper_module.validate) as pyshacl:
+            self.assertTrue(mapper.validate(graph, entity_class=Item, incremental=True)[0])
+            self.assertTrue(mapper.validate(graph, entity_class=Item, incremental=True)[0])
+            self.assertEqual(pyshacl.call_count, 1)
+
+            graph.add((EX["item/new"], RDF.type, EX.Item))
+            conforms, report, _ = mapper.validate(graph, entity_class=Item, incremental=True)
+            self.assertFalse(conforms)
+            self.assertEqual(set(report.objects(None, SH.focusNode)), {EX["item/new"]})
+            self.assertEqual(len(pyshacl.call_args.kwargs["data_graph"]), 1)
+
+            # Outra alteração: a violação anterior continua no relatório
+            remove_triples(graph, [(EX["item/3"], EX.label, Literal("Item 3"))])
+            conforms, report, _ = mapper.validate(graph, entity_class=Item, incremental=True)
+            self.assertEqual(set(report.objects(None, SH.focusNode)), {EX["item/new"], EX["item/3"]})
+
+            graph.add((EX["item/new"], EX.label, Literal("Novo")))
+            graph.add((EX["item/3"], EX.label, Literal("Item 3")))
+            self.assertTrue(mapper.validate(graph, entity_class=Item, incremental=True)[0])
+            self.assertEqual(len(pyshacl.call_args.kwargs["data_graph"]), 4)
+            self.assertEqual(mapper.validate(graph, entity_class=Item)[0], True)
+
+    def test_incremental_validation_sees_removals_and_schema_changes(self):
+        mapper = RDFMapper()
+
+        @mapper.rdf_entity(EX.Item)
+        class Item:
+            @mapper.rdf_property(EX.label, minCount=1)
+            def label(self): pass
+
+        graph = Graph()
+        graph.add((EX.i1, RDF.type, EX.Item))
+        graph.add((EX.i1, EX.label, Literal("Item 1")))
+        graph.add((EX.special, RDF.type, EX.Special))
+        self.assertTrue(mapper.validate(graph, entity_class=Item, incremental=True)[0])
+
+        # Remoção direta pelo grafo, sem remove_triples
+        graph.remove((EX.i1, EX.label, None))
+        self.assertFalse(mapper.validate(graph, entity_class=Item, incremental=True)[0])
+        graph.add((EX.i1, EX.label, Literal("Item 1")))
+        self.assertTrue(mapper.validate(graph, entity_class=Item, incremental=True)[0])
+
+        # Nova subclasse: EX.special passa a ser alvo do shape sem ter sido alterado
+        graph.add((EX.Special, RDFS.subClassOf, EX.Item))
+        conforms, report, _ = mapper.validate(graph, entity_class=Item, incremental=True)
+        self.assertFalse(conforms)
+        self.assertEqual(set(report.objects(None, SH.focusNode)), {EX.special})
+        graph.remove((EX.Special, RDFS.subClassOf, EX.Item))
+        self.assertTrue(mapper.validate(graph, entity_class=Item, incremental=True)[0])
+
+    def test_incremental_validation_is_full_for_user_shapes(self):
+        mapper = RDFMapper()
+
+        @mapper.rdf_entity(EX.Item)
+        class Item:
+            @mapper.rdf_property(EX.label)
+            def label(self): pass
+
+        # Restrição que olha outro nó: o dono do item precisa ter nome
+        shapes = Graph().parse(format="turtle", data="""
+            @prefix sh: <http://www.w3.org/ns/shacl#> .
+            @prefix ex: <http://example.org/> .
+            ex:ItemShape a sh:NodeShape ; sh:targetClass ex:Item ;
+                sh:property [ sh:path ( ex:owner ex:name ) ; sh:minCount 1 ] .
+        """)
+        graph = Graph()
+        graph.add((EX.i1, RDF.type, EX.Item))
+        graph.add((EX.i1, EX.owner, EX.ana))
+        graph.add((EX.ana, EX.name, Literal("Ana")))
+        self.assertTrue(mapper.validate(graph, shacl_graph=shapes, incremental=True)[0])
+        graph.remove((EX.ana, EX.name, Literal("Ana")))
+        self.assertFalse(mapper.validate(graph, shacl_graph=shapes, incremental=True)[0])
+        self.assertNotIn(graph, mapper._incremental)
+
+    def test_incremental_validation_does_not_keep_graph_alive(self):
+        mapper = RDFMapper()
+
+        @mapper.rdf_entity(EX.Item)
+        class Item:
+            @mapper.rdf_property(EX.label)
+            def label(self): pass
+
+        graph = Graph()
+        graph.add((EX["item/1"], EX.label, Literal("Item 1")))
+        mapper.validate(graph, entity_class=Item, incremental=True)
+        collected = weakref.ref(graph)
+        del graph
+        gc.collect()
+        self.assertIsNone(collected())
+
+    def test_lazy_fetch_rejects_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            rdf_mapper.rdf_one_to_one(EX.address, target_class=lambda: Address, fetch="later")
+
+    def test_to_rdf_many_writes_into_supplied_graph(self):
+        shared = Address("http://example.org/address/shared", "Rua Comum")
+        people = [Person(f"http://example.org/person/m{i}", f"P{i}", address=shared) for i in range(50)]
+        target = Graph()
+        result = rdf_mapper.to_rdf_many(people, graph=target)
+        self.assertIs(result, target)
+        self.assertEqual(len(list(target.subjects(EX.address, URIRef(shared.uri)))), 50)
+        self.assertEqual(len(list(target.triples((URIRef(shared.uri), None, None)))), 2)
+
+    def test_to_rdf_many_matches_per_object_merge(self):
+        people = [make_person(i) for i in range(5)]
+        merged = Graph()
+        for person in people:
+            merged += rdf_mapper.to_rdf(person)
+        self.assertEqual(set(rdf_mapper.to_rdf_many(people)), set(merged))
+
+    def test_serialize_stream_ntriples(self):
+        people = [make_person(i) for i in range(10)]
+        buffer = io.BytesIO()
+        count = rdf_mapper.serialize_stream(iter(people), buffer, format="nt")
+        graph = Graph().parse(data=buffer.getvalue().decode("utf-8"), format="nt")
+        self.assertEqual(count, len(graph))
+        self.assertEqual(set(graph), set(rdf_mapper.to_rdf_many(people)))
+
+    def test_serialize_stream_turtle_gzip(self):
+        people = [make_person(i) for i in range(3)]
+        buffer = io.BytesIO()
+        rdf_mapper.serialize_stream(people, buffer, format="turtle", compress=True,
+                                    prefixes={"ex": str(EX), "xsd": "http://www.w3.org/2001/XMLSchema#"})
+        data = gzip.decompress(buffer.getvalue()).decode("utf-8")
+        self.assertIn("@prefix ex: <http://example.org/> .", data)
+        self.assertIn("a ex:Person .", data)
+        graph = Graph().parse(data=data, format="turtle")
+        self.assertEqual(set(graph), set(rdf_mapper.to_rdf_many(people)))
+
+
+if __name__ == "__main__":
+    unittest.main()
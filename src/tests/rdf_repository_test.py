@@ -1,8 +1,13 @@
+import os
+import tempfile
 import unittest
-from rdflib import Namespace
+from rdflib import Namespace, Literal, RDF, XSD
 from rdf_mapper.rdf_mapper import RDFMapper
 from rdf_mapper.rdf_repository import RDFRepository
+from rdf_mapper.backends import MemoryBackend, SQLiteBackend
+from rdf_mapper.graph_events import remove_triples
 from rdflib import Graph
+from rdflib.plugins.stores.memory import Memory
 
 EX = Namespace("http://example.org/")
 rdf_mapper = RDFMapper()
@@ -45,6 +50,24 @@ class Phone:
     def number(self): pass
 
 
+@rdf_mapper.rdf_entity(EX.Sale)
+class Sale:
+    def __init__(self, uri, state=None, brand=None, price=None):
+        self.uri = uri
+        self._state = state
+        self._brand = brand
+        self._price = price
+
+    @rdf_mapper.rdf_property(EX.state)
+    def state(self): pass
+
+    @rdf_mapper.rdf_property(EX.brand)
+    def brand(self): pass
+
+    @rdf_mapper.rdf_property(EX.price)
+    def price(self): pass
+
+
 class TestRDFRepository(unittest.TestCase):
     def setUp(self):
         address = Address("http://example.org/address/1", "123 Main St")
@@ -93,6 +116,499 @@ class TestRDFRepository(unittest.TestCase):
         results = bulk_repo.find_by_name_like(name="Pessoa")
         self.assertGreaterEqual(len(results), 1000)
 
+    def test_find_by_hydrates_shared_relationships_once(self):
+        shared = Address("http://example.org/address/shared", "Rua Comum")
+        for i in range(3):
+            self.graph += rdf_mapper.to_rdf(Person(f"http://example.org/person/s{i}", "Vizinho", address=shared))
+        results = self.repo.find_by_name(name="Vizinho")
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len({id(p.address) for p in results}), 1)
+        self.assertEqual(results[0].address.street, "Rua Comum")
+
+    def test_dynamic_methods_are_cached_on_repository(self):
+        finder = self.repo.find_by_name
+        self.assertIs(self.repo.find_by_name, finder)
+        self.assertIn("find_by_name", vars(self.repo))
+        self.assertFalse(hasattr(self.repo, "find_by_unknown_field"))
+
+    def test_values_are_bound_not_spliced(self):
+        tricky = 'O"Brien" . } #'
+        self.graph += rdf_mapper.to_rdf(Person("http://example.org/person/tricky", tricky))
+        results = self.repo.find_by_name(name=tricky)
+        self.assertEqual([p.name for p in results], [tricky])
+        self.assertEqual(self.repo.count_by_name(name=tricky), 1)
+
+    def test_equality_and_relationship_conditions(self):
+        other = Address("http://example.org/address/2", "Outra Rua")
+        self.graph += rdf_mapper.to_rdf(Person("http://example.org/person/3", "João", other))
+        results = self.repo.find_by_name_and_address(name="João", address="http://example.org/address/2")
+        self.assertEqual([str(p.uri) for p in results], ["http://example.org/person/3"])
+        self.assertEqual(self.repo.count_by_name_and_address(name="João", address="http://example.org/address/1"), 1)
+        self.assertEqual(self.repo.count_by_name(name="Ninguém"), 0)
+
+    def test_equality_matches_typed_literals(self):
+        self.graph += rdf_mapper.to_rdf(Person("http://example.org/person/42", 42))
+        self.assertEqual(self.repo.count_by_name(name=42), 1)
+        self.assertEqual(self.repo.find_by_name(name=42)[0].name, 42)
+
+    def test_equality_matches_xsd_string_literals(self):
+        self.graph.add((EX["person/typed"], RDF.type, EX.Person))
+        self.graph.add((EX["person/typed"], EX.name, Literal("Ana", datatype=XSD.string)))
+        self.graph.add((EX["person/plain"], RDF.type, EX.Person))
+        self.graph.add((EX["person/plain"], EX.name, Literal("Ana")))
+        indexed = RDFRepository(rdf_mapper, self.graph, Person, indexed_fields=["name"])
+        for repo in (self.repo, indexed):
+            self.assertEqual(repo.count_by_name(name="Ana"), 2)
+            self.assertEqual(repo.count_by_name_and_address(name="Ana", address="http://example.org/address/1"), 0)
+
+        # Caminho SPARQL (_like sem índice de trigramas) com uma igualdade junto
+        graph = Graph()
+        for i, state in enumerate([Literal("MA", datatype=XSD.string), Literal("MA"), Literal("PI")]):
+            graph.add((EX[f"sale/{i}"], RDF.type, EX.Sale))
+            graph.add((EX[f"sale/{i}"], EX.state, state))
+            graph.add((EX[f"sale/{i}"], EX.brand, Literal("IPIRANGA")))
+        sales = RDFRepository(rdf_mapper, graph, Sale)
+        self.assertEqual(sales.count_by_state_and_brand_like(state="MA", brand="ipi"), 2)
+        self.assertEqual(len(sales.find_by_state_and_brand_like(state="MA", brand="ipi")), 2)
+
+    def test_indexed_fields_are_maintained_incrementally(self):
+        repo = RDFRepository(rdf_mapper, self.graph, Person, indexed_fields=["name"])
+        self.graph += rdf_mapper.to_rdf(Person("http://example.org/person/idx", "Indexada"))
+
+        def no_scan(*args, **kwargs):
+            raise AssertionError("indexed lookup should not scan the graph")
+        self.graph.subjects = no_scan
+        self.assertEqual(repo.count_by_name(name="Indexada"), 1)
+        self.assertEqual(repo.find_by_name(name="João")[0].address.street, "123 Main St")
+        del self.graph.subjects
+
+        remove_triples(self.graph, list(self.graph.triples((None, EX.name, Literal("Indexada")))))
+        self.assertEqual(repo.count_by_name(name="Indexada"), 0)
+
+        # graph.set direto, sem remove_triples
+        self.graph.set((EX["person/1"], EX.name, Literal("João 2")))
+        self.assertEqual(repo.find_by_name(name="João"), [])
+        self.assertEqual(repo.count_by_name(name="João"), 0)
+        self.assertEqual(repo.page_by_name(name="João").items, [])
+        self.assertEqual(repo.count_by_name(name="João 2"), 1)
+
+        # Remoção que o store não avisa: o índice fica com a entrada antiga, mas cada
+        # candidato é conferido no grafo
+        Memory.remove(self.graph.store, (EX["person/1"], EX.name, None), self.graph)
+        self.assertEqual(repo.find_by_name(name="João 2"), [])
+        self.assertEqual(repo.count_by_name(name="João 2"), 0)
+
+    def test_backends_answer_the_same_queries(self):
+        self.graph += rdf_mapper.to_rdf(Person("http://example.org/person/42", 42))
+        with tempfile.TemporaryDirectory() as folder:
+            source = os.path.join(folder, "dados.nt")
+            self.graph.serialize(source, format="nt", encoding="utf-8")
+            db_path = os.path.join(folder, "dados.sqlite")
+            with SQLiteBackend(db_path) as backend:
+                self.assertEqual(backend.load(source), len(self.graph))
+
+            memory = MemoryBackend()
+            memory.load(source)
+            with SQLiteBackend(db_path, create=False) as disk:
+                self.assertEqual(set(disk.graph), set(self.graph))
+                for backend in (memory, disk):
+                    repo = RDFRepository(rdf_mapper, backend, Person)
+                    self.assertIs(repo.graph, backend.graph)
+                    person = repo.find_by_name(name="João")[0]
+                    self.assertEqual(person.address.street, "123 Main St")
+                    self.assertEqual(len(person.phones), 2)
+                    self.assertEqual(repo.count_by_name(name=42), 1)
+                    self.assertEqual(len(repo.find_by_name_like(name="jo")), 1)
+                    self.assertEqual(len(repo.group_by_count(Person, "name")), 2)
+
+    def sales_repo(self):
+        graph = Graph()
+        rows = [("MA", "IPIRANGA", "6,10"), ("MA", "BRANCA", "6,30"), ("MA", "BRANCA", "sem preço"),
+                ("PI", "IPIRANGA", 5), ("PI", "IPIRANGA", 7.5), ("CE", "BRANCA", None)]
+        for i, (state, brand, price) in enumerate(rows):
+            rdf_mapper.to_rdf(Sale(f"http://example.org/sale/{i}", state, brand, price), graph=graph)
+        return RDFRepository(rdf_mapper, graph, Sale)
+
+    def test_group_by_avg_coerces_comma_decimals(self):
+        repo = self.sales_repo()
+        result = repo.group_by_avg(Sale, "state", "price")
+        self.assertEqual([row["state"] for row in result], ["PI", "MA", "CE"])
+        self.assertAlmostEqual(result[0]["avg"], 6.25)
+        self.assertAlmostEqual(result[1]["avg"], 6.2)
+        self.assertIsNone(result[2]["avg"])
+        self.assertEqual(repo.group_by_max(Sale, "state", "price", order="ASC")[0], {"state": "MA", "max": 6.3})
+        self.assertEqual(repo.group_by_sum(Sale, "state", "price")[0], {"state": "PI", "sum": 12.5})
+
+    def test_aggregate_many_metrics_and_keys(self):
+        repo = self.sales_repo()
+        result = repo.aggregate(Sale, ["state", "brand"], {
+            "n": ("count", None),
+            "cheapest": ("min", "price"),
+            "prices": ("count_distinct", "price"),
+        }, order_by="cheapest", order="ASC")
+        self.assertEqual([(row["state"], row["brand"]) for row in result],
+                         [("PI", "IPIRANGA"), ("MA", "IPIRANGA"), ("MA", "BRANCA"), ("CE", "BRANCA")])
+        self.assertEqual(result[0], {"state": "PI", "brand": "IPIRANGA", "n": 2, "cheapest": 5, "prices": 2})
+        self.assertEqual(result[2], {"state": "MA", "brand": "BRANCA", "n": 2, "cheapest": 6.3, "prices": 2})
+        self.assertEqual(repo.group_by_count_distinct(Sale, "state", "brand")[0], {"state": "MA", "count_distinct": 2})
+        with self.assertRaises(ValueError):
+            repo.aggregate(Sale, "state", {"x": ("median", "price")})
+        with self.assertRaises(ValueError):
+            repo.group_by_avg(Sale, "unknown", "price")
+
+    def test_group_by_many_shares_scans_and_pushes_down_limit(self):
+        repo = self.sales_repo()
+        scanned = []
+        subject_objects = repo.graph.subject_objects
+
+        def counting(pred, *args, **kwargs):
+            scanned.append(pred)
+            return subject_objects(pred, *args, **kwargs)
+        repo.graph.subject_objects = counting
+
+        result = repo.group_by_many(Sale, ["state", "brand", ["state", "brand"]], limit=1)
+        self.assertEqual(sorted(scanned), sorted([EX.state, EX.brand]))
+        self.assertEqual(result["state"], [{"state": "MA", "count": 3}])
+        self.assertEqual(result["brand"][0]["count"], 3)
+        self.assertEqual([row["count"] for row in result[("state", "brand")]], [2])
+        self.assertEqual([row["count"] for row in repo.group_by_count(Sale, "state", order="ASC", limit=2)], [1, 2])
+        self.assertEqual(repo.group_by_count(Sale, "state", limit=0), [])
+
+    def test_result_cache_is_invalidated_by_graph_changes(self):
+        repo = RDFRepository(rdf_mapper, self.sales_repo().graph, Sale, cache_size=2)
+        self.assertEqual(repo.group_by_count(Sale, "state")[0], {"state": "MA", "count": 3})
+        repo.group_by_count(Sale, "state")[0]["count"] = 99
+        self.assertEqual(repo.group_by_count(Sale, "state")[0]["count"], 3)
+        self.assertEqual(repo.count_by_state(state="PI"), 2)
+        self.assertEqual(repo.count_by_state(state="PI"), 2)
+        self.assertEqual(repo.cache_info()[:2], (3, 2))
+
+        # Predicado que nenhuma entrada lê: nada é invalidado
+        repo.graph.add((EX["sale/0"], EX.comment, Literal("sem efeito")))
+        self.assertEqual(repo.cache_info().currsize, 2)
+
+        rdf_mapper.to_rdf(Sale("http://example.org/sale/new", "PI", "BRANCA", "6,00"), graph=repo.graph)
+        self.assertEqual(repo.cache_info().currsize, 0)
+        self.assertEqual(repo.count_by_state(state="PI"), 3)
+
+        remove_triples(repo.graph, [(EX["sale/new"], EX.state, Literal("PI"))])
+        self.assertEqual(repo.count_by_state(state="PI"), 2)
+        # graph.remove e graph.set direto também invalidam
+        self.assertEqual(repo.count_by_state(state="MA"), 3)
+        repo.graph.remove((EX["sale/0"], EX.state, None))
+        self.assertEqual(repo.count_by_state(state="MA"), 2)
+        repo.graph.set((EX["sale/1"], EX.state, Literal("PI")))
+        self.assertEqual(repo.count_by_state(state="PI"), 3)
+
+        repo.group_by_avg(Sale, "state", "price")
+        repo.group_by_count(Sale, "brand")
+        self.assertEqual(repo.cache_info().currsize, 2)
+        self.assertEqual(repo.cache_info().misses, 9)
+
+    def test_session_identity_map(self):
+        self.graph += rdf_mapper.to_rdf(Person("http://example.org/person/2", "Maria", self.person.address))
+        with self.repo.session() as session:
+            joao = session.find_by_name(name="João")[0]
+            maria = session.find_by_name(name="Maria")[0]
+            self.assertIs(maria.address, joao.address)
+            self.assertIs(session.get("http://example.org/person/1"), joao)
+            self.assertIn(joao, session)
+
+            reads = []
+            predicate_objects = self.graph.predicate_objects
+            self.graph.predicate_objects = lambda s: reads.append(s) or predicate_objects(s)
+            self.assertIs(session.find_by_name(name="João")[0], joao)
+            self.assertEqual(reads, [])
+
+            session.evict(joao)
+            self.assertIsNot(session.find_by_name(name="João")[0], joao)
+            self.assertEqual(len(reads), 1)
+            del self.graph.predicate_objects
+
+            self.assertIsNone(session.get("http://example.org/person/unknown"))
+            self.assertEqual(session.count_by_name(name="Maria"), 1)
+        self.assertEqual(len(session), 0)
+        self.assertIsNot(self.repo.find_by_name(name="Maria")[0], maria)
+
+    def test_session_flush_applies_minimal_delta(self):
+        session = self.repo.session()
+        person = session.find_by_name(name="João")[0]
+        self.assertEqual(session.dirty, [])
+
+        person.name = "João Silva"
+        person.address = Address("http://example.org/address/new", "Rua Nova")
+        person.phones = person.phones[:1]
+        self.assertEqual(person._rdf_dirty, {"name", "address", "phones"})
+        removed, added = session.flush()
+
+        self.assertEqual(removed, 3)
+        # nome, endereço e as triplas do endereço novo (tipo e rua)
+        self.assertEqual(added, 4)
+        self.assertEqual(session.dirty, [])
+        self.assertEqual(self.repo.count_by_name(name="João"), 0)
+        reloaded = self.repo.find_by_name(name="João Silva")[0]
+        self.assertEqual(reloaded.address.street, "Rua Nova")
+        self.assertEqual(len(reloaded.phones), 1)
+        self.assertEqual(session.flush(), (0, 0))
+
+        outside = Person("http://example.org/person/outside", "Fora")
+        outside.name = "Sem sessão"
+        self.assertFalse(hasattr(outside, "_rdf_dirty"))
+
+    def test_session_add_and_delete(self):
+        repo = RDFRepository(rdf_mapper, self.graph, Person, cache_size=8)
+        self.assertEqual(repo.count_by_name(name="Nova"), 0)
+        with repo.session() as session:
+            session.add(Person("http://example.org/person/new", "Nova", self.person.address))
+            session.delete(session.find_by_name(name="João")[0])
+            session.flush()
+        self.assertEqual(repo.count_by_name(name="Nova"), 1)
+        self.assertEqual(repo.count_by_name(name="João"), 0)
+        self.assertEqual(repo.find_by_name(name="Nova")[0].address.street, "123 Main St")
+
+    def test_keyset_pagination(self):
+        repo = self.sales_repo()
+        for i in range(10, 15):
+            rdf_mapper.to_rdf(Sale(f"http://example.org/sale/{i}", "MA", "BRANCA", i), graph=repo.graph)
+
+        seen, cursor = [], None
+        while True:
+            page = repo.page_by_state(state="MA", size=3, cursor=cursor)
+            seen += [str(sale.uri) for sale in page.items]
+            cursor = page.cursor
+            if cursor is None:
+                break
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual(len(seen), 8)
+
+        first = repo.page_by_brand(brand="BRANCA", size=4, order_by="price", order="DESC")
+        self.assertEqual([sale.price for sale in first.items], [14, 13, 12, 11])
+        second = repo.page_by_brand(brand="BRANCA", size=4, cursor=first.cursor, order_by="price", order="DESC")
+        self.assertEqual([sale.price for sale in second.items][:1], [10])
+        self.assertIsNone(second.cursor)
+        with self.assertRaises(ValueError):
+            repo.page_by_brand(brand="BRANCA", cursor=first.cursor)
+
+    def test_keyset_pagination_with_sparse_matches(self):
+        # Metade só com o estado, metade só com a bandeira: as 3 que casam estão no fim da ordem
+        graph = Graph()
+        n = 2000
+        for i in range(n):
+            both = i >= n - 3
+            sale = Sale(f"http://example.org/sale/{i:05d}", "MA" if both or i % 2 else None,
+                        "BRANCA" if both or not i % 2 else None, i)
+            rdf_mapper.to_rdf(sale, graph=graph)
+        repo = RDFRepository(rdf_mapper, graph, Sale)
+        first = repo.page_by_state_and_brand(state="MA", brand="BRANCA", size=2)
+        self.assertEqual([sale.price for sale in first.items], [n - 3, n - 2])
+        second = repo.page_by_state_and_brand(state="MA", brand="BRANCA", size=2, cursor=first.cursor)
+        self.assertEqual([sale.price for sale in second.items], [n - 1])
+        self.assertIsNone(second.cursor)
+
+
+    def test_keyset_pagination_seeks_past_cursor(self):
+        graph = Graph()
+        n = 2000
+        for i in range(n):
+            price = None if i % 10 == 1 else (i * 7) % 1000
+            rdf_mapper.to_rdf(Sale(f"http://example.org/sale/{i:05d}", "MA" if i % 2 else "PI", "BRANCA", price),
+                              graph=graph)
+        repo = RDFRepository(rdf_mapper, graph, Sale)
+        expected = sorted(
+            repo.find_by_state(state="MA"),
+            key=lambda sale: (sale.price is None, -(sale.price or 0), -int(str(sale.uri)[-5:])),
+        )
+
+        reads = []
+        triples = graph.triples
+        graph.triples = lambda pattern: reads.append(pattern) or triples(pattern)
+        seen, cursor, costs = [], None, []
+        while True:
+            reads.clear()
+            page = repo.page_by_state(state="MA", size=20, cursor=cursor, order_by="price", order="DESC")
+            costs.append(len(reads))
+            seen += page.items
+            cursor = page.cursor
+            if cursor is None:
+                break
+        del graph.triples
+        self.assertEqual([str(sale.uri) for sale in seen], [str(sale.uri) for sale in expected])
+        # Depois da 1ª página (que monta a ordem), cada página lê o grafo só para os seus vizinhos
+        self.assertLess(max(costs[1:]), 40 * 20)
+
+        # Sujeito sem valor que ganha um: sai do fim e entra na ordem
+        graph.set((EX["sale/00001"], EX.price, Literal(5000)))
+        first = repo.page_by_state(state="MA", size=3, order_by="price", order="DESC")
+        self.assertEqual([sale.price for sale in first.items], [5000] + [sale.price for sale in expected[:2]])
+        self.assertEqual(sum(sale.uri == EX["sale/00001"] for sale in
+                             repo.page_by_state(state="MA", size=2000, order_by="price").items), 1)
+        # E o que perde o valor vai para o fim
+        graph.remove((EX["sale/00003"], EX.price, None))
+        items = repo.page_by_state(state="MA", size=2000, order_by="price", order="DESC").items
+        self.assertEqual((len(items), str(items[-1].uri)), (n // 2, "http://example.org/sale/00003"))
+
+        # Filtro seletivo: os poucos candidatos são ordenados, sem percorrer a ordem inteira
+        for i in (10, 11, 12):
+            graph.set((EX[f"sale/{i:05d}"], EX.brand, Literal("RARA")))
+        reads.clear()
+        graph.triples = lambda pattern: reads.append(pattern) or triples(pattern)
+        page = repo.page_by_brand(brand="RARA", size=2, order_by="price", order="DESC")
+        rest = repo.page_by_brand(brand="RARA", size=2, cursor=page.cursor, order_by="price", order="DESC")
+        del graph.triples
+        self.assertEqual([str(sale.uri)[-2:] for sale in page.items + rest.items], ["12", "10", "11"])
+        self.assertIsNone(rest.cursor)
+        self.assertLess(len(reads), 100)
+
+    def test_iter_by_streams_and_hydrates_incrementally(self):
+        for i in range(250):
+            self.graph += rdf_mapper.to_rdf(Person(f"http://example.org/person/bulk{i}", f"Pessoa {i}"))
+        reads = []
+        predicate_objects = self.graph.predicate_objects
+        self.graph.predicate_objects = lambda s: reads.append(s) or predicate_objects(s)
+
+        people = self.repo.iter_by_name_like(name="Pessoa")
+        self.assertEqual(reads, [])
+        next(people)
+        self.assertEqual(len(reads), 100)
+        self.assertEqual(sum(1 for _ in people), 249)
+
+        batches = list(self.repo.iter_by_name_like(name="Pessoa", batch_size=100))
+        self.assertEqual([len(batch) for batch in batches], [100, 100, 50])
+        del self.graph.predicate_objects
+
+        joao = list(self.repo.iter_by_name(name="João"))
+        self.assertEqual(joao[0].address.street, "123 Main St")
+        with self.assertRaises(ValueError):
+            self.repo.iter_by_name(name="João", batch_size=0)
+
+    def test_projection_reads_only_requested_predicates(self):
+        repo = self.sales_repo()
+        self.assertEqual(repo.project(["brand", "price"], state="PI"), [("IPIRANGA", 5), ("IPIRANGA", 7.5)])
+        named = repo.project(("state", "price"), row="namedtuple", state_like="m", limit=1)
+        self.assertEqual((named[0].state, named[0].price), ("MA", "6,10"))
+        self.assertEqual(len(repo.project("state", row="dict")), 6)
+        with self.assertRaises(ValueError):
+            repo.project(["price"], row="list")
+
+        read = set()
+        triples = self.graph.triples
+        self.graph.triples = lambda pattern, *a, **kw: read.add(pattern[1]) or triples(pattern, *a, **kw)
+        people = self.repo.project(["name", "address"], row="dict", name="João")
+        del self.graph.triples
+        self.assertEqual(people, [{"name": "João", "address": "http://example.org/address/1"}])
+        self.assertEqual(read, {EX.name, EX.address, RDF.type})
+        self.assertEqual(len(self.repo.project(["phones"])[0][0]), 2)
+
+    def test_like_with_trigram_index(self):
+        for i, name in enumerate(["São Luís", "SAO PAULO", "Teresina", "Caxias"]):
+            self.graph += rdf_mapper.to_rdf(Person(f"http://example.org/person/t{i}", name))
+        repo = RDFRepository(rdf_mapper, self.graph, Person, text_indexed_fields=["name"])
+        self.assertEqual({p.name for p in repo.find_by_name_like(name="são")}, {"São Luís", "SAO PAULO"})
+        self.assertEqual(repo.count_by_name_like(name="LUIS"), 1)
+        self.assertEqual([p.name for p in repo.find_by_name_like(name="xi")], ["Caxias"])
+        self.assertEqual(repo.find_by_name_like(name="recife"), [])
+        # Metacaracteres de regex seguem pelo SPARQL
+        self.assertEqual(repo.count_by_name_like(name="^Ter"), 1)
+
+        self.graph += rdf_mapper.to_rdf(Person("http://example.org/person/t9", "São José de Ribamar"))
+        self.assertEqual(repo.count_by_name_like(name="sao"), 3)
+        remove_triples(self.graph, [(EX["person/t1"], EX.name, Literal("SAO PAULO"))])
+        self.assertEqual(repo.count_by_name_like(name="sao"), 2)
+        self.assertEqual(repo.count_by_name_like_and_address(name="jo", address="http://example.org/address/1"), 1)
+
+        # Remoção que o store não avisa: o acerto é conferido no grafo
+        Memory.remove(self.graph.store, (EX["person/t0"], EX.name, None), self.graph)
+        self.assertEqual([p.name for p in repo.find_by_name_like(name="sao")], ["São José de Ribamar"])
+        self.assertEqual(repo.count_by_name_like_and_address(name="jo", address="http://example.org/address/1"), 1)
+
+    def test_range_finders(self):
+        graph = Graph()
+        prices = [5, 7.5, 6, 9, "6,10", 6]
+        for i, price in enumerate(prices):
+            rdf_mapper.to_rdf(Sale(f"http://example.org/sale/{i}", "MA" if i % 2 else "PI", "BRANCA", price), graph=graph)
+        indexed = RDFRepository(rdf_mapper, graph, Sale, range_indexed_fields=["price"])
+        sparql = RDFRepository(rdf_mapper, graph, Sale)
+        for repo in (indexed, sparql):
+            self.assertEqual(sorted(s.price for s in repo.find_by_price_between(price=(6, 7.5))), [6, 6, 7.5])
+            self.assertEqual(repo.count_by_price_gt(price=6), 2)
+            self.assertEqual(repo.count_by_price_lt(price=6), 1)
+            self.assertEqual(repo.count_by_state_and_price_gt(state="MA", price=6), 2)
+        with self.assertRaises(ValueError):
+            indexed.find_by_price_between(price=6)
+
+        graph.add((EX["sale/new"], RDF.type, EX.Sale))
+        graph.add((EX["sale/new"], EX.price, Literal(6.5)))
+        self.assertEqual(indexed.count_by_price_between(price=(6, 7)), 3)
+        remove_triples(graph, [(EX["sale/2"], EX.price, Literal(6))])
+        self.assertEqual(indexed.count_by_price_between(price=(6, 7)), 2)
+        graph.remove((EX["sale/new"], EX.price, None))
+        self.assertEqual(indexed.count_by_price_between(price=(6, 7)), 1)
+
+        # Texto compara em ordem lexicográfica nos dois caminhos
+        by_state = RDFRepository(rdf_mapper, graph, Sale, range_indexed_fields=["state"])
+        for repo in (by_state, sparql):
+            self.assertEqual(repo.count_by_state_gt(state="A"), 6)
+            self.assertEqual(repo.count_by_state_between(state=("M", "N")), 3)
+            self.assertEqual(repo.count_by_price_lt(price="6,5"), 1)
+            with self.assertRaises(ValueError):
+                repo.count_by_state_between(state=("A", 1))
+            with self.assertRaises(ValueError):
+                repo.count_by_state_gt(state=True)
+
+    def test_range_index_bulk_load(self):
+        graph = Graph()
+        repo = RDFRepository(rdf_mapper, graph, Sale, range_indexed_fields=["price"])
+        index = repo._range_indexes[EX.price]
+        for i in range(2000):
+            graph.add((EX[f"sale/{i}"], RDF.type, EX.Sale))
+            graph.add((EX[f"sale/{i}"], EX.price, Literal(2000 - i)))
+        # Inclusões ficam no buffer até a primeira consulta
+        self.assertEqual(index._keys, [])
+        self.assertEqual(repo.count_by_price_lt(price=11), 10)
+        self.assertEqual(index._keys, sorted(index._keys))
+        self.assertEqual(len(index._keys), 2000)
+
+    def test_entity_frame(self):
+        repo = self.sales_repo()
+        frame = repo.frame(["state", "brand", "price"], numeric=["price"])
+        self.assertEqual(len(frame), 6)
+        self.assertEqual(frame["state"].categories, ["MA", "PI", "CE"])
+        self.assertEqual(frame["state"].codes.tolist(), [0, 0, 0, 1, 1, 2])
+        self.assertEqual(frame["price"][:2].tolist(), [6.1, 6.3])
+
+        metrics = {"avg": ("avg", "price"), "count": ("count", None), "brands": ("count_distinct", "brand")}
+        self.assertEqual(
+            [{**row, "avg": row["avg"] and round(row["avg"], 6)} for row in frame.group_by("state", metrics)],
+            [{**row, "avg": row["avg"] and round(row["avg"], 6)} for row in repo.aggregate(Sale, "state", metrics)],
+        )
+        self.assertEqual(frame.group_by(["state", "brand"], limit=1), [{"state": "MA", "brand": "BRANCA", "count": 2}])
+
+        piaui = frame[frame["state"] == "PI"]
+        self.assertEqual(len(piaui), 2)
+        sale = piaui[1]
+        self.assertIsInstance(sale, Sale)
+        self.assertEqual((sale.brand, sale.price), ("IPIRANGA", 7.5))
+        self.assertEqual(len(repo.frame("brand", state="MA")), 3)
+        with self.assertRaises(ValueError):
+            self.repo.frame(["phones"])
+
+    def test_entity_frame_group_by_keeps_integers_like_aggregate(self):
+        graph = Graph()
+        # Preços inteiros com um sem valor (coluna float64 com NaN) e um float no CE
+        for i, (state, price) in enumerate([("MA", 7), ("MA", 5), ("MA", None), ("PI", 4), ("CE", 2), ("CE", 2.5)]):
+            rdf_mapper.to_rdf(Sale(f"http://example.org/sale/{i}", state, "BRANCA", price), graph=graph)
+        repo = RDFRepository(rdf_mapper, graph, Sale)
+        frame = repo.frame(["state", "price"], numeric=["price"])
+        self.assertEqual(frame["price"].dtype.kind, "f")
+        metrics = {"sum": ("sum", "price"), "min": ("min", "price"), "max": ("max", "price")}
+        grouped = frame.group_by("state", metrics)
+        self.assertEqual(grouped, repo.aggregate(Sale, "state", metrics))
+        self.assertEqual(
+            [[type(row[name]) for name in metrics] for row in grouped],
+            [[int, int, int], [float, int, float], [int, int, int]],
+        )
+        self.assertEqual(frame.take([0, 1, 3]).group_by("state", metrics), grouped[:1] + grouped[2:])
+
     def test_circular_reference(self):
         a1 = Address("http://example.org/address/circular")
         p1 = Person("http://example.org/person/circular1", "Cíclico")
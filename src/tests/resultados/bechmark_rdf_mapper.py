@@ -1,3 +1,4 @@
+import sys
 import time
 import tracemalloc
 import gc
@@ -38,14 +39,21 @@ class Pessoa:
 # --- Benchmark Functions ---
 
 def serialize_with_rdf_mapper(n):
-    g = rdf_mapper.create_graph() if hasattr(rdf_mapper, 'create_graph') else None
     objs = []
     for i in range(n):
         end = Endereco(EX[f"endereco/{i}"], "Rua Exemplo")
         pes = Pessoa(EX[f"pessoa/{i}"], f"Pessoa {i}", end)
-        # Serializa cada objeto (no mesmo grafo, se possível)
-        g = rdf_mapper.to_rdf(pes)
         objs.append(pes)
+    # Todas as triplas vão direto para um único grafo
+    return rdf_mapper.to_rdf_many(objs)
+
+def serialize_merge_por_objeto(n):
+    # Caminho antigo: um Graph descartável por objeto, mesclado com +=
+    g = Graph()
+    for i in range(n):
+        end = Endereco(EX[f"endereco/{i}"], "Rua Exemplo")
+        pes = Pessoa(EX[f"pessoa/{i}"], f"Pessoa {i}", end)
+        g += rdf_mapper.to_rdf(pes)
     return g
 
 # Versão baseline usando rdflib puro
@@ -61,29 +69,77 @@ def serialize_with_rdflib(n):
         g.add((end_uri, EX.logradouro, Literal("Rua Exemplo")))
     return g
 
+def custo_por_entidade(mapper, n):
+    """Mede o custo médio (µs) de to_rdf e from_rdf por entidade com o mapper informado."""
+    objs = [
+        Pessoa(EX[f"pessoa/{i}"], f"Pessoa {i}", Endereco(EX[f"endereco/{i}"], "Rua Exemplo"))
+        for i in range(n)
+    ]
+    start = time.perf_counter()
+    g = Graph()
+    for pes in objs:
+        g += mapper.to_rdf(pes)
+    tempo_to_rdf = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for pes in objs:
+        mapper.from_rdf(g, Pessoa, pes.uri)
+    tempo_from_rdf = time.perf_counter() - start
+    return tempo_to_rdf / n * 1e6, tempo_from_rdf / n * 1e6
+
+def comparar_compilado(volumes):
+    """Modo --compilado: custo por entidade antes (reflexão) e depois (plano compilado por classe)."""
+    reflexivo = RDFMapper(compiled=False)
+    linhas = []
+    for n in volumes:
+        to_antes, from_antes = custo_por_entidade(reflexivo, n)
+        to_depois, from_depois = custo_por_entidade(rdf_mapper, n)
+        linhas.append({
+            "Volume": n,
+            "to_rdf_reflexivo_us": to_antes,
+            "to_rdf_compilado_us": to_depois,
+            "from_rdf_reflexivo_us": from_antes,
+            "from_rdf_compilado_us": from_depois,
+        })
+    df = pd.DataFrame(linhas)
+    df.to_csv("resultado_benchmark_compilado.csv", index=False)
+    print(df.to_string(index=False))
+    return df
+
 def run_experiment(serialize_func, volumes):
     times = []
     memories = []
+    blocks = []
     for n in volumes:
         gc.collect()
         tracemalloc.start()
         start_time = time.perf_counter()
-        serialize_func(n)
+        result = serialize_func(n)
         duration = time.perf_counter() - start_time
         current, peak = tracemalloc.get_traced_memory()
+        # Blocos ainda alocados com o resultado vivo (grafo + lixo não coletado)
+        snapshot = tracemalloc.take_snapshot()
         tracemalloc.stop()
+        del result
         times.append(duration)
         memories.append(peak / (1024 * 1024))  # em MB
-    return times, memories
+        blocks.append(sum(stat.count for stat in snapshot.statistics("filename")))
+    return times, memories, blocks
 
 if __name__ == "__main__":
+    if "--compilado" in sys.argv:
+        comparar_compilado([1000, 10000, 100000])
+        sys.exit(0)
+
     volumes = [1000, 10000, 50000]  # Pode aumentar se quiser!
-    times_mapper, mem_mapper = run_experiment(serialize_with_rdf_mapper, volumes)
-    times_rdflib, mem_rdflib = run_experiment(serialize_with_rdflib, volumes)
+    times_mapper, mem_mapper, blocks_mapper = run_experiment(serialize_with_rdf_mapper, volumes)
+    times_merge, mem_merge, blocks_merge = run_experiment(serialize_merge_por_objeto, volumes)
+    times_rdflib, mem_rdflib, blocks_rdflib = run_experiment(serialize_with_rdflib, volumes)
 
     # Salvar gráficos
     plt.figure(figsize=(10, 5))
     plt.plot(volumes, times_mapper, marker='o', label='rdf_mapper')
+    plt.plot(volumes, times_merge, marker='^', label='rdf_mapper (merge por objeto)')
     plt.plot(volumes, times_rdflib, marker='s', label='rdflib puro')
     plt.xlabel('Quantidade de Entidades')
     plt.ylabel('Tempo (s)')
@@ -95,6 +151,7 @@ if __name__ == "__main__":
 
     plt.figure(figsize=(10, 5))
     plt.plot(volumes, mem_mapper, marker='o', label='rdf_mapper')
+    plt.plot(volumes, mem_merge, marker='^', label='rdf_mapper (merge por objeto)')
     plt.plot(volumes, mem_rdflib, marker='s', label='rdflib puro')
     plt.xlabel('Quantidade de Entidades')
     plt.ylabel('Uso de Memória (MB)')
@@ -108,9 +165,14 @@ if __name__ == "__main__":
     df = pd.DataFrame({
         "Volume": volumes,
         "Tempo_rdf_mapper": times_mapper,
+        "Tempo_merge_por_objeto": times_merge,
         "Tempo_rdflib": times_rdflib,
         "Memoria_rdf_mapper_MB": mem_mapper,
-        "Memoria_rdflib_MB": mem_rdflib
+        "Memoria_merge_por_objeto_MB": mem_merge,
+        "Memoria_rdflib_MB": mem_rdflib,
+        "Blocos_rdf_mapper": blocks_mapper,
+        "Blocos_merge_por_objeto": blocks_merge,
+        "Blocos_rdflib": blocks_rdflib
     })
     df.to_csv("resultado_benchmark.csv", index=False)
     print(df)
@@ -0,0 +1,81 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+import pandas as pd
+
+from src.rdf_mapper.backends import MemoryBackend, SQLiteBackend
+from src.rdf_mapper.ingestion import dataframe_triples
+from src.rdf_mapper.rdf_repository import RDFRepository
+from src.rdf_mapper.streaming import NTriplesWriter, open_destination
+from src.tests.dados_abertos.gov_combustiveis.combustiveis import Combustiveis, rdf_mapper, NAMESPACE
+from src.tests.resultados.benchmark_dataframe import gerar_dataframe
+
+# Compara o backend em memória (reprocessa o arquivo a cada início) com o SQLite
+# (carga uma vez, depois só abre o arquivo): tempo de partida e latência das consultas.
+
+REPETICOES = 20
+
+def gerar_nt(n, path):
+    stream, close = open_destination(path, compress=True)
+    writer = NTriplesWriter(stream)
+    for triple in dataframe_triples(rdf_mapper, gerar_dataframe(n), Combustiveis, f"{NAMESPACE}:{{index}}"):
+        writer.write(triple)
+    writer.flush()
+    close()
+
+def cronometrar(funcao):
+    start = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - start, resultado
+
+def latencia_ms(funcao):
+    tempos = []
+    for _ in range(REPETICOES):
+        tempos.append(cronometrar(funcao)[0])
+    return statistics.median(tempos) * 1000
+
+def consultas(backend):
+    repo = RDFRepository(rdf_mapper, backend, Combustiveis)
+    return {
+        "find_by_Municipio_ms": latencia_ms(lambda: repo.find_by_Municipio(Municipio="MUNICIPIO 7")),
+        "count_by_Estado_ms": latencia_ms(lambda: repo.count_by_Estado___Sigla(Estado___Sigla="MA")),
+        "group_by_Bandeira_ms": latencia_ms(lambda: repo.group_by_count(Combustiveis, "Bandeira")),
+    }
+
+def medir(n, pasta):
+    fonte = os.path.join(pasta, f"anp_{n}.nt.gz")
+    db_path = os.path.join(pasta, f"anp_{n}.sqlite")
+    gerar_nt(n, fonte)
+
+    # Em memória: todo início de processo reprocessa o arquivo
+    memoria = MemoryBackend()
+    partida_memoria, _ = cronometrar(lambda: memoria.load(fonte))
+
+    # SQLite: a carga em massa acontece uma vez; os inícios seguintes só abrem o arquivo
+    with SQLiteBackend(db_path) as backend:
+        carga_sqlite, _ = cronometrar(lambda: backend.load(fonte))
+    partida_sqlite, disco = cronometrar(lambda: SQLiteBackend(db_path, create=False))
+
+    linhas = []
+    for nome, backend, partida in (("memoria", memoria, partida_memoria), ("sqlite", disco, partida_sqlite)):
+        linhas.append({
+            "Volume": n,
+            "Backend": nome,
+            "Triplas": len(backend),
+            "Carga_s": partida_memoria if nome == "memoria" else carga_sqlite,
+            "Partida_s": partida,
+            **consultas(backend),
+        })
+        print(linhas[-1])
+    disco.close()
+    return linhas
+
+if __name__ == "__main__":
+    volumes = [int(v) for v in sys.argv[1:]] or [10000, 50000, 200000]
+    linhas = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for n in volumes:
+            linhas.extend(medir(n, pasta))
+    pd.DataFrame(linhas).to_csv("bench_backends.csv", index=False)
@@ -0,0 +1,62 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from src.tests.dados_abertos.gov_combustiveis.combustiveis import Combustiveis, rdf_mapper, NAMESPACE
+
+COLUNAS = {
+    "Regiao - Sigla": ["N", "NE", "CO", "SE", "S"],
+    "Estado - Sigla": ["MA", "PI", "CE", "SP", "RJ", "RS", "GO", "PA"],
+    "Municipio": [f"MUNICIPIO {i}" for i in range(800)],
+    "Revenda": [f"REVENDA {i}" for i in range(20000)],
+    "CNPJ da Revenda": [f"{i:014d}" for i in range(20000)],
+    "Nome da Rua": [f"RUA {i}" for i in range(5000)],
+    "Numero Rua": [str(i) for i in range(2000)],
+    "Complemento": ["", "LOJA 1", "KM 10"],
+    "Bairro": [f"BAIRRO {i}" for i in range(3000)],
+    "Cep": [f"65{i:06d}" for i in range(3000)],
+    "Produto": ["GASOLINA", "ETANOL", "DIESEL", "DIESEL S10", "GNV"],
+    "Data da Coleta": [f"{d:02d}/07/2024" for d in range(1, 29)],
+    "Valor de Venda": [f"{v / 100:.2f}".replace(".", ",") for v in range(450, 700)],
+    "Valor de Compra": [""],
+    "Unidade de Medida": ["R$ / litro"],
+    "Bandeira": ["BRANCA", "IPIRANGA", "RAIZEN", "VIBRA"],
+}
+
+def gerar_dataframe(n):
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({col: rng.choice(valores, n) for col, valores in COLUNAS.items()})
+
+def triplas_por_objeto(df):
+    # Caminho atual: iterrows + construtor + to_rdf
+    objs = [
+        Combustiveis(f"{NAMESPACE}:{i}", *row)
+        for i, row in zip(df.index, df.itertuples(index=False))
+    ]
+    return sum(1 for _ in rdf_mapper.iter_triples(objs))
+
+def triplas_vetorizadas(df):
+    from src.rdf_mapper.ingestion import dataframe_triples
+    return sum(1 for _ in dataframe_triples(rdf_mapper, df, Combustiveis, f"{NAMESPACE}:{{index}}"))
+
+if __name__ == "__main__":
+    volumes = [int(v) for v in sys.argv[1:]] or [10000, 100000, 500000]
+    linhas = []
+    for n in volumes:
+        df = gerar_dataframe(n)
+        start = time.perf_counter()
+        triplas = triplas_por_objeto(df)
+        tempo_objetos = time.perf_counter() - start
+        start = time.perf_counter()
+        triplas_vetorizadas(df)
+        tempo_vetorizado = time.perf_counter() - start
+        linhas.append({
+            "Volume": n,
+            "Triplas": triplas,
+            "Linhas_s_por_objeto": n / tempo_objetos,
+            "Linhas_s_vetorizado": n / tempo_vetorizado,
+            "Ganho": tempo_objetos / tempo_vetorizado,
+        })
+        print(linhas[-1])
+    pd.DataFrame(linhas).to_csv("bench_dataframe.csv", index=False)
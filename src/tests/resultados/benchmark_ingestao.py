@@ -0,0 +1,65 @@
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import pandas as pd
+
+# Pico de memória (RSS) da ingestão em blocos para SQLite. Geração do CSV e ingestão
+# rodam em processos separados: o ru_maxrss é herdado do processo pai no Linux, então
+# o pai não pode carregar os dados.
+
+def ingerir(csv_path, db_path, chunksize):
+    from src.rdf_mapper.ingestion import ingest_csv_chunked
+    from src.rdf_mapper.sqlite_store import open_sqlite_graph
+    from src.tests.dados_abertos.gov_combustiveis.combustiveis import Combustiveis, NAMESPACE
+
+    graph = open_sqlite_graph(db_path)
+    stats = ingest_csv_chunked(Combustiveis, csv_path, graph, f"{NAMESPACE}:{{index}}",
+                               chunksize=chunksize, dtype=str, keep_default_na=False)
+    graph.close()
+    pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{stats.rows},{stats.triples},{stats.seconds:.2f},{pico_mb:.1f}")
+
+def gerar(n, csv_path):
+    from src.tests.resultados.benchmark_dataframe import gerar_dataframe
+    gerar_dataframe(n).to_csv(csv_path, index=False)
+
+def executar(*args):
+    return subprocess.run(
+        [sys.executable, "-m", "src.tests.resultados.benchmark_ingestao", *map(str, args)],
+        check=True, capture_output=True, text=True,
+    ).stdout.strip().splitlines()
+
+def medir(n, chunksize, pasta):
+    csv_path = os.path.join(pasta, f"anp_{n}.csv")
+    db_path = os.path.join(pasta, f"anp_{n}.sqlite")
+    executar("--gerar", n, csv_path)
+    start = time.perf_counter()
+    saida = executar("--ingerir", csv_path, db_path, chunksize)[-1]
+    linhas, triplas, segundos, pico = saida.split(",")
+    return {
+        "Volume": n,
+        "Triplas": int(triplas),
+        "Tempo_s": float(segundos),
+        "Linhas_s": n / float(segundos),
+        "Pico_RSS_MB": float(pico),
+        "Arquivo_MB": os.path.getsize(db_path) / 2**20,
+        "Total_s": time.perf_counter() - start,
+    }
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--gerar"]:
+        gerar(int(sys.argv[2]), sys.argv[3])
+        sys.exit()
+    if sys.argv[1:2] == ["--ingerir"]:
+        ingerir(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        sys.exit()
+    volumes = [int(v) for v in sys.argv[1:]] or [50000, 200000, 800000]
+    linhas = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for n in volumes:
+            linhas.append(medir(n, 20000, pasta))
+            print(linhas[-1])
+    pd.DataFrame(linhas).to_csv("bench_ingestao.csv", index=False)
@@ -1,4 +1,6 @@
+import sys
 import time
+import tracemalloc
 import psutil
 import os
 import matplotlib.pyplot as plt
@@ -34,6 +36,43 @@ class Pessoa:
     @rdf_mapper.rdf_one_to_one(EX.moradia, target_class=lambda: Endereco)
     def endereco(self): pass
 
+# Mesma entidade, mas com o relacionamento carregado sob demanda
+@rdf_mapper.rdf_entity(EX.Pessoa)
+class PessoaLazy:
+    def __init__(self, uri, nome, endereco):
+        self.uri = uri
+        self._nome = Literal(nome)
+        self._endereco = endereco
+
+    @rdf_mapper.rdf_property(FOAF.name)
+    def nome(self): pass
+
+    @rdf_mapper.rdf_one_to_one(EX.moradia, target_class=lambda: Endereco, fetch="lazy")
+    def endereco(self): pass
+
+# Mesmas entidades no modo compacto (__slots__, sem __dict__ por instância)
+@rdf_mapper.rdf_entity(EX.Endereco, slots=True)
+class EnderecoCompacto:
+    def __init__(self, uri, logradouro):
+        self.uri = uri
+        self._logradouro = Literal(logradouro)
+
+    @rdf_mapper.rdf_property(EX.logradouro)
+    def logradouro(self): pass
+
+@rdf_mapper.rdf_entity(EX.Pessoa, slots=True)
+class PessoaCompacta:
+    def __init__(self, uri, nome, endereco):
+        self.uri = uri
+        self._nome = Literal(nome)
+        self._endereco = endereco
+
+    @rdf_mapper.rdf_property(FOAF.name)
+    def nome(self): pass
+
+    @rdf_mapper.rdf_one_to_one(EX.moradia, target_class=lambda: EnderecoCompacto)
+    def endereco(self): pass
+
 def memory_mb():
     # Retorna uso de memória do processo atual em MB
     process = psutil.Process(os.getpid())
@@ -78,7 +117,177 @@ def benchmark_rdfmapper_query(g, target_name="Pessoa 1234"):
     duration = time.perf_counter() - start
     return duration, results
 
+def benchmark_fetch(g, entity_class, padrao="Pessoa 1"):
+    """Consulta ampla (find_by_nome_like) e acesso ao relacionamento, separados."""
+    repo = RDFRepository(rdf_mapper, g, entity_class)
+    start = time.perf_counter()
+    results = repo.find_by_nome_like(nome=padrao)
+    tempo_consulta = time.perf_counter() - start
+    start = time.perf_counter()
+    for pessoa in results:
+        pessoa.endereco.logradouro
+    tempo_acesso = time.perf_counter() - start
+    return tempo_consulta, tempo_acesso, len(results)
+
+def comparar_fetch(volumes):
+    """Modo --fetch: fetch eager vs lazy no mesmo grafo."""
+    linhas = []
+    for volume in volumes:
+        g = populate_graph_rdfmapper(volume)
+        eager_consulta, eager_acesso, n = benchmark_fetch(g, Pessoa)
+        lazy_consulta, lazy_acesso, _ = benchmark_fetch(g, PessoaLazy)
+        linhas.append({
+            "Volume": volume,
+            "Resultados": n,
+            "Eager_consulta_s": eager_consulta,
+            "Eager_acesso_s": eager_acesso,
+            "Lazy_consulta_s": lazy_consulta,
+            "Lazy_acesso_s": lazy_acesso,
+        })
+        print(linhas[-1])
+    import pandas as pd
+    pd.DataFrame(linhas).to_csv("bench_fetch.csv", index=False)
+
+def benchmark_update(volume, fracao=0.1):
+    """Atualiza o nome de uma fração das pessoas: flush da Session vs to_rdf + graph +=."""
+    alterados = range(0, volume, int(1 / fracao))
+
+    g = populate_graph_rdfmapper(volume)
+    session = RDFRepository(rdf_mapper, g, Pessoa).session()
+    pessoas = [session.get(EX[f"pessoa/{i}"]) for i in alterados]
+    start = time.perf_counter()
+    for pessoa in pessoas:
+        pessoa.nome = f"{pessoa.nome} (alterado)"
+    removidas, incluidas = session.flush()
+    tempo_flush = time.perf_counter() - start
+
+    # Caminho antigo: reemite todas as triplas e não remove o nome anterior
+    g = populate_graph_rdfmapper(volume)
+    pessoas = [rdf_mapper.from_rdf(g, Pessoa, EX[f"pessoa/{i}"]) for i in alterados]
+    start = time.perf_counter()
+    for pessoa in pessoas:
+        pessoa.nome = f"{pessoa.nome} (alterado)"
+        g += rdf_mapper.to_rdf(pessoa)
+    tempo_merge = time.perf_counter() - start
+
+    return {
+        "Volume": volume,
+        "Alterados": len(pessoas),
+        "Flush_s": tempo_flush,
+        "Flush_atualizacoes_s": len(pessoas) / tempo_flush,
+        "Triplas_removidas": removidas,
+        "Triplas_incluidas": incluidas,
+        "Merge_s": tempo_merge,
+        "Merge_atualizacoes_s": len(pessoas) / tempo_merge,
+    }
+
+def comparar_update(volumes):
+    """Modo --update: vazão de atualização pela unit of work."""
+    linhas = []
+    for volume in volumes:
+        linhas.append(benchmark_update(volume))
+        print(linhas[-1])
+    import pandas as pd
+    pd.DataFrame(linhas).to_csv("bench_update.csv", index=False)
+
+def benchmark_paginacao(volume, tamanho=50, paginas=(1, 10, 50)):
+    """Página N por offset (find_by) vs por cursor (page_by); todos os endereços casam a consulta."""
+    g = populate_graph_rdfmapper(volume)
+    repo = RDFRepository(rdf_mapper, g, Endereco)
+    linha = {"Volume": volume}
+    cursor, pagina = None, 0
+    for alvo in paginas:
+        if (alvo - 1) * tamanho >= volume:
+            break
+        start = time.perf_counter()
+        repo.find_by_logradouro(logradouro="Rua Exemplo", limit=tamanho, offset=(alvo - 1) * tamanho)
+        linha[f"Offset_p{alvo}_ms"] = (time.perf_counter() - start) * 1000
+        # Avança pelos cursores até a página alvo, medindo só a última
+        while pagina < alvo:
+            start = time.perf_counter()
+            page = repo.page_by_logradouro(logradouro="Rua Exemplo", size=tamanho, cursor=cursor)
+            tempo = time.perf_counter() - start
+            cursor, pagina = page.cursor, pagina + 1
+        linha[f"Cursor_p{alvo}_ms"] = tempo * 1000
+    return linha
+
+def comparar_paginacao(volumes):
+    """Modo --paginacao: custo da página N com offset e com cursor."""
+    linhas = []
+    for volume in volumes:
+        linhas.append(benchmark_paginacao(volume))
+        print(linhas[-1])
+    import pandas as pd
+    pd.DataFrame(linhas).to_csv("bench_paginacao.csv", index=False)
+
+def memoria_hidratacao(mapper, g, entity_class, subjects):
+    """Bytes alocados e retidos pelas entidades hidratadas (tracemalloc), com o grafo já carregado."""
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    entidades = mapper.from_rdf_many(g, entity_class, subjects)
+    retido = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+    del entidades
+    return retido
+
+def combustiveis_compacta():
+    """A classe Combustiveis dos dados abertos, recriada no modo compacto."""
+    from src.tests.dados_abertos.gov_combustiveis.combustiveis import Combustiveis, rdf_mapper as mapper, EX as ANP
+    namespace = {k: v for k, v in vars(Combustiveis).items() if k not in ("__dict__", "__weakref__")}
+    return mapper.rdf_entity(ANP.Combustiveis, slots=True)(type("CombustiveisCompacta", (), namespace))
+
+def comparar_memoria(volumes):
+    """Modo --memoria: memória das entidades hidratadas, normal vs compacto (por 100 mil entidades)."""
+    from src.rdf_mapper.ingestion import dataframe_triples
+    from src.tests.dados_abertos.gov_combustiveis.combustiveis import Combustiveis, rdf_mapper as mapper_anp, NAMESPACE
+    from src.tests.resultados.benchmark_dataframe import gerar_dataframe
+
+    CombustiveisCompacta = combustiveis_compacta()
+    linhas = []
+    for volume in volumes:
+        g = populate_graph_rdfmapper(volume)
+        pessoas = [EX[f"pessoa/{i}"] for i in range(volume)]
+        g_anp = Graph()
+        g_anp.addN((s, p, o, g_anp) for s, p, o in dataframe_triples(
+            mapper_anp, gerar_dataframe(volume), Combustiveis, f"{NAMESPACE}{{index}}"))
+        postos = [URIRef(f"{NAMESPACE}{i}") for i in range(volume)]
+
+        # Pessoa e Endereço: 2 entidades por sujeito consultado
+        for nome, mapper, grafo, classe, sujeitos, entidades in (
+            ("Pessoa", rdf_mapper, g, Pessoa, pessoas, 2 * volume),
+            ("PessoaCompacta", rdf_mapper, g, PessoaCompacta, pessoas, 2 * volume),
+            ("Combustiveis", mapper_anp, g_anp, Combustiveis, postos, volume),
+            ("CombustiveisCompacta", mapper_anp, g_anp, CombustiveisCompacta, postos, volume),
+        ):
+            retido = memoria_hidratacao(mapper, grafo, classe, sujeitos)
+            linhas.append({
+                "Volume": volume,
+                "Entidade": nome,
+                "Entidades": entidades,
+                "Bytes_por_entidade": retido / entidades,
+                "MB_por_100k": retido / entidades * 100_000 / (1024 * 1024),
+            })
+            print(linhas[-1])
+    import pandas as pd
+    pd.DataFrame(linhas).to_csv("bench_memoria.csv", index=False)
+
 if __name__ == "__main__":
+    if "--memoria" in sys.argv:
+        comparar_memoria([10000, 100000])
+        sys.exit(0)
+
+    if "--paginacao" in sys.argv:
+        comparar_paginacao([10000, 100000])
+        sys.exit(0)
+
+    if "--update" in sys.argv:
+        comparar_update([1000, 10000, 100000])
+        sys.exit(0)
+
+    if "--fetch" in sys.argv:
+        comparar_fetch([1000, 10000, 50000])
+        sys.exit(0)
+
     VOLUMES = [1000, 10000, 50000, 100000]
     dados = {
         "Volume": [],